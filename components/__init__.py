@@ -1,6 +1,19 @@
-from .ticker import CryptoTicker
-from .orderbook import OrderBookPanel
-from .technical import TechnicalAnalysisPanel
-from .market_trade import MarketTrade
+import importlib
 
-__all__ = ['CryptoTicker', 'OrderBookPanel', 'TechnicalAnalysisPanel', 'MarketTrade']
\ No newline at end of file
+# Panels are imported on first access: the chart panel pulls in matplotlib,
+# which should only be paid for when the chart is actually shown.
+_EXPORTS = {
+    'CryptoTicker': '.ticker',
+    'OrderBookPanel': '.orderbook',
+    'TechnicalAnalysisPanel': '.technical',
+    'MarketTrade': '.market_trade',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
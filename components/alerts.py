@@ -0,0 +1,72 @@
+import tkinter as tk
+from tkinter import ttk
+from config import COLORS
+from utils.alerts import parse_rule
+
+
+class AlertsDialog:
+    """Window for adding and removing alert rules."""
+
+    def __init__(self, parent, engine, on_change):
+        self.engine = engine
+        self.on_change = on_change
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Alerts")
+        self.window.geometry("420x360")
+        self.window.configure(bg=COLORS['bg_light'])
+
+        frame = ttk.Frame(self.window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(frame, text='e.g. "BTC crosses 70k", "RSI(14) on ETH 1h > 70", "BTC spread > 5 bps"',
+                  font=("Arial", 8), foreground=COLORS['text_secondary']).pack(anchor=tk.W)
+
+        entry_frame = ttk.Frame(frame)
+        entry_frame.pack(fill=tk.X, pady=5)
+
+        self.rule_var = tk.StringVar()
+        entry = ttk.Entry(entry_frame, textvariable=self.rule_var)
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        entry.bind('<Return>', lambda e: self.add_rule())
+        ttk.Button(entry_frame, text="Add", command=self.add_rule).pack(side=tk.LEFT, padx=(5, 0))
+
+        self.error_label = ttk.Label(frame, text="", font=("Arial", 8), foreground=COLORS['loss'])
+        self.error_label.pack(anchor=tk.W)
+
+        self.rules_list = tk.Listbox(frame, font=("Consolas", 9), bg='white')
+        self.rules_list.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        ttk.Button(frame, text="Remove selected", command=self.remove_selected).pack(anchor=tk.E)
+
+        self.rule_ids = []
+        self.refresh_list()
+        entry.focus_set()
+
+    def refresh_list(self):
+        self.rules_list.delete(0, tk.END)
+        self.rule_ids = []
+        for rule_id, rule in sorted(self.engine.rules.items()):
+            self.rules_list.insert(tk.END, rule.text)
+            self.rule_ids.append(rule_id)
+
+    def add_rule(self):
+        text = self.rule_var.get()
+        if not text.strip():
+            return
+        try:
+            rule = parse_rule(text)
+        except ValueError as e:
+            self.error_label.config(text=str(e))
+            return
+        self.engine.add_rule(rule)
+        self.rule_var.set("")
+        self.error_label.config(text="")
+        self.refresh_list()
+        self.on_change()
+
+    def remove_selected(self):
+        for i in reversed(self.rules_list.curselection()):
+            self.engine.remove_rule(self.rule_ids[i])
+        self.refresh_list()
+        self.on_change()
@@ -0,0 +1,139 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+from utils.arbitrage import ArbitrageFeed
+from config import COLORS, SYMBOLS, ARB_PAIRS
+
+LOOP_COLUMNS = [
+    ('gross', "Gross (bps)", 90),
+    ('net', "After fees (bps)", 110),
+]
+
+CROSS_COLUMNS = [
+    ('via', "Via", 50),
+    ('bid', "Bid", 90),
+    ('ask', "Ask", 90),
+    ('implied_bid', "Implied bid", 90),
+    ('implied_ask', "Implied ask", 90),
+    ('deviation', "Mid vs implied (bps)", 130),
+]
+
+
+def price_text(value):
+    return "--" if math.isnan(value) else f"{value:.6g}"
+
+
+def bps_text(value):
+    return "--" if math.isnan(value) else f"{value:+.1f}"
+
+
+class ArbitrageWindow:
+    """Triangular loop returns and implied cross rates from the live top of book."""
+
+    # Milliseconds between repaints while books change
+    refresh_interval = 250
+
+    def __init__(self, parent, pairs=None):
+        self.parent = parent
+        self.pairs = pairs or SYMBOLS + ARB_PAIRS
+        self.feed = ArbitrageFeed(self.pairs)
+        self.after_id = None
+        self.version = None
+        # Row values last written, so only rows that changed are reconfigured
+        self.drawn = {}
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Triangular Arbitrage")
+        self.window.geometry("720x640")
+        self.window.configure(bg=COLORS['bg_light'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = ttk.Frame(self.window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        controls = ttk.Frame(frame)
+        controls.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(controls, text="Taker fee per leg (bps):").pack(side=tk.LEFT)
+        self.fee_var = tk.StringVar(value=f"{self.feed.graph.fee_bps:g}")
+        fee_entry = ttk.Entry(controls, textvariable=self.fee_var, width=6)
+        fee_entry.pack(side=tk.LEFT, padx=2)
+        fee_entry.bind('<Return>', lambda e: self.set_fee())
+        self.status_label = ttk.Label(controls, text="", font=("Arial", 8))
+        self.status_label.pack(side=tk.RIGHT)
+
+        ttk.Label(frame, text="Loops").pack(anchor=tk.W, pady=(8, 0))
+        self.loops_tree = self.make_tree(frame, LOOP_COLUMNS, "Path", 220)
+        ttk.Label(frame, text="Cross rates").pack(anchor=tk.W, pady=(8, 0))
+        self.cross_tree = self.make_tree(frame, CROSS_COLUMNS, "Pair", 90)
+
+        graph = self.feed.graph
+        for loop in graph.loops:
+            self.loops_tree.insert('', tk.END, iid=loop.path, text=loop.path)
+        for cross in graph.crosses:
+            symbol = graph.pairs[cross.pair][0]
+            self.cross_tree.insert('', tk.END, iid=f"{symbol}:{cross.via}", text=symbol.upper())
+
+        if graph.pairs:
+            self.status_label.config(text=f"Waiting for {len(graph.pairs)} books...")
+            self.feed.start()
+            self.refresh()
+        else:
+            self.status_label.config(text="No triangles among the configured pairs")
+
+    def make_tree(self, parent, columns, first, first_width):
+        tree = ttk.Treeview(parent, columns=[key for key, _, _ in columns], height=10)
+        tree.heading('#0', text=first)
+        tree.column('#0', width=first_width)
+        for key, text, width in columns:
+            tree.heading(key, text=text)
+            tree.column(key, width=width, anchor=tk.E)
+        tree.tag_configure('profit', foreground=COLORS['profit'])
+        tree.pack(fill=tk.BOTH, expand=True)
+        return tree
+
+    def set_fee(self):
+        try:
+            fee = max(0.0, float(self.fee_var.get()))
+        except ValueError:
+            self.fee_var.set(f"{self.feed.graph.fee_bps:g}")
+            return
+        self.feed.set_fee(fee)
+
+    def show(self, tree, iid, values, profit):
+        """Write a row's values unless they are what is already shown."""
+        row = (values, profit)
+        if self.drawn.get((tree, iid)) != row:
+            self.drawn[(tree, iid)] = row
+            tree.item(iid, values=values, tags=('profit',) if profit else ())
+
+    def refresh(self):
+        """Repaint rows whose loops or crosses changed, best loop first."""
+        self.after_id = self.window.after(self.refresh_interval, self.refresh)
+        data = self.feed.snapshot()
+        if data['version'] == self.version:
+            return
+        self.version = data['version']
+
+        for position, (path, gross, net) in enumerate(data['loops']):
+            self.show(self.loops_tree, path, [bps_text((gross - 1) * 10_000), bps_text(net * 10_000)],
+                      net > 0)
+            if self.loops_tree.index(path) != position:
+                self.loops_tree.move(path, '', position)
+        for symbol, via, bid, ask, implied_bid, implied_ask, deviation in data['crosses']:
+            # Buying the pair below the implied bid, or selling above the implied ask, beats going via
+            profit = ask < implied_bid or bid > implied_ask
+            self.show(self.cross_tree, f"{symbol}:{via}", [
+                via, price_text(bid), price_text(ask), price_text(implied_bid), price_text(implied_ask),
+                bps_text(deviation)], profit)
+
+        self.status_label.config(
+            text=f"{data['updates']:,} book changes, {data['evaluations']:,} loop/cross evaluations")
+
+    def close(self):
+        if self.after_id:
+            self.window.after_cancel(self.after_id)
+            self.after_id = None
+        if self.feed:
+            self.feed.stop()
+            self.feed = None
+        self.window.destroy()
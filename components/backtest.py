@@ -0,0 +1,175 @@
+import tkinter as tk
+from tkinter import ttk
+from utils.backtest import STRATEGIES, INTEGER_PARAMS, Sweep, load_closes, parse_values
+from utils.workers import REST_POOL, CancelToken
+from utils.ratelimit import USER
+from config import COLORS, SYMBOLS, CHART_INTERVALS
+
+DEFAULT_GRIDS = {
+    'rsi_ma': {'ma': '5-200/5', 'rsi_low': '20-35/5', 'rsi_high': '60-80/5'},
+    'ma_cross': {'fast': '5-50/5', 'slow': '50-200/10'},
+    'bollinger': {'period': '10-100/10', 'num_std': '1.5-3/0.5'},
+}
+
+COLUMNS = [
+    ('return', "Return", "{:.1%}"),
+    ('sharpe', "Sharpe", "{:.2f}"),
+    ('max_drawdown', "Max DD", "{:.1%}"),
+    ('trades', "Trades", "{:d}"),
+    ('win_rate', "Win %", "{:.0%}"),
+    ('exposure', "Exposure", "{:.0%}"),
+]
+
+
+class BacktestWindow:
+    """Run parameter sweeps of the built-in strategies over stored candles."""
+
+    # Milliseconds between progress checks while a sweep runs
+    refresh_interval = 250
+    # Best results listed
+    max_rows = 100
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.token = CancelToken()
+        self.sweep = None
+        self.sweep_params = ()
+        self.after_id = None
+        self.shown = None
+        self.sort_key = 'sharpe'
+        self.param_vars = {}
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Backtest")
+        self.window.geometry("760x560")
+        self.window.configure(bg=COLORS['bg_light'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = ttk.Frame(self.window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        settings = ttk.Frame(frame)
+        settings.pack(fill=tk.X)
+        self.symbol_var = tk.StringVar(value=SYMBOLS[0]['symbol'])
+        self.interval_var = tk.StringVar(value='1m')
+        self.strategy_var = tk.StringVar(value='rsi_ma')
+        self.fee_var = tk.StringVar(value='10')
+        for label, var, values, width in [
+            ("Symbol:", self.symbol_var, [s['symbol'] for s in SYMBOLS], 10),
+            ("Interval:", self.interval_var, CHART_INTERVALS, 5),
+            ("Strategy:", self.strategy_var, list(STRATEGIES), 10),
+        ]:
+            ttk.Label(settings, text=label).pack(side=tk.LEFT)
+            combo = ttk.Combobox(settings, textvariable=var, values=values, width=width)
+            combo.pack(side=tk.LEFT, padx=(2, 10))
+        self.strategy_combo = combo
+        self.strategy_combo.config(state='readonly')
+        self.strategy_combo.bind('<<ComboboxSelected>>', lambda e: self.show_params())
+        ttk.Label(settings, text="Fee (bps):").pack(side=tk.LEFT)
+        ttk.Entry(settings, textvariable=self.fee_var, width=5).pack(side=tk.LEFT, padx=2)
+
+        self.params_frame = ttk.Frame(frame)
+        self.params_frame.pack(fill=tk.X, pady=5)
+
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X)
+        self.run_button = ttk.Button(buttons, text="Run sweep", command=self.run)
+        self.run_button.pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Cancel", command=self.cancel).pack(side=tk.LEFT, padx=5)
+        self.status_label = ttk.Label(buttons, text='Ranges as "start-stop/step" or "a, b, c"',
+                                      font=("Arial", 8))
+        self.status_label.pack(side=tk.LEFT, padx=10)
+
+        self.tree = ttk.Treeview(frame, columns=[key for key, _, _ in COLUMNS])
+        self.tree.heading('#0', text="Parameters")
+        self.tree.column('#0', width=200)
+        for key, text, _ in COLUMNS:
+            self.tree.heading(key, text=text, command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=80, anchor=tk.E)
+        self.tree.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+
+        self.show_params()
+
+    def show_params(self):
+        """One range entry per parameter of the chosen strategy."""
+        for widget in self.params_frame.winfo_children():
+            widget.destroy()
+        strategy = self.strategy_var.get()
+        self.param_vars = {}
+        for name in STRATEGIES[strategy]:
+            ttk.Label(self.params_frame, text=f"{name}:").pack(side=tk.LEFT)
+            var = tk.StringVar(value=DEFAULT_GRIDS[strategy][name])
+            ttk.Entry(self.params_frame, textvariable=var, width=14).pack(side=tk.LEFT, padx=(2, 10))
+            self.param_vars[name] = var
+
+    def grid(self):
+        return {name: parse_values(var.get(), int if name in INTEGER_PARAMS else float)
+                for name, var in self.param_vars.items()}
+
+    def run(self):
+        try:
+            grid = self.grid()
+            fee = float(self.fee_var.get())
+        except ValueError as e:
+            self.status_label.config(text=f"Error: {e}")
+            return
+        self.cancel()
+        self.token = CancelToken()
+        symbol, interval, strategy = self.symbol_var.get(), self.interval_var.get(), self.strategy_var.get()
+        self.status_label.config(text=f"Loading {symbol.upper()} {interval} candles...")
+        REST_POOL.run(self.token, self.window,
+                      lambda closes: self.start_sweep(closes, strategy, grid, interval, fee),
+                      load_closes, symbol, interval, priority=USER)
+
+    def start_sweep(self, closes, strategy, grid, interval, fee):
+        if len(closes) < 50:
+            self.status_label.config(text="Not enough candles; run download.py first")
+            return
+        self.sweep = Sweep(closes, strategy, grid, interval, fee)
+        self.sweep_params = STRATEGIES[strategy]
+        self.shown = None
+        self.status_label.config(text=f"{len(closes):,} candles, {self.sweep.total} parameter sets")
+        if self.after_id is None:
+            self.refresh()
+
+    def refresh(self):
+        """Show progress and the best results so far."""
+        if self.sweep is None:
+            self.after_id = None
+            return
+        done, total = self.sweep.progress()
+        finished = self.sweep.done()
+        self.after_id = None if finished else self.window.after(self.refresh_interval, self.refresh)
+        self.run_button.config(text="Run sweep" if finished else f"Running {done}/{total}")
+        if done != self.shown:
+            self.shown = done
+            self.show_results()
+
+    def sort_by(self, key):
+        self.sort_key = key
+        self.show_results()
+
+    def show_results(self):
+        if self.sweep is None:
+            return
+        # Lower is better only for drawdown
+        sign = 1 if self.sort_key == 'max_drawdown' else -1
+        results = sorted(self.sweep.results(), key=lambda r: sign * r[1][self.sort_key])
+        self.tree.delete(*self.tree.get_children())
+        for params, metrics in results[:self.max_rows]:
+            label = ", ".join(f"{name}={value:g}" for name, value in zip(self.sweep_params, params))
+            self.tree.insert('', tk.END, text=label,
+                             values=[fmt.format(metrics[key]) for key, _, fmt in COLUMNS])
+
+    def cancel(self):
+        self.token.cancel()
+        if self.sweep:
+            self.sweep.cancel()
+        self.run_button.config(text="Run sweep")
+
+    def close(self):
+        self.cancel()
+        if self.after_id:
+            self.window.after_cancel(self.after_id)
+            self.after_id = None
+        self.window.destroy()
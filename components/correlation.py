@@ -0,0 +1,157 @@
+import tkinter as tk
+from tkinter import ttk
+from utils.correlation import CorrelationFeed
+from config import COLORS, SYMBOLS, CHART_INTERVALS
+
+
+def corr_color(value):
+    """Red for negative, white for none, green for positive correlation."""
+    if value != value:
+        return '#DDDDDD'
+    shade = int(255 * (1 - min(1.0, abs(value))))
+    if value >= 0:
+        return f'#{shade:02x}ff{shade:02x}'
+    return f'#ff{shade:02x}{shade:02x}'
+
+
+class CorrelationWindow:
+    """Rolling return correlations and realized volatility across the configured symbols."""
+
+    # Milliseconds between checks for a newly closed candle
+    refresh_interval = 1000
+    # Pixels per matrix cell; values are only written in cells at least this big
+    cell_size = 44
+
+    def __init__(self, parent, symbols=None):
+        self.parent = parent
+        self.symbols = [s['symbol'] for s in (symbols or SYMBOLS)]
+        self.feed = None
+        self.after_id = None
+        self.version = None
+        self.cells = []
+        self.corr = None
+        self.vol = None
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Correlation & Volatility")
+        self.window.configure(bg=COLORS['bg_light'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = ttk.Frame(self.window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        controls = ttk.Frame(frame)
+        controls.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(controls, text="Interval:").pack(side=tk.LEFT)
+        self.interval_var = tk.StringVar(value='1m')
+        interval_combo = ttk.Combobox(controls, textvariable=self.interval_var, values=CHART_INTERVALS,
+                                      state='readonly', width=5)
+        interval_combo.pack(side=tk.LEFT, padx=(2, 10))
+        interval_combo.bind('<<ComboboxSelected>>', lambda e: self.restart())
+        ttk.Label(controls, text="Window (candles):").pack(side=tk.LEFT)
+        self.window_var = tk.StringVar(value='60')
+        window_entry = ttk.Entry(controls, textvariable=self.window_var, width=6)
+        window_entry.pack(side=tk.LEFT, padx=2)
+        window_entry.bind('<Return>', lambda e: self.restart())
+
+        self.status_label = ttk.Label(controls, text="", font=("Arial", 8))
+        self.status_label.pack(side=tk.RIGHT)
+
+        # Matrix, plus a volatility column, drawn once and recoloured in place
+        n = len(self.symbols)
+        size = self.cell_size if n <= 16 else max(8, 700 // n)
+        self.size = size
+        label_width = 70
+        self.canvas = tk.Canvas(frame, bg='white', highlightthickness=0,
+                                width=label_width + (n + 1) * size + 10,
+                                height=label_width + n * size + 10)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind('<Motion>', self.on_motion)
+        self.label_width = label_width
+
+        names = [s.upper().replace('USDT', '') for s in self.symbols]
+        small = ("Arial", 7 if size < self.cell_size else 8)
+        for i, name in enumerate(names):
+            y = label_width + i * size + size / 2
+            x = label_width + i * size + size / 2
+            self.canvas.create_text(label_width - 4, y, text=name, anchor=tk.E, font=small)
+            self.canvas.create_text(x, label_width - 4, text=name, anchor=tk.S, font=small, angle=90)
+        self.canvas.create_text(label_width + n * size + size / 2, label_width - 4, text="Vol",
+                                anchor=tk.S, font=small)
+
+        for i in range(n):
+            row = []
+            for j in range(n + 1):
+                x0, y0 = label_width + j * size, label_width + i * size
+                rect = self.canvas.create_rectangle(x0, y0, x0 + size, y0 + size,
+                                                    fill='#DDDDDD', outline='white')
+                text = self.canvas.create_text(x0 + size / 2, y0 + size / 2, text="",
+                                               font=("Arial", 8)) if size >= self.cell_size else None
+                row.append((rect, text))
+            self.cells.append(row)
+
+        self.restart()
+
+    def restart(self):
+        """Start a new feed with the chosen interval and window."""
+        try:
+            window = max(5, int(self.window_var.get()))
+        except ValueError:
+            window = 60
+            self.window_var.set(str(window))
+        if self.feed:
+            self.feed.stop()
+        self.feed = CorrelationFeed(self.symbols, self.interval_var.get(), window)
+        self.feed.start()
+        self.version = None
+        self.status_label.config(text="Loading candles...")
+        if self.after_id is None:
+            self.refresh()
+
+    def refresh(self):
+        """Recolour the matrix when a candle has closed."""
+        self.after_id = self.window.after(self.refresh_interval, self.refresh)
+        version, corr, vol, count = self.feed.snapshot()
+        if version == self.version:
+            return
+        self.version = version
+        self.corr, self.vol = corr, vol
+
+        n = len(self.symbols)
+        for i in range(n):
+            for j in range(n):
+                rect, text = self.cells[i][j]
+                self.canvas.itemconfig(rect, fill=corr_color(corr[i, j]))
+                if text:
+                    self.canvas.itemconfig(text, text="" if corr[i, j] != corr[i, j] else f"{corr[i, j]:.2f}")
+            rect, text = self.cells[i][n]
+            self.canvas.itemconfig(rect, fill='#F0F0FF')
+            if text:
+                self.canvas.itemconfig(text, text=f"{vol[i]:.0%}")
+        self.status_label.config(
+            text=f"{count} returns of {self.feed.interval}, volatility annualized")
+
+    def on_motion(self, event):
+        """Show the value under the pointer, for matrices too big to label."""
+        if self.corr is None:
+            return
+        n = len(self.symbols)
+        i = int((event.y - self.label_width) // self.size)
+        j = int((event.x - self.label_width) // self.size)
+        if not (0 <= i < n and 0 <= j <= n):
+            return
+        row = self.symbols[i].upper()
+        if j == n:
+            text = f"{row} volatility {self.vol[i]:.1%}"
+        else:
+            text = f"{row} / {self.symbols[j].upper()} correlation {self.corr[i, j]:.3f}"
+        self.status_label.config(text=text)
+
+    def close(self):
+        if self.after_id:
+            self.window.after_cancel(self.after_id)
+            self.after_id = None
+        if self.feed:
+            self.feed.stop()
+            self.feed = None
+        self.window.destroy()
@@ -0,0 +1,100 @@
+import tkinter as tk
+from tkinter import ttk, filedialog
+from config import COLORS
+
+
+class DiagnosticsWindow:
+    """Live view of event-loop lag, per-panel callbacks and profiler output."""
+
+    # Milliseconds between refreshes of the window
+    refresh_interval = 1000
+
+    def __init__(self, parent, diagnostics):
+        self.diagnostics = diagnostics
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Diagnostics")
+        self.window.geometry("820x620")
+        self.window.configure(bg=COLORS['bg_light'])
+
+        frame = ttk.Frame(self.window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        self.lag_label = ttk.Label(frame, text="", font=("Consolas", 9))
+        self.lag_label.pack(anchor=tk.W)
+
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X, pady=5)
+        self.sampler_button = ttk.Button(buttons, command=self.toggle_sampler)
+        self.sampler_button.pack(side=tk.LEFT)
+        self.cprofile_button = ttk.Button(buttons, command=self.toggle_cprofile)
+        self.cprofile_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Reset counters", command=self.reset).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Export...", command=self.export).pack(side=tk.RIGHT)
+
+        columns = ('pending', 'runs', 'total', 'mean', 'max')
+        self.tree = ttk.Treeview(frame, columns=columns, height=10)
+        self.tree.heading('#0', text="Callback")
+        self.tree.column('#0', width=330)
+        for column, text in zip(columns, ("Pending", "Runs", "Total ms", "Mean ms", "Max ms")):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=80, anchor=tk.E)
+        self.tree.pack(fill=tk.X)
+
+        self.profile_text = tk.Text(frame, font=("Consolas", 9), bg='white', wrap='none')
+        self.profile_text.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+
+        self.status_label = ttk.Label(frame, text="", font=("Arial", 8))
+        self.status_label.pack(anchor=tk.W)
+
+        self.refresh()
+
+    def refresh(self):
+        """Repaint every refresh_interval ms while the window is open."""
+        if not self.window.winfo_exists():
+            return
+        self.window.after(self.refresh_interval, self.refresh)
+        self.update_view()
+
+    def update_view(self):
+        diagnostics = self.diagnostics
+        if diagnostics.callbacks.installed:
+            self.lag_label.config(text=diagnostics.lag_text())
+        else:
+            self.lag_label.config(text="Event loop monitoring is off")
+        self.sampler_button.config(
+            text="Stop sampling" if diagnostics.sampler.running else "Start sampling profiler")
+        self.cprofile_button.config(
+            text="Stop cProfile" if diagnostics.profile_running else "Start cProfile")
+
+        self.tree.delete(*self.tree.get_children())
+        for name, stat in diagnostics.callbacks.rows():
+            mean = stat.total_ms / stat.runs if stat.runs else 0.0
+            self.tree.insert('', tk.END, text=name, values=(
+                stat.pending, stat.runs, f"{stat.total_ms:.1f}", f"{mean:.2f}", f"{stat.max_ms:.1f}"))
+
+        text = "Sampling profiler\n" + diagnostics.sampler.top() + "\n\ncProfile\n" + diagnostics.cprofile_text()
+        self.profile_text.delete(1.0, tk.END)
+        self.profile_text.insert(tk.END, text)
+
+    def toggle_sampler(self):
+        self.diagnostics.toggle_sampler()
+        self.update_view()
+
+    def toggle_cprofile(self):
+        self.diagnostics.toggle_cprofile()
+        self.update_view()
+
+    def reset(self):
+        self.diagnostics.callbacks.reset()
+        self.diagnostics.lag.samples.clear()
+        self.update_view()
+
+    def export(self):
+        path = filedialog.asksaveasfilename(parent=self.window, defaultextension='.txt',
+                                            initialfile='diagnostics.txt',
+                                            filetypes=[("Text", "*.txt"), ("All files", "*")])
+        if not path:
+            return
+        written = self.diagnostics.export(path)
+        self.status_label.config(text="Saved " + ", ".join(written) if written else "Export failed")
@@ -1,28 +1,79 @@
+import threading
+from collections import deque
 import tkinter as tk
 from tkinter import ttk
-import threading
 from datetime import datetime
-from utils.binance_api import get_recent_trades
+from utils.binance_api import BinanceWebSocket, get_recent_trades
+from utils.workers import REST_POOL, CancelToken
+from utils.symbols import UNIVERSE
+from utils.tape import TradeTape
+from utils.metrics import METRICS
 from config import COLORS
+
+SIDES = {'All': None, 'Buys': 'buy', 'Sells': 'sell'}
+
+
+def load_recent_trades(symbol, limit):
+    """Recent trades to seed the tape; an empty list when the fetch fails."""
+    return get_recent_trades(symbol, limit) or []
+
+
 class MarketTrade:
+    # Milliseconds between repaints of the visible rows
+    refresh_interval = 250
+    # Trades fetched over REST to fill the tape before the stream takes over
+    seed_limit = 1000
+    
     def __init__(self, parent, symbol):
         self.parent = parent
         self.symbol = symbol.upper()
         self.is_active = False
+        self.token = CancelToken()
+        self.after_id = None
+        self.ws_manager = None
+        
+        # Every trade since the panel started, newest overwriting oldest
+        self.tape = TradeTape()
+        # Stream trades held back until the seed is in; older ones would be overwritten anyway
+        self.pending = deque(maxlen=self.tape.capacity)
+        self.seeded = False
+        self.seed_lock = threading.Lock()
         
-        # Recent trades data
-        self.recent_trades = []
+        # Filtered view: ring positions newest first, and the first row shown
+        self.selection = None
+        self.selection_key = None
+        self.first_row = 0
+        self.visible_rows = 15
         
         # Create UI
         self.frame = ttk.LabelFrame(parent, text=f"Recent Trades - {self.symbol}", 
                                    padding=5)
         
+        # Filters
+        filter_frame = ttk.Frame(self.frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(filter_frame, text="Min amount:", font=("Arial", 8)).pack(side=tk.LEFT)
+        self.min_qty_var = tk.StringVar()
+        min_qty_entry = ttk.Entry(filter_frame, textvariable=self.min_qty_var, width=8)
+        min_qty_entry.pack(side=tk.LEFT, padx=(2, 8))
+        min_qty_entry.bind('<KeyRelease>', lambda e: self.on_filter_change())
+        
+        self.side_var = tk.StringVar(value='All')
+        side_combo = ttk.Combobox(filter_frame, textvariable=self.side_var, values=list(SIDES),
+                                  state='readonly', width=6)
+        side_combo.pack(side=tk.LEFT)
+        side_combo.bind('<<ComboboxSelected>>', lambda e: self.on_filter_change())
+        
+        self.count_label = ttk.Label(filter_frame, text="", font=("Arial", 8))
+        self.count_label.pack(side=tk.RIGHT)
+        
         # Header 
         header_frame = ttk.Frame(self.frame)
         header_frame.pack(fill=tk.X, pady=(0, 5))
         
         headers = [
-            ("Price (USDT)", 15),
+            (f"Price ({UNIVERSE.quote(self.symbol)})", 15),
             ("Amount", 12), 
             ("Time", 10)
             ]
@@ -34,20 +85,25 @@ class MarketTrade:
         trades_frame = ttk.Frame(self.frame)
         trades_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Create text widget for trades
+        # Only the rows in view exist in the text widget; the scrollbar
+        # stands for the whole filtered tape
         self.trades_text = tk.Text(trades_frame, 
-                                  height=15, 
+                                  height=self.visible_rows, 
                                   width=45,
                                   font=("Consolas", 9),
                                   bg='white',
                                   state='disabled')
         
         # Add scrollbar
-        scrollbar = ttk.Scrollbar(trades_frame, orient="vertical", command=self.trades_text.yview)
-        self.trades_text.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(trades_frame, orient="vertical", command=self.on_scrollbar)
         
         self.trades_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.trades_text.bind('<MouseWheel>', self.on_mousewheel)
+        self.trades_text.bind('<Button-4>', lambda e: self.scroll_to(self.first_row - 3))
+        self.trades_text.bind('<Button-5>', lambda e: self.scroll_to(self.first_row + 3))
+        self.trades_text.bind('<Configure>', self.on_resize)
         
         # Configure text tags for colors
         self.trades_text.tag_config('buy', foreground=COLORS['profit'])     
@@ -58,84 +114,168 @@ class MarketTrade:
         self.status_label.pack(pady=5)
     
     def start(self):
-        """Start auto-refresh."""
+        """Seed the tape over REST, then follow the trade stream."""
         self.is_active = True
-        self.refresh_trades()
+        self.token = CancelToken()
+        self.ws_manager = BinanceWebSocket(
+            on_message_callback=self.on_trade,
+            on_error_callback=lambda err: print(f"Trade stream error: {err}")
+        )
+        self.ws_manager.connect_single(f"{self.symbol.lower()}@trade")
+        REST_POOL.run(self.token, self.parent, self.update_trades_display,
+                      load_recent_trades, self.symbol, self.seed_limit)
         self.auto_refresh()
     
     def stop(self):
-        """Stop auto-refresh."""
+        """Stop the stream and repainting."""
         self.is_active = False
+        self.token.cancel()
+        if self.ws_manager:
+            self.ws_manager.disconnect()
+            self.ws_manager = None
+        if self.after_id:
+            self.parent.after_cancel(self.after_id)
+            self.after_id = None
+    
+    def on_trade(self, msg):
+        """Stream thread: add the trade, holding it back until the REST seed is in."""
+        with self.seed_lock:
+            if not self.seeded:
+                self.pending.append(msg)
+                return
+        self.tape.append_stream(msg)
     
     def auto_refresh(self):
-        """Auto-refresh every 2 seconds."""
+        """Repaint every refresh_interval ms if the tape or filters changed."""
         if not self.is_active:
             return
         
-        self.parent.after(2000, self.auto_refresh)
-        self.refresh_trades()
-    
-    def refresh_trades(self):
-        """Fetch recent trades from Binance."""
-        def fetch_data():
-            try:
-                trades_data = get_recent_trades(self.symbol, limit=40)
-                
-                if trades_data:  
-                    self.parent.after(0, self.update_trades_display, trades_data)
-                    
-            except Exception as e:
-                print(f"Error fetching trades: {e}")
-        
-        # Run in background thread
-        threading.Thread(target=fetch_data, daemon=True).start()
-    
-    def update_trades_display(self, trades_data):
-        """Update the trades display."""
-        if not self.is_active:
+        self.after_id = self.parent.after(self.refresh_interval, self.auto_refresh)
+        self.render()
+    
+    def get_snapshot(self):
+        """Return the last trades shown, for the session snapshot."""
+        if not len(self.tape):
+            return None
+        return [
+            {key: trade[key] for key in ('price', 'qty', 'time', 'isBuyerMaker')}
+            for trade in self.tape.latest(30)
+        ]
+    
+    def show_snapshot(self, trades_data):
+        """Paint last-session trades, marked stale until live data arrives."""
+        self.update_trades_display(trades_data, stale=True)
+    
+    def update_trades_display(self, trades_data, stale=False):
+        """Show a stale list of trades, or seed the tape with fresh REST trades."""
+        if stale:
+            self.status_label.config(text="Last session (stale)")
+            rows = [(float(t['price']), float(t['qty']), t['time'], not t['isBuyerMaker'])
+                    for t in trades_data[:self.visible_rows]]
+            self.show_rows(rows)
             return
         
-        # Update status
-        self.status_label.config(text=f"Last update: {datetime.now().strftime('%H:%M:%S')}")
+        if not self.is_active:
+            return
+        # REST trades come oldest first; buffered stream trades follow on.
+        # A failed seed still releases them, the tape just starts later.
+        with self.seed_lock:
+            self.tape.extend_rest(trades_data)
+            for msg in self.pending:
+                self.tape.append_stream(msg)
+            self.pending.clear()
+            self.seeded = True
+        self.render()
+    
+    def filters(self):
+        """Current filter settings as keyword arguments for TradeTape.select."""
+        try:
+            min_qty = float(self.min_qty_var.get()) if self.min_qty_var.get().strip() else None
+        except ValueError:
+            min_qty = None
+        return {'min_qty': min_qty, 'side': SIDES[self.side_var.get()]}
+    
+    def on_filter_change(self):
+        self.selection_key = None
+        self.first_row = 0
+        self.render()
+    
+    def refilter(self):
+        """Recompute the filtered positions if the tape or filters changed."""
+        filters = self.filters()
+        key = (self.tape.version, tuple(filters.items()))
+        if key == self.selection_key:
+            return
+        old_count = len(self.selection) if self.selection is not None else 0
+        self.selection, version = self.tape.select(**filters)
+        self.selection_key = (version, tuple(filters.items()))
+        # Keep a scrolled-back view on the same trades as new ones arrive
+        if self.first_row > 0:
+            self.first_row += max(0, len(self.selection) - old_count)
+    
+    @METRICS.timed('dashboard_panel_render_seconds', 'trades')
+    def render(self):
+        """Draw only the rows inside the viewport."""
+        # Leave a stale snapshot up until the first live trade
+        if not self.trades_text.winfo_exists() or not len(self.tape):
+            return
+        self.refilter()
+        total = len(self.selection)
+        self.first_row = max(0, min(self.first_row, total - self.visible_rows))
+        positions = self.selection[self.first_row:self.first_row + self.visible_rows]
+        self.show_rows(self.tape.rows(positions))
         
-        # Clear text widget
+        if total:
+            self.scrollbar.set(self.first_row / total,
+                               min(1.0, (self.first_row + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0, 1)
+        self.count_label.config(text=f"{total:,} / {len(self.tape):,} trades")
+        self.status_label.config(
+            text="Live" if self.first_row == 0 else f"Scrolled back {self.first_row:,} trades")
+    
+    def show_rows(self, rows):
+        """Replace the text with (price, qty, time_ms, is_buy) rows."""
         self.trades_text.config(state='normal')
         self.trades_text.delete(1.0, tk.END)
         
-        # Add trades
-        for trade in reversed(trades_data[:30]):
-            try:
-                # Format time
-                trade_time = datetime.fromtimestamp(trade['time'] / 1000).strftime("%H:%M:%S")
-                
-                # Get data
-                price = float(trade['price'])
-                amount = float(trade['qty'])
-                
-                # Determine if buy or sell
-                # ❗️ สำคัญ: ใน Binance isBuyerMaker มีความหมายต่างกัน
-                # isBuyerMaker = True → ผู้ซื้อเป็น maker = SELL order (แดง)
-                # isBuyerMaker = False → ผู้ขายเป็น maker = BUY order (เขียว)
-                is_buy = not trade['isBuyerMaker']  
-                tag = 'buy' if is_buy else 'sell'
-                
-                # Format line
-                price_str = f"{price:>12,.2f}"
-                amount_str = f"{amount:>10,.4f}"
-                time_str = f"{trade_time:>10}"
-                
-                line = f"{price_str} | {amount_str} | {time_str}\n"
-                
-                # Insert with color tag
-                self.trades_text.insert(tk.END, line, tag)
-                
-            except Exception as e:
-                print(f"Error processing trade: {e}")
-        
-        # Scroll to top
-        self.trades_text.see(1.0)
+        for price, amount, time_ms, is_buy in rows:
+            trade_time = datetime.fromtimestamp(time_ms / 1000).strftime("%H:%M:%S")
+            tag = 'buy' if is_buy else 'sell'
+            
+            # Format line
+            price_str = f"{UNIVERSE.format_price(self.symbol, price):>12}"
+            amount_str = f"{UNIVERSE.format_qty(self.symbol, amount):>10}"
+            time_str = f"{trade_time:>10}"
+            
+            self.trades_text.insert(tk.END, f"{price_str} | {amount_str} | {time_str}\n", tag)
+        
         self.trades_text.config(state='disabled')
     
+    def scroll_to(self, row):
+        self.first_row = max(0, row)
+        self.render()
+    
+    def on_scrollbar(self, *args):
+        """Translate scrollbar moves into a first row over the whole filtered tape."""
+        total = len(self.selection) if self.selection is not None else 0
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.scroll_to(self.first_row + int(args[1]) * step)
+    
+    def on_mousewheel(self, event):
+        self.scroll_to(self.first_row - int(event.delta / 120) * 3)
+        return 'break'
+    
+    def on_resize(self, event):
+        line_height = max(1, self.trades_text.tk.call('font', 'metrics', self.trades_text.cget('font'), '-linespace'))
+        rows = max(1, event.height // line_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+    
     def pack(self, **kwargs):
         self.frame.pack(**kwargs)
     
@@ -146,4 +286,4 @@ class MarketTrade:
         self.frame.grid(**kwargs)
     
     def grid_forget(self):
-        self.frame.grid_forget()
\ No newline at end of file
+        self.frame.grid_forget()
@@ -1,24 +1,47 @@
 import tkinter as tk
 from tkinter import ttk
-from utils.binance_api import get_order_book
-import threading
-import time
+from utils.local_book import DepthSync, BookMetrics
+from utils.symbols import UNIVERSE
+from utils.metrics import METRICS
+from utils.models import BookSide
 
 class OrderBookPanel:
+    # Milliseconds between repaints; the book itself follows every depth diff
+    refresh_interval = 250
+    
     def __init__(self, parent, symbol):
         self.parent = parent
         self.symbol = symbol
         self.is_active = False
+        self.sync = None
+        self.book_metrics = None
+        self.dirty = False
+        self.after_id = None
+        # Best levels shown, refilled in place; drawn holds each row's (price, qty) on screen
+        self.bids = BookSide(10)
+        self.asks = BookSide(10)
+        self.has_live = False
+        self.drawn = [None] * 20
+        self.metrics = None
+        self.metrics_listeners = []
+        self.title = f"Order Book - {symbol.upper()}"
         
         # Create UI
-        self.frame = ttk.LabelFrame(parent, text=f"Order Book - {symbol.upper()}", 
-                                   padding=10)
+        self.frame = ttk.LabelFrame(parent, text=self.title, padding=10)
+        
+        # Microstructure metrics
+        self.metrics_label = ttk.Label(self.frame, text="Spread -- | Mid -- | Micro --",
+                                       font=("Consolas", 9))
+        self.metrics_label.pack(anchor=tk.W)
+        self.depth_label = ttk.Label(self.frame, text="Imbalance -- | Depth --",
+                                     font=("Consolas", 9), foreground="gray")
+        self.depth_label.pack(anchor=tk.W, pady=(0, 5))
         
         # Create headers
         header_frame = ttk.Frame(self.frame)
         header_frame.pack(fill=tk.X)
         
-        ttk.Label(header_frame, text="Price (USDT)", font=("Arial", 10, "bold"),
+        ttk.Label(header_frame, text=f"Price ({UNIVERSE.quote(symbol)})", font=("Arial", 10, "bold"),
                  width=15).pack(side=tk.LEFT, padx=2)
         ttk.Label(header_frame, text="Amount", font=("Arial", 10, "bold"),
                  width=15).pack(side=tk.LEFT, padx=2)
@@ -79,69 +102,109 @@ class OrderBookPanel:
         
 
     def start(self):
-        """Start auto-refresh."""
+        """Sync the local book from the depth stream and start repainting."""
         self.is_active = True
-        self.refresh_data()
+        self.sync = DepthSync(self.symbol)
+        self.book_metrics = BookMetrics(self.sync.book)
+        self.sync.add_listener(self.on_book_event)
+        self.sync.start()
         self.auto_refresh()
     
     def stop(self):
-        """Stop auto-refresh."""
+        """Stop the depth stream and repainting."""
         self.is_active = False
+        if self.sync:
+            self.sync.stop()
+            self.sync = None
+        if self.after_id:
+            self.parent.after_cancel(self.after_id)
+            self.after_id = None
+    
+    def on_book_event(self, event, data):
+        # Stream thread: just note the change, the Tk loop repaints
+        self.dirty = True
     
     def auto_refresh(self):
-        """Auto-refresh order book every 5 seconds."""
+        """Repaint every refresh_interval ms if the book changed."""
         if not self.is_active:
             return
         
-        self.refresh_data()
-        self.parent.after(5000, self.auto_refresh)
+        if self.dirty and self.sync:
+            book = self.sync.book
+            with self.sync.lock:
+                self.dirty = False
+                self.bids.fill(book.bid_prices, book.bids, descending=True)
+                self.asks.fill(book.ask_prices, book.asks, descending=False)
+                metrics = self.book_metrics.snapshot()
+            self.update_display()
+            self.update_metrics(metrics)
+        self.after_id = self.parent.after(self.refresh_interval, self.auto_refresh)
     
-    def refresh_data(self):
-        """Fetch and display order book data."""
-        def fetch_and_update():
-            data = get_order_book(self.symbol, limit=10)
-            if data:
-                self.parent.after(0, self.update_display, data)
-        
-        threading.Thread(target=fetch_and_update, daemon=True).start()
+    def add_metrics_listener(self, listener):
+        """Call listener(symbol, metrics) on the Tk thread after each repaint."""
+        self.metrics_listeners.append(listener)
+    
+    def update_metrics(self, metrics):
+        """Show spread, mid, microprice, imbalance and band depth."""
+        if metrics is None or not self.metrics_label.winfo_exists():
+            return
+        self.metrics = metrics
+        fmt = lambda price: UNIVERSE.format_price(self.symbol, price)
+        self.metrics_label.config(
+            text=f"Spread {fmt(metrics['spread'])} ({metrics['spread_bps']:.1f} bps) | "
+                 f"Mid {fmt(metrics['mid'])} | Micro {fmt(metrics['microprice'])}")
+        depth = "  ".join(f"±{bps}bp {UNIVERSE.format_qty(self.symbol, bid)}/{UNIVERSE.format_qty(self.symbol, ask)}"
+                          for bps, (bid, ask) in metrics['depth'].items())
+        self.depth_label.config(
+            text=f"Imbalance {metrics['imbalance']:+.0%} | {depth}",
+            foreground="green" if metrics['imbalance'] > 0 else "red")
+        for listener in self.metrics_listeners:
+            listener(self.symbol, metrics)
+    
+    def get_snapshot(self):
+        """Return the last book shown, for the session snapshot."""
+        if not self.has_live:
+            return None
+        return {
+            'bids': self.bids.levels(),
+            'asks': self.asks.levels(),
+        }
     
-    def update_display(self, data):
-        """Update order book display."""
+    def show_snapshot(self, data):
+        """Paint the last-session book, marked stale until live data arrives."""
+        self.bids.load(data.get('bids', []))
+        self.asks.load(data.get('asks', []))
+        self.update_display(stale=True)
+    
+    @METRICS.timed('dashboard_panel_render_seconds', 'orderbook')
+    def update_display(self, stale=False):
+        """Update order book display from the bid and ask sides; unchanged rows are left alone."""
         if not self.frame.winfo_exists():
             return  
         for price_label, amount_label, total_label in self.bid_labels + self.ask_labels:
             if not price_label.winfo_exists():
                 return
-        bids = data.get('bids', [])[:10]
-        asks = data.get('asks', [])[:10]
-        
-        # Update BIDS 
-        for i, (price_label, amount_label, total_label) in enumerate(self.bid_labels):
-            if i < len(bids):
-                price, amount = bids[i]
-                total = float(price) * float(amount)
-                price_label.config(text=f"{float(price):,.2f}", foreground="green")
-                amount_label.config(text=f"{float(amount):,.4f}")
-                total_label.config(text=f"{total:,.2f}")
-            else:
-                price_label.config(text="--")
-                amount_label.config(text="--")
-                total_label.config(text="--")
-        
-        # Update ASKS
-        asks_reversed = list(reversed(asks))
-        
-        for i, (price_label, amount_label, total_label) in enumerate(self.ask_labels):
-            if i < len(asks_reversed):
-                price, amount = asks_reversed[i]
-                total = float(price) * float(amount)
-                price_label.config(text=f"{float(price):,.2f}", foreground="red")
-                amount_label.config(text=f"{float(amount):,.4f}")
-                total_label.config(text=f"{total:,.2f}")
-            else:
+        if not stale:
+            self.has_live = True
+        self.frame.config(text=f"{self.title} (stale)" if stale else self.title)
+        
+        # Bids best first; asks in reverse, best last
+        rows = [(labels, self.bids, i, "green") for i, labels in enumerate(self.bid_labels)]
+        rows += [(labels, self.asks, self.asks.size - 1 - i, "red") for i, labels in enumerate(self.ask_labels)]
+        for row, ((price_label, amount_label, total_label), side, level, color) in enumerate(rows):
+            shown = (side.prices[level], side.qtys[level]) if 0 <= level < side.size else None
+            if shown == self.drawn[row]:
+                continue
+            self.drawn[row] = shown
+            if shown is None:
                 price_label.config(text="--")
                 amount_label.config(text="--")
                 total_label.config(text="--")
+                continue
+            price, amount = shown
+            price_label.config(text=UNIVERSE.format_price(self.symbol, price), foreground=color)
+            amount_label.config(text=UNIVERSE.format_qty(self.symbol, amount))
+            total_label.config(text=f"{side.totals[level]:,.2f}")
     
     def pack(self, **kwargs):
         self.frame.pack(**kwargs)
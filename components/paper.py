@@ -0,0 +1,177 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+from utils.paper import PaperExchange, BUY, SELL, LIMIT, MARKET
+from utils.symbols import UNIVERSE
+from config import COLORS, SYMBOLS
+
+ORDER_COLUMNS = [
+    ('side', "Side", 50),
+    ('type', "Type", 60),
+    ('price', "Price", 90),
+    ('qty', "Qty", 80),
+    ('filled', "Filled", 80),
+    ('queue', "Queue ahead", 90),
+    ('status', "Status", 110),
+]
+
+FILL_COLUMNS = [
+    ('time', "Time", 70),
+    ('side', "Side", 50),
+    ('price', "Price", 90),
+    ('qty', "Qty", 80),
+    ('liquidity', "Liquidity", 70),
+]
+
+
+class PaperTradingWindow:
+    """Place simulated orders filled against the live book of one symbol."""
+
+    # Milliseconds between repaints while orders or the book change
+    refresh_interval = 250
+
+    def __init__(self, parent, symbol=None):
+        self.parent = parent
+        self.exchange = None
+        self.after_id = None
+        self.version = None
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Paper Trading")
+        self.window.geometry("720x600")
+        self.window.configure(bg=COLORS['bg_light'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = ttk.Frame(self.window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        top = ttk.Frame(frame)
+        top.pack(fill=tk.X)
+        ttk.Label(top, text="Symbol:").pack(side=tk.LEFT)
+        self.symbol_var = tk.StringVar(value=symbol or SYMBOLS[0]['symbol'])
+        symbol_combo = ttk.Combobox(top, textvariable=self.symbol_var, values=[s['symbol'] for s in SYMBOLS],
+                                    width=10)
+        symbol_combo.pack(side=tk.LEFT, padx=(2, 10))
+        symbol_combo.bind('<<ComboboxSelected>>', lambda e: self.restart())
+        symbol_combo.bind('<Return>', lambda e: self.restart())
+        self.account_label = ttk.Label(top, text="", font=("Arial", 9))
+        self.account_label.pack(side=tk.LEFT, padx=10)
+
+        ticket = ttk.Frame(frame)
+        ticket.pack(fill=tk.X, pady=5)
+        self.side_var = tk.StringVar(value=BUY)
+        self.type_var = tk.StringVar(value=LIMIT)
+        self.price_var = tk.StringVar()
+        self.qty_var = tk.StringVar()
+        for value in (BUY, SELL):
+            ttk.Radiobutton(ticket, text=value.title(), value=value, variable=self.side_var).pack(side=tk.LEFT)
+        ttk.Combobox(ticket, textvariable=self.type_var, values=[LIMIT, MARKET], state='readonly',
+                     width=8).pack(side=tk.LEFT, padx=(10, 10))
+        ttk.Label(ticket, text="Price:").pack(side=tk.LEFT)
+        ttk.Entry(ticket, textvariable=self.price_var, width=12).pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(ticket, text="Qty:").pack(side=tk.LEFT)
+        ttk.Entry(ticket, textvariable=self.qty_var, width=10).pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Button(ticket, text="Place", command=self.place).pack(side=tk.LEFT)
+
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X)
+        ttk.Button(buttons, text="Cancel selected", command=self.cancel_selected).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Cancel all", command=self.cancel_all).pack(side=tk.LEFT, padx=5)
+        self.status_label = ttk.Label(buttons, text="", font=("Arial", 8))
+        self.status_label.pack(side=tk.LEFT, padx=10)
+
+        ttk.Label(frame, text="Open orders").pack(anchor=tk.W, pady=(8, 0))
+        self.orders_tree = self.make_tree(frame, ORDER_COLUMNS, "#")
+        ttk.Label(frame, text="Fills").pack(anchor=tk.W, pady=(8, 0))
+        self.fills_tree = self.make_tree(frame, FILL_COLUMNS, "Order")
+
+        self.restart()
+
+    def make_tree(self, parent, columns, first):
+        tree = ttk.Treeview(parent, columns=[key for key, _, _ in columns], height=8)
+        tree.heading('#0', text=first)
+        tree.column('#0', width=50)
+        for key, text, width in columns:
+            tree.heading(key, text=text)
+            tree.column(key, width=width, anchor=tk.E)
+        tree.pack(fill=tk.BOTH, expand=True)
+        return tree
+
+    def restart(self):
+        """Start a fresh paper account on the chosen symbol."""
+        symbol = self.symbol_var.get().strip().lower()
+        if not symbol:
+            return
+        if self.exchange:
+            self.exchange.stop()
+        self.exchange = PaperExchange(symbol).start()
+        self.version = None
+        self.status_label.config(text=f"Syncing {symbol.upper()} order book...")
+        if self.after_id is None:
+            self.refresh()
+
+    def place(self):
+        try:
+            qty = float(self.qty_var.get())
+            order_type = self.type_var.get()
+            price = float(self.price_var.get()) if order_type == LIMIT else None
+            order = self.exchange.place(self.side_var.get(), order_type, qty, price)
+        except ValueError as e:
+            self.status_label.config(text=f"Error: {e}")
+            return
+        self.status_label.config(text=f"Order {order.order_id} {order.status.lower().replace('_', ' ')}")
+
+    def selected_ids(self):
+        return [int(item) for item in self.orders_tree.selection()]
+
+    def cancel_selected(self):
+        for order_id in self.selected_ids():
+            self.exchange.cancel(order_id)
+
+    def cancel_all(self):
+        self.exchange.cancel_all()
+
+    def refresh(self):
+        """Repaint orders, fills and PnL when anything changed."""
+        self.after_id = self.window.after(self.refresh_interval, self.refresh)
+        exchange = self.exchange
+        if exchange.ready and self.status_label.cget('text').startswith("Syncing"):
+            self.status_label.config(text="Book synced")
+        data = exchange.snapshot()
+        if data['version'] == self.version:
+            return
+        self.version = data['version']
+        symbol = exchange.symbol
+        price = lambda value: "--" if value is None else UNIVERSE.format_price(symbol, value)
+        qty = lambda value: UNIVERSE.format_qty(symbol, value)
+
+        selected = set(self.orders_tree.selection())
+        self.orders_tree.delete(*self.orders_tree.get_children())
+        for order_id, side, order_type, order_price, order_qty, filled, queue, status in data['orders']:
+            self.orders_tree.insert('', tk.END, iid=str(order_id), text=str(order_id), values=[
+                side.title(), order_type.title(), price(order_price), qty(order_qty), qty(filled),
+                qty(queue), status.replace('_', ' ').title()])
+        self.orders_tree.selection_set([iid for iid in selected if self.orders_tree.exists(iid)])
+
+        self.fills_tree.delete(*self.fills_tree.get_children())
+        for time_ms, order_id, side, fill_price, fill_qty, maker in data['fills']:
+            self.fills_tree.insert('', tk.END, text=str(order_id), values=[
+                time.strftime('%H:%M:%S', time.localtime(time_ms / 1000)), side.title(),
+                price(fill_price), qty(fill_qty), "Maker" if maker else "Taker"])
+
+        shown = len(data['orders'])
+        more = f" ({data['open_count'] - shown} more open)" if data['open_count'] > shown else ""
+        self.account_label.config(
+            text=f"Position {qty(data['position'])} @ {price(data['avg_price'] or None)} | "
+                 f"Realized {data['realized']:,.2f} | Unrealized {data['unrealized']:,.2f} | "
+                 f"Fees {data['fees']:,.2f}{more}",
+            foreground="green" if data['pnl'] >= 0 else "red")
+
+    def close(self):
+        if self.after_id:
+            self.window.after_cancel(self.after_id)
+            self.after_id = None
+        if self.exchange:
+            self.exchange.stop()
+            self.exchange = None
+        self.window.destroy()
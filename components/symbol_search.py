@@ -0,0 +1,95 @@
+import tkinter as tk
+from tkinter import ttk
+from config import COLORS
+
+
+class SymbolSearch:
+    """Search-as-you-type symbol selector with a drop-down result list."""
+
+    MAX_RESULTS = 15
+
+    def __init__(self, parent, universe, on_select, width=15):
+        self.universe = universe
+        self.on_select = on_select
+        self.results = []
+        self.popup = None
+        self.listbox = None
+        self.selected_name = ""
+
+        self.var = tk.StringVar()
+        self.entry = ttk.Entry(parent, textvariable=self.var, width=width, font=("Arial", 11))
+
+        self.entry.bind('<KeyRelease>', self.on_key)
+        self.entry.bind('<Down>', lambda e: self.move(1))
+        self.entry.bind('<Up>', lambda e: self.move(-1))
+        self.entry.bind('<Return>', lambda e: self.choose())
+        self.entry.bind('<Escape>', lambda e: self.cancel())
+        self.entry.bind('<FocusIn>', lambda e: self.entry.select_range(0, tk.END))
+        self.entry.bind('<FocusOut>', lambda e: self.entry.after(150, self.cancel))
+
+    def pack(self, **kwargs):
+        self.entry.pack(**kwargs)
+
+    def set(self, name):
+        self.selected_name = name
+        self.var.set(name)
+
+    def on_key(self, event):
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        self.results = self.universe.search(self.var.get(), self.MAX_RESULTS)
+        if self.results:
+            self.show_popup()
+        else:
+            self.hide_popup()
+
+    def show_popup(self):
+        if self.popup is None:
+            self.popup = tk.Toplevel(self.entry)
+            self.popup.wm_overrideredirect(True)
+            self.listbox = tk.Listbox(self.popup, font=("Consolas", 10), bg='white',
+                                      selectbackground=COLORS['button_active'],
+                                      activestyle='none', height=self.MAX_RESULTS)
+            self.listbox.pack(fill=tk.BOTH, expand=True)
+            self.listbox.bind('<ButtonRelease-1>', lambda e: self.choose())
+
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self.popup.wm_geometry(f"+{x}+{y}")
+
+        self.listbox.delete(0, tk.END)
+        for info in self.results:
+            self.listbox.insert(tk.END, f"{info['name']:<16}{info['symbol'].upper()}")
+        self.listbox.config(height=len(self.results), width=30)
+        self.listbox.selection_set(0)
+        self.popup.lift()
+
+    def hide_popup(self):
+        if self.popup is not None:
+            self.popup.destroy()
+            self.popup = None
+            self.listbox = None
+
+    def move(self, step):
+        if not self.listbox:
+            return
+        selection = self.listbox.curselection()
+        i = (selection[0] if selection else -1) + step
+        i = max(0, min(i, len(self.results) - 1))
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(i)
+        self.listbox.see(i)
+
+    def choose(self):
+        if not self.listbox or not self.results:
+            return
+        selection = self.listbox.curselection()
+        info = self.results[selection[0] if selection else 0]
+        self.hide_popup()
+        self.set(info['name'])
+        self.on_select(info)
+
+    def cancel(self):
+        """Close the list and restore the current symbol's name."""
+        self.hide_popup()
+        self.var.set(self.selected_name)
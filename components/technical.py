@@ -1,23 +1,120 @@
+import itertools
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk
-from utils.binance_api import get_klines
-from utils.indicators import calculate_rsi, calculate_moving_average, calculate_bollinger_bands
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from utils.binance_api import BinanceWebSocket, get_klines, get_recent_trades
+from utils.indicators import INDICATORS, compute
+from utils.store import STORE
+from utils.workers import REST_POOL, CancelToken
+from utils.ratelimit import USER
+from utils.symbols import UNIVERSE
+from utils.local_book import DepthSync
+from utils.heatmap import DepthHeatmap
+from utils.volume_profile import VolumeProfile
+from utils.tape import TradeTape
+from utils.models import CandleSeries
+from utils.bars import BarBuilder, auto_size, load_trade_history
+from utils.metrics import METRICS
+from config import CHART_INTERVALS, INTERVAL_MS, LOCAL_BARS
+from datetime import datetime, timezone
 import numpy as np
-import threading
+
+
+def load_klines(symbol, interval, limit=100):
+    """Fetch candles, falling back to the local store when offline."""
+    klines = get_klines(symbol, interval, limit)
+    if not klines:
+        # Offline: fall back to candles seeded by download.py
+        klines = STORE.recent_klines(symbol, interval, limit)
+    return klines or None
+
+
+def load_recent_trades(symbol, limit):
+    """Recent trades to seed the tick chart; an empty list when the fetch fails."""
+    return get_recent_trades(symbol, limit) or []
+
+
+def load_stored_trades(symbol, start_ms):
+    """aggTrade prices and quantities since start_ms from the local store.
+
+    Returns None unless the store reaches back to start_ms, so a partial
+    download never replaces the candle-based profile.
+    """
+    start_day = datetime.fromtimestamp(start_ms / 1000, timezone.utc).date()
+    trades = STORE.read_agg_trades(symbol, start_day, datetime.now(timezone.utc).date())
+    times = trades['time']
+    if not len(times) or times[0] > start_ms + 60_000:
+        return None
+    keep = times >= start_ms
+    return trades['price'][keep], trades['qty'][keep]
+
 
 class TechnicalAnalysisPanel:
+    # Milliseconds between heatmap frames
+    heatmap_interval = 100
+    # Milliseconds between volume profile redraws
+    profile_interval = 1000
+    # Tick chart: milliseconds between frames (about 30 FPS) and the span shown
+    tick_interval = 33
+    tick_window = 300_000
+    # Local bars: milliseconds between redraws and the trade history backfilled
+    bars_interval = 500
+    bars_backfill_ms = 3_600_000
+    # Indicator values listed under the chart, one row per list: (indicator, params)
+    indicator_rows = [
+        [('rsi', {'period': 14}), ('ma', {'period': 20})],
+        [('bollinger', {'period': 20, 'num_std': 2})],
+    ]
+    
     def __init__(self, parent, symbol):
         self.parent = parent
         self.symbol = symbol
         self.is_active = False
+        self.token = CancelToken()
         self.current_interval = "1h"
+        # Candles on screen; candles_live once any came from the exchange or local bars
+        self.candles = CandleSeries(limit=1000)
+        self.candles_live = False
+        self.snapshot_after_id = None
+        self.title = f"Technical Analysis - {symbol.upper()}"
+        
+        # Liquidity heatmap behind the candles, fed by the local order book
+        self.heatmap = None
+        self.depth_sync = None
+        self.heatmap_dirty = False
+        self.heatmap_after_id = None
+        self.background = None
+        
+        # Volume-by-price beside the candles, topped up by the aggTrade stream
+        self.profile = VolumeProfile()
+        self.profile_version = None
+        self.profile_after_id = None
+        self.trade_ws = None
+        
+        # Tick chart mode: every trade from the trade stream over tick_window
+        self.tick_mode = False
+        self.tape = TradeTape(capacity=50_000)
+        self.tick_ws = None
+        self.tick_pending = []
+        self.tick_seeded = False
+        self.tick_lock = threading.Lock()
+        self.tick_after_id = None
+        self.tick_background = None
+        self.tick_version = None
+        self.tick_drawn_at = 0.0
+        
+        # Bars built locally from the aggTrade stream; stream trades wait in
+        # bars_pending until the backfill is in
+        self.bars = None
+        self.bars_pending = None
+        self.bars_lock = threading.Lock()
+        self.bars_version = None
+        self.bars_after_id = None
+        self.interval_label = self.current_interval
         
         # Create UI
-        self.frame = ttk.LabelFrame(parent, text=f"Technical Analysis - {symbol.upper()}", 
-                                   padding=10)
+        self.frame = ttk.LabelFrame(parent, text=self.title, padding=10)
         
         # Interval selector
         interval_frame = ttk.Frame(self.frame)
@@ -26,19 +123,35 @@ class TechnicalAnalysisPanel:
         ttk.Label(interval_frame, text="Interval:").pack(side=tk.LEFT, padx=(0, 5))
         
         self.interval_var = tk.StringVar(value="1h")
-        intervals = ["1m", "5m", "15m", "1h", "4h", "1d"]
-        
-        for interval in intervals:
+        for interval in CHART_INTERVALS:
             rb = ttk.Radiobutton(interval_frame, text=interval, value=interval,
                                 variable=self.interval_var,
                                 command=self.on_interval_change)
             rb.pack(side=tk.LEFT, padx=2)
+        ttk.Radiobutton(interval_frame, text="Tick", value='tick', variable=self.interval_var,
+                        command=self.on_interval_change).pack(side=tk.LEFT, padx=2)
+        
+        ttk.Label(interval_frame, text="Bars:").pack(side=tk.LEFT, padx=(10, 5))
+        self.bars_var = tk.StringVar()
+        bars_box = ttk.Combobox(interval_frame, textvariable=self.bars_var, values=list(LOCAL_BARS),
+                                state='readonly', width=11)
+        bars_box.pack(side=tk.LEFT)
+        bars_box.bind('<<ComboboxSelected>>', self.on_bars_selected)
+        
+        self.profile_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(interval_frame, text="Volume profile", variable=self.profile_var,
+                        command=self.on_profile_toggle).pack(side=tk.RIGHT)
+        
+        self.heatmap_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(interval_frame, text="Liquidity heatmap", variable=self.heatmap_var,
+                        command=self.on_heatmap_toggle).pack(side=tk.RIGHT)
         
         # Chart area
         self.chart_frame = ttk.Frame(self.frame)
         self.chart_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.figure = Figure(figsize=(8, 4), dpi=100)
+        # matplotlib is imported and the figure built on the first draw
+        self.figure = None
         self.canvas = None
         
         # Indicators panel
@@ -49,126 +162,607 @@ class TechnicalAnalysisPanel:
         indicators_grid = ttk.Frame(indicators_frame)
         indicators_grid.pack()
         
-        # Row 1
-        ttk.Label(indicators_grid, text="RSI (14):", font=("Arial", 9)).grid(
-            row=0, column=0, sticky=tk.W, padx=5, pady=2)
-        self.rsi_label = ttk.Label(indicators_grid, text="--", font=("Arial", 9, "bold"))
-        self.rsi_label.grid(row=0, column=1, sticky=tk.W, padx=5, pady=2)
-        
-        ttk.Label(indicators_grid, text="MA (20):", font=("Arial", 9)).grid(
-            row=0, column=2, sticky=tk.W, padx=20, pady=2)
-        self.ma_label = ttk.Label(indicators_grid, text="--", font=("Arial", 9, "bold"))
-        self.ma_label.grid(row=0, column=3, sticky=tk.W, padx=5, pady=2)
-        
-        # Row 2
-        ttk.Label(indicators_grid, text="BB Upper:", font=("Arial", 9)).grid(
-            row=1, column=0, sticky=tk.W, padx=5, pady=2)
-        self.bb_upper_label = ttk.Label(indicators_grid, text="--", font=("Arial", 9, "bold"))
-        self.bb_upper_label.grid(row=1, column=1, sticky=tk.W, padx=5, pady=2)
-        
-        ttk.Label(indicators_grid, text="BB Middle:", font=("Arial", 9)).grid(
-            row=1, column=2, sticky=tk.W, padx=20, pady=2)
-        self.bb_middle_label = ttk.Label(indicators_grid, text="--", font=("Arial", 9, "bold"))
-        self.bb_middle_label.grid(row=1, column=3, sticky=tk.W, padx=5, pady=2)
-        
-        ttk.Label(indicators_grid, text="BB Lower:", font=("Arial", 9)).grid(
-            row=1, column=4, sticky=tk.W, padx=20, pady=2)
-        self.bb_lower_label = ttk.Label(indicators_grid, text="--", font=("Arial", 9, "bold"))
-        self.bb_lower_label.grid(row=1, column=5, sticky=tk.W, padx=5, pady=2)
+        # One label per shown output of each indicator, filled from the registry
+        self.indicator_labels = []
+        for row, indicators in enumerate(self.indicator_rows):
+            column = 0
+            for name, params in indicators:
+                indicator = INDICATORS[name]
+                for output, template in enumerate(indicator.labels):
+                    if template is None:
+                        continue
+                    text = template.format(**dict(indicator.defaults, **params))
+                    ttk.Label(indicators_grid, text=f"{text}:", font=("Arial", 9)).grid(
+                        row=row, column=column, sticky=tk.W, padx=20 if column else 5, pady=2)
+                    label = ttk.Label(indicators_grid, text="--", font=("Arial", 9, "bold"))
+                    label.grid(row=row, column=column + 1, sticky=tk.W, padx=5, pady=2)
+                    self.indicator_labels.append((name, params, output, label))
+                    column += 2
     
     def start(self):
         """Start the panel."""
         self.is_active = True
-        self.refresh_data()
+        self.token = CancelToken()
+        if self.current_interval in LOCAL_BARS:
+            self.start_bars()
+        else:
+            self.refresh_data()
+        self.trade_ws = BinanceWebSocket(
+            on_message_callback=self.on_agg_trade,
+            on_error_callback=lambda err: print(f"aggTrade stream error: {err}")
+        )
+        self.trade_ws.connect_single(f"{self.symbol.lower()}@aggTrade")
+        self.profile_tick()
     
     def stop(self):
         """Stop the panel."""
         self.is_active = False
+        self.token.cancel()
+        if self.snapshot_after_id:
+            self.parent.after_cancel(self.snapshot_after_id)
+            self.snapshot_after_id = None
+        self.stop_heatmap()
+        self.stop_ticks()
+        self.stop_bars()
+        if self.trade_ws:
+            self.trade_ws.disconnect()
+            self.trade_ws = None
+        if self.profile_after_id:
+            self.parent.after_cancel(self.profile_after_id)
+            self.profile_after_id = None
         if self.canvas:
             self.canvas.get_tk_widget().destroy()
             self.canvas = None
+            self.figure = None
     
     def on_interval_change(self):
         """Handle interval change."""
-        self.current_interval = self.interval_var.get()
-        self.refresh_data()
+        value = self.interval_var.get()
+        if value not in LOCAL_BARS:
+            self.bars_var.set('')
+        self.stop_bars()
+        if value == 'tick' and self.tick_mode:
+            # The radio button fires again when clicked while selected
+            return
+        # Candles still loading for the previous interval must not be drawn
+        self.token.cancel()
+        self.token = CancelToken()
+        if value == 'tick':
+            self.enter_tick_mode()
+            return
+        if self.tick_mode:
+            self.exit_tick_mode()
+        self.current_interval = value
+        self.interval_label = value
+        self.candles_live = False
+        if value in LOCAL_BARS:
+            self.start_bars()
+        else:
+            self.refresh_data()
+    
+    def on_bars_selected(self, event=None):
+        self.interval_var.set(self.bars_var.get())
+        self.on_interval_change()
     
     def refresh_data(self):
         """Fetch and update chart data."""
-        def fetch_and_update():
-            klines = get_klines(self.symbol, self.current_interval, 100)
-            if klines:
-                self.parent.after(0, self.update_chart, klines)
-        
-        threading.Thread(target=fetch_and_update, daemon=True).start()
+        REST_POOL.run(self.token, self.parent, self.update_chart,
+                      load_klines, self.symbol, self.current_interval, 100, priority=USER)
     
-    def update_chart(self, klines):
-        """Update the candlestick chart."""
-        if not self.is_active:
+    def get_snapshot(self):
+        """Return the last candles shown, for the session snapshot."""
+        if not self.candles_live or not len(self.candles):
+            return None
+        return {
+            'interval': self.current_interval,
+            'klines': self.candles.klines(),
+        }
+    
+    def show_snapshot(self, data):
+        """Paint last-session candles once the window is up, marked stale."""
+        interval = data.get('interval')
+        klines = data.get('klines')
+        if not klines or interval not in CHART_INTERVALS:
             return
+        self.current_interval = interval
+        self.interval_var.set(interval)
+        # Drawing needs matplotlib, so let the rest of the window paint first
+        self.snapshot_after_id = self.parent.after(50, self.update_chart, klines, True)
+    
+    @METRICS.timed('dashboard_panel_render_seconds', 'chart')
+    def update_chart(self, klines=None, stale=False, keep_profile=False):
+        """Update the candlestick chart from kline rows, or from self.candles as already filled.
 
-        if self.canvas:
-            self.canvas.get_tk_widget().destroy()
+        keep_profile leaves the volume profile as it is, for local bar redraws
+        where the aggTrade stream already keeps it current.
+        """
+        if stale:
+            # Live data may already have arrived, or the panel been torn down
+            if self.candles_live or not self.frame.winfo_exists():
+                return
+        elif not self.is_active:
+            return
+        else:
+            self.candles_live = True
+        if klines is not None:
+            self.candles.load(klines)
         
-        self.figure.clear()       
-
-        opens = []
-        highs = []
-        lows = []
-        closes = []
-        dates = []        
-
-        for k in klines:
-            dates.append(int(k[0]) / 1000)
-            opens.append(float(k[1]))
-            highs.append(float(k[2]))
-            lows.append(float(k[3]))
-            closes.append(float(k[4]))
+        if self.figure is None:
+            self.build_figure()
+        
+        self.frame.config(text=f"{self.title} (stale)" if stale else self.title)
 
-        ax = self.figure.add_subplot(111)
+        # Column views into the candle buffer, no copies
+        candles = self.candles
+        opens, highs, lows, closes, volumes = candles.open, candles.high, candles.low, candles.close, candles.volume
+        n = len(closes)
+        x = np.arange(n)
         width = 0.7
         
-        for i in range(len(dates)):
-            if closes[i] >= opens[i]:
-                color = 'green'
+        # Green for up candles, red for down; one color array shared by every series
+        colors = np.where(closes >= opens, 'green', 'red')
+        
+        self.wicks.set_segments(np.stack([np.column_stack([x, lows]),
+                                          np.column_stack([x, highs])], axis=1))
+        self.wicks.set_color(colors)
+        
+        self.bodies.set_verts(self.bar_verts(x, width, np.minimum(opens, closes), np.maximum(opens, closes)))
+        self.bodies.set_facecolor(colors)
+        self.bodies.set_edgecolor(colors)
+        
+        self.volume_bars.set_verts(self.bar_verts(x, width, np.zeros(n), volumes))
+        self.volume_bars.set_facecolor(colors)
+        
+        # Indicators come from the shared cache, keyed by the last candle
+        version = candles.key()
+        self.ma_line.set_data(x, self.indicator('ma', closes, version, period=20))
+        
+        rsi_values = self.indicator('rsi', closes, version, period=14)[0]
+        self.rsi_line.set_data(x, rsi_values)
+        
+        macd_line, signal_line, histogram = self.indicator('macd', closes, version)
+        self.macd_line.set_data(x, macd_line)
+        self.signal_line.set_data(x, signal_line)
+        self.macd_hist.set_verts(self.bar_verts(x, width, np.zeros(n), histogram))
+        self.macd_hist.set_facecolor(np.where(histogram >= 0, 'green', 'red'))
+        
+        # Fixed artists, so only the limits have to follow the data
+        self.ax_price.set_xlim(-1, n)
+        pad = (highs.max() - lows.min()) * 0.05 or highs.max() * 0.01
+        self.ax_price.set_ylim(lows.min() - pad, highs.max() + pad)
+        self.ax_volume.set_ylim(0, volumes.max() * 1.1 or 1)
+        macd_range = np.abs(np.concatenate([macd_line, signal_line, histogram])).max() * 1.1 or 1
+        self.ax_macd.set_ylim(-macd_range, macd_range)
+        
+        # Volume profile over the visible price range, from candles until
+        # stored aggTrades (if any) replace it with exact trade prices
+        if not keep_profile:
+            low, high = self.ax_price.get_ylim()
+            self.profile.reset(low, high)
+            self.profile.build_from_klines(lows, highs, volumes)
+            self.profile_version = None
+            self.draw_profile()
+            if not stale:
+                REST_POOL.run(self.token, self.parent, self.apply_stored_trades,
+                              load_stored_trades, self.symbol, int(candles.open_time[0]))
+        
+        self.ax_price.set_title(f'{self.symbol.upper()} - {self.interval_label}')
+        self.ax_price.set_ylabel(f'Price ({UNIVERSE.quote(self.symbol)})')
+        
+        # Update indicators; RSI(14) is the result the RSI pane just used
+        for name, params, output, label in self.indicator_labels:
+            values = self.indicator(name, closes, version, **params)
+            value = (values[output] if isinstance(values, tuple) else values)[-1]
+            if n <= 14 or not np.isfinite(value):
+                label.config(text="--")
+            elif INDICATORS[name].is_price:
+                label.config(text=UNIVERSE.format_price(self.symbol, value))
             else:
-                color = 'red'
-            ax.plot([i, i], [lows[i], highs[i]], color=color, linewidth=1)
-            
-            # Plot body
-            ax.add_patch(plt.Rectangle((i - width/2, min(opens[i], closes[i])), 
-                                      width, abs(closes[i] - opens[i]), 
-                                      facecolor=color, edgecolor=color))
-        
-        # Calculate and plot moving average
-        ma_period = 20
-        if len(closes) >= ma_period:
-            ma_values = [np.mean(closes[max(0, i-ma_period+1):i+1]) 
-                        for i in range(len(closes))]
-            ax.plot(ma_values, color='orange', label=f'MA{ma_period}', linewidth=1.5)
-        
-        ax.set_title(f'{self.symbol.upper()} - {self.current_interval}')
-        ax.set_ylabel('Price (USDT)')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        # Update indicators
-        if len(closes) > 14:
-            rsi = calculate_rsi(closes)
-            self.rsi_label.config(text=f"{rsi:.2f}")
-            
-            ma = calculate_moving_average(closes, 20)
-            self.ma_label.config(text=f"{ma:.2f}")
-            
-            bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(closes)
-            self.bb_upper_label.config(text=f"{bb_upper:.2f}")
-            self.bb_middle_label.config(text=f"{bb_middle:.2f}")
-            self.bb_lower_label.config(text=f"{bb_lower:.2f}")
-        
-        # Create canvas
+                label.config(text=f"{value:.2f}")
+        
+        # The heatmap's time axis needs evenly spaced exchange candles
+        if (self.heatmap_var.get() and not stale and not self.tick_mode
+                and self.current_interval in INTERVAL_MS):
+            self.start_heatmap()
+        
+        self.canvas.draw_idle()
+    
+    def indicator(self, name, closes, version, **params):
+        return compute(name, self.symbol, self.interval_label, closes, version, **params)
+    
+    def on_agg_trade(self, msg):
+        # Stream thread: one bucket update and at most one bar update; the
+        # profile and bar ticks redraw
+        price, qty = float(msg['p']), float(msg['q'])
+        self.profile.add_trade(price, qty)
+        with self.bars_lock:
+            bars = self.bars
+            if bars is None:
+                if self.bars_pending is not None:
+                    self.bars_pending.append(msg)
+                return
+        bars.add(msg['a'], price, qty, msg['T'])
+    
+    def apply_stored_trades(self, trades):
+        if trades is None or self.figure is None:
+            return
+        self.profile.build_from_trades(*trades)
+        self.draw_profile()
+        self.canvas.draw_idle()
+    
+    def on_profile_toggle(self):
+        if self.figure is not None:
+            self.ax_profile.set_visible(self.profile_var.get())
+            self.canvas.draw_idle()
+    
+    def profile_tick(self):
+        """Redraw the profile once a second if trades have landed."""
+        self.profile_after_id = self.parent.after(self.profile_interval, self.profile_tick)
+        if (self.figure is None or self.tick_mode or not self.profile_var.get()
+                or self.profile_version == self.profile.version):
+            return
+        self.draw_profile()
+        # While the heatmap blits, its next frame draws the profile too
+        if self.background is None:
+            self.canvas.draw_idle()
+    
+    def draw_profile(self):
+        """Point the profile's bars, value area and point of control at the current volumes."""
+        self.profile_version = self.profile.version
+        summary = self.profile.summary()
+        volume = summary['volume']
+        edges = self.profile.edges()
+        va_low, va_high = summary['value_area']
+        centres = (edges[:-1] + edges[1:]) / 2
+        
+        # Horizontal bars: x is volume, y the bucket's price range
+        self.profile_bars.set_verts(np.stack([
+            np.column_stack([np.zeros(self.profile.bins), edges[:-1]]),
+            np.column_stack([volume, edges[:-1]]),
+            np.column_stack([volume, edges[1:]]),
+            np.column_stack([np.zeros(self.profile.bins), edges[1:]]),
+        ], axis=1))
+        self.profile_bars.set_facecolor(np.where((centres >= va_low) & (centres <= va_high),
+                                                 'steelblue', 'lightgray'))
+        self.poc_line.set_ydata([summary['poc'], summary['poc']])
+        self.ax_profile.set_xlim(volume.max() * 1.05 or 1, 0)
+    
+    def on_heatmap_toggle(self):
+        if self.heatmap_var.get():
+            if (self.candles_live and self.figure is not None and not self.tick_mode
+                    and self.current_interval in INTERVAL_MS):
+                self.start_heatmap()
+        else:
+            self.stop_heatmap()
+            if self.canvas:
+                self.canvas.draw_idle()
+    
+    def start_heatmap(self):
+        """Follow the order book and (re)align the heatmap with the candles."""
+        # One image pixel per screen pixel of the price pane
+        cols, rows = max(1, int(self.ax_price.bbox.width)), max(1, int(self.ax_price.bbox.height))
+        if self.heatmap is None or self.heatmap.image.shape != (rows, cols):
+            self.heatmap = DepthHeatmap(rows, cols)
+        low, high = self.ax_price.get_ylim()
+        self.heatmap.reset(low, high, self.candles.open_time[0], time.time() * 1000)
+        self.heatmap_image.set_visible(True)
+        
+        # Frames redraw only these over a cached background of the price pane
+        for artist in self.animated_artists():
+            artist.set_animated(True)
+        self.background = None
+        
+        if self.depth_sync is None:
+            self.depth_sync = DepthSync(self.symbol)
+            self.depth_sync.add_listener(self.on_book_event)
+            self.depth_sync.start()
+        if self.heatmap_after_id is None:
+            self.heatmap_tick()
+    
+    def stop_heatmap(self):
+        if self.depth_sync:
+            self.depth_sync.stop()
+            self.depth_sync = None
+        if self.heatmap_after_id:
+            self.parent.after_cancel(self.heatmap_after_id)
+            self.heatmap_after_id = None
+        if self.figure is not None:
+            self.heatmap_image.set_visible(False)
+            for artist in self.animated_artists():
+                artist.set_animated(False)
+        self.background = None
+    
+    def animated_artists(self):
+        return [self.heatmap_image, self.wicks, self.bodies, self.ma_line, self.ax_profile]
+    
+    def on_draw(self, event):
+        """After a full redraw, keep the background of the pane being blitted."""
+        if self.tick_mode:
+            self.tick_background = self.canvas.copy_from_bbox(self.ax_tick.bbox)
+            self.ax_tick.draw_artist(self.tick_line)
+            self.ax_tick.draw_artist(self.tick_marker)
+            return
+        if self.heatmap_after_id is None:
+            return
+        self.background = self.canvas.copy_from_bbox(self.ax_price.bbox)
+        for artist in self.animated_artists():
+            self.ax_price.draw_artist(artist)
+    
+    def on_book_event(self, event, data):
+        # Stream thread: the next heatmap frame picks the change up
+        self.heatmap_dirty = True
+    
+    @METRICS.timed('dashboard_panel_render_seconds', 'chart_heatmap')
+    def heatmap_tick(self):
+        """Bin the current book into the heatmap and refresh the image in place."""
+        self.heatmap_after_id = self.parent.after(self.heatmap_interval, self.heatmap_tick)
+        now = time.time() * 1000
+        
+        if self.heatmap_dirty and self.depth_sync:
+            book = self.depth_sync.book
+            with self.depth_sync.lock:
+                self.heatmap_dirty = False
+                count = len(book.bids) + len(book.asks)
+                prices = np.fromiter(itertools.chain(book.bids, book.asks), float, count)
+                qtys = np.fromiter(itertools.chain(book.bids.values(), book.asks.values()), float, count)
+                bid, ask = book.best_bid(), book.best_ask()
+            mid = (bid + ask) / 2 if bid and ask else None
+            self.heatmap.add_book(prices, qtys, now, mid)
+        else:
+            self.heatmap.advance(now)
+        
+        # Candle i spans open time t_i .. t_i + interval around x = i
+        start, end, low, high = self.heatmap.extent()
+        origin = self.candles.open_time[0]
+        interval_ms = INTERVAL_MS[self.current_interval]
+        self.heatmap_image.set_data(self.heatmap.image)
+        self.heatmap_image.set_extent(((start - origin) / interval_ms - 0.5,
+                                       (end - origin) / interval_ms - 0.5, low, high))
+        self.heatmap_image.set_clim(1e-9, self.heatmap.image.max() or 1)
+        
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        for artist in self.animated_artists():
+            self.ax_price.draw_artist(artist)
+        self.canvas.blit(self.ax_price.bbox)
+    
+    def start_bars(self):
+        """Backfill the selected local bars from recent trades, then follow the aggTrade stream."""
+        with self.bars_lock:
+            self.bars = None
+            self.bars_pending = []
+        self.bars_version = None
+        REST_POOL.run(self.token, self.parent, self.seed_bars, load_trade_history,
+                      self.symbol, int(time.time() * 1000) - self.bars_backfill_ms, priority=USER)
+    
+    def seed_bars(self, trades):
+        if self.bars_pending is None:
+            return
+        kind, size = LOCAL_BARS[self.current_interval]
+        prices, qtys, times = trades['price'], trades['qty'], trades['time']
+        size = size or auto_size(kind, prices, qtys, times)
+        if not size:
+            print(f"Error building {self.current_interval} bars: no recent trades to size them")
+            self.stop_bars()
+            return
+        bars = BarBuilder(kind, size)
+        bars.backfill(trades['agg_id'], prices, qtys, times)
+        with self.bars_lock:
+            for msg in self.bars_pending:
+                bars.add(msg['a'], float(msg['p']), float(msg['q']), msg['T'])
+            self.bars_pending = []
+            self.bars = bars
+        if kind == 'volume':
+            self.interval_label = f"volume bars ({size:g})"
+        elif kind == 'dollar':
+            self.interval_label = f"dollar bars ({size:,.0f} {UNIVERSE.quote(self.symbol)})"
+        self.bars_tick()
+    
+    def stop_bars(self):
+        with self.bars_lock:
+            self.bars = None
+            self.bars_pending = None
+        if self.bars_after_id:
+            self.parent.after_cancel(self.bars_after_id)
+            self.bars_after_id = None
+    
+    def bars_tick(self):
+        """Redraw the local bars when trades have changed them; the profile is only rebuilt on the first draw."""
+        self.bars_after_id = self.parent.after(self.bars_interval, self.bars_tick)
+        if self.bars.version == self.bars_version or not self.bars.count:
+            return
+        first = self.bars_version is None
+        self.bars_version = self.bars.version
+        self.bars.copy_into(self.candles, 100)
+        self.update_chart(keep_profile=not first)
+    
+    def enter_tick_mode(self):
+        """Swap the candle panes for a line of every trade over the last tick_window ms."""
+        self.tick_mode = True
+        self.stop_heatmap()
+        if self.figure is None:
+            self.build_figure()
+        for ax in (self.ax_price, self.ax_volume, self.ax_rsi, self.ax_macd):
+            ax.set_visible(False)
+        self.ax_tick.set_visible(True)
+        self.ax_tick.set_title(f'{self.symbol.upper()} - ticks, last {self.tick_window // 60_000} min')
+        self.ax_tick.set_ylabel(f'Price ({UNIVERSE.quote(self.symbol)})')
+        self.frame.config(text=self.title)
+        
+        # Seed over REST, holding stream trades back until the seed (or its
+        # failure) is in
+        self.tape.clear()
+        self.tick_pending = []
+        self.tick_seeded = False
+        self.tick_background = None
+        self.tick_version = None
+        self.tick_ws = BinanceWebSocket(
+            on_message_callback=self.on_tick_trade,
+            on_error_callback=lambda err: print(f"Tick stream error: {err}")
+        )
+        self.tick_ws.connect_single(f"{self.symbol.lower()}@trade")
+        REST_POOL.run(self.token, self.parent, self.seed_ticks,
+                      load_recent_trades, self.symbol, 1000, priority=USER)
+        self.tick_frame()
+    
+    def exit_tick_mode(self):
+        self.stop_ticks()
+        self.tick_mode = False
+        self.tape.clear()
+        self.ax_tick.set_visible(False)
+        for ax in (self.ax_price, self.ax_volume, self.ax_rsi, self.ax_macd):
+            ax.set_visible(True)
+        self.canvas.draw_idle()
+    
+    def stop_ticks(self):
+        if self.tick_ws:
+            self.tick_ws.disconnect()
+            self.tick_ws = None
+        if self.tick_after_id:
+            self.parent.after_cancel(self.tick_after_id)
+            self.tick_after_id = None
+        self.tick_background = None
+    
+    def on_tick_trade(self, msg):
+        # Stream thread
+        with self.tick_lock:
+            if not self.tick_seeded:
+                self.tick_pending.append(msg)
+                return
+        self.tape.append_stream(msg)
+    
+    def seed_ticks(self, trades):
+        if not self.tick_mode:
+            return
+        with self.tick_lock:
+            self.tape.extend_rest(trades)
+            for msg in self.tick_pending:
+                self.tape.append_stream(msg)
+            self.tick_pending = []
+            self.tick_seeded = True
+    
+    @METRICS.timed('dashboard_panel_render_seconds', 'chart_tick')
+    def tick_frame(self):
+        """Blit the tick line and last-price marker; the axes are only redrawn when the price range changes."""
+        self.tick_after_id = self.parent.after(self.tick_interval, self.tick_frame)
+        now = time.time() * 1000
+        # Without new trades the line only scrolls, a few pixels a second
+        if self.tape.version == self.tick_version and now - self.tick_drawn_at < 250:
+            return
+        times, prices = self.tape.since(now - self.tick_window)
+        if not len(times):
+            return
+        self.tick_version = self.tape.version
+        self.tick_drawn_at = now
+        
+        # x is seconds before now; the last price carries on to the right edge
+        self.tick_line.set_data(np.append((times - now) / 1000, 0), np.append(prices, prices[-1]))
+        self.tick_marker.set_data([0], [prices[-1]])
+        
+        low, high = prices.min(), prices.max()
+        bottom, top = self.ax_tick.get_ylim()
+        # At least 0.05% of the price either side, so a flat or one-tick window keeps its limits
+        pad = max((high - low) * 0.1, high * 0.0005)
+        if low < bottom or high > top or (high - low + 2 * pad) < (top - bottom) * 0.3:
+            self.ax_tick.set_ylim(low - pad, high + pad)
+            self.tick_background = None
+        
+        if self.tick_background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.tick_background)
+        self.ax_tick.draw_artist(self.tick_line)
+        self.ax_tick.draw_artist(self.tick_marker)
+        self.canvas.blit(self.ax_tick.bbox)
+    
+    def build_figure(self):
+        """Create the figure once: candle, volume, RSI and MACD panes sharing the x-axis.
+
+        Every series is a single artist (a collection or a line) that later
+        updates replace the data of, so a redraw costs the same however many
+        candles there are and the canvas is never recreated.
+        """
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib import colormaps
+        from matplotlib.collections import LineCollection, PolyCollection
+        from matplotlib.figure import Figure
+        
+        self.figure = Figure(figsize=(8, 6), dpi=100)
+        grid = self.figure.add_gridspec(4, 1, height_ratios=[4, 1, 1, 1], hspace=0.08)
+        self.ax_price = self.figure.add_subplot(grid[0])
+        self.ax_volume = self.figure.add_subplot(grid[1], sharex=self.ax_price)
+        self.ax_rsi = self.figure.add_subplot(grid[2], sharex=self.ax_price)
+        self.ax_macd = self.figure.add_subplot(grid[3], sharex=self.ax_price)
+        
+        for ax in (self.ax_price, self.ax_volume, self.ax_rsi, self.ax_macd):
+            ax.grid(True, alpha=0.3)
+        for ax in (self.ax_price, self.ax_volume, self.ax_rsi):
+            ax.tick_params(labelbottom=False)
+        
+        self.wicks = LineCollection([], linewidths=1)
+        self.ax_price.add_collection(self.wicks)
+        self.bodies = PolyCollection([])
+        self.ax_price.add_collection(self.bodies)
+        self.ma_line, = self.ax_price.plot([], [], color='orange', label='MA20', linewidth=1.5)
+        self.ax_price.legend(loc='upper left')
+        
+        # One image for the heatmap; frames only swap its data. Empty cells
+        # fall below the color range and stay transparent.
+        heatmap_cmap = colormaps['Blues'].with_extremes(under=(0, 0, 0, 0))
+        self.heatmap_image = self.ax_price.imshow(np.zeros((1, 1)), cmap=heatmap_cmap, origin='lower',
+                                                  aspect='auto', interpolation='nearest',
+                                                  zorder=0, visible=False)
+        
+        # Volume profile in the right-hand part of the price pane, bars
+        # growing leftward from the edge
+        self.ax_profile = self.ax_price.inset_axes([0.8, 0, 0.2, 1], sharey=self.ax_price)
+        self.ax_profile.patch.set_visible(False)
+        self.ax_profile.axis('off')
+        self.profile_bars = PolyCollection([], alpha=0.45, linewidths=0)
+        self.ax_profile.add_collection(self.profile_bars)
+        self.poc_line = self.ax_profile.axhline(0, color='darkorange', linewidth=1.2, linestyle='--')
+        self.ax_profile.set_visible(self.profile_var.get())
+        
+        self.volume_bars = PolyCollection([], alpha=0.6)
+        self.ax_volume.add_collection(self.volume_bars)
+        self.ax_volume.set_ylabel('Vol', fontsize=8)
+        
+        self.rsi_line, = self.ax_rsi.plot([], [], color='purple', linewidth=1)
+        self.ax_rsi.axhline(70, color='red', linewidth=0.8, alpha=0.5)
+        self.ax_rsi.axhline(30, color='green', linewidth=0.8, alpha=0.5)
+        self.ax_rsi.set_ylim(0, 100)
+        self.ax_rsi.set_ylabel('RSI', fontsize=8)
+        
+        self.macd_hist = PolyCollection([], alpha=0.5)
+        self.ax_macd.add_collection(self.macd_hist)
+        self.macd_line, = self.ax_macd.plot([], [], color='blue', linewidth=1)
+        self.signal_line, = self.ax_macd.plot([], [], color='orange', linewidth=1)
+        self.ax_macd.set_ylabel('MACD', fontsize=8)
+        
+        # Tick chart, shown instead of the panes above in tick mode. The line
+        # and marker are animated: frames blit them over a cached background.
+        self.ax_tick = self.figure.add_axes([0.1, 0.08, 0.87, 0.86], visible=False)
+        self.ax_tick.grid(True, alpha=0.3)
+        self.ax_tick.set_xlim(-self.tick_window / 1000, self.tick_window / 1000 * 0.02)
+        self.ax_tick.set_xlabel('Seconds ago', fontsize=8)
+        self.tick_line, = self.ax_tick.plot([], [], color='steelblue', linewidth=1,
+                                            drawstyle='steps-post', animated=True)
+        self.tick_marker, = self.ax_tick.plot([], [], 'o', color='darkorange', markersize=5, animated=True)
+        
+        self.figure.subplots_adjust(left=0.1, right=0.97, top=0.95, bottom=0.05)
+        
         self.canvas = FigureCanvasTkAgg(self.figure, self.chart_frame)
-        self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+    
+    def bar_verts(self, x, width, bottoms, tops):
+        """Rectangles for every bar as one (n, 4, 2) array of vertices."""
+        left = x - width / 2
+        right = x + width / 2
+        return np.stack([np.column_stack([left, bottoms]), np.column_stack([left, tops]),
+                         np.column_stack([right, tops]), np.column_stack([right, bottoms])], axis=1)
     
     def pack(self, **kwargs):
         self.frame.pack(**kwargs)
@@ -2,21 +2,25 @@ import tkinter as tk
 from tkinter import ttk
 from config import COLORS
 from utils.binance_api import BinanceWebSocket  
+from utils.symbols import UNIVERSE
+from utils.metrics import METRICS
+from utils.models import TickerState
 
 class CryptoTicker:
+    # Milliseconds between repaints; the stream only updates the state
+    refresh_interval = 250
+    
     def __init__(self, parent, symbol, display_name):
         self.parent = parent
         self.symbol = symbol.lower()
         self.display_name = display_name
         self.is_active = False
+        self.is_stale = False
         self.ws_manager = None 
+        self.after_id = None
         
-        self.current_price = 0
-        self.price_change = 0
-        self.price_change_percent = 0
-        self.volume = 0
-        self.high_24h = 0
-        self.low_24h = 0
+        self.state = TickerState()
+        self.drawn_version = 0
         
         self.frame = ttk.Frame(parent, relief="solid", borderwidth=1, padding=4)
         
@@ -38,10 +42,11 @@ class CryptoTicker:
         name_frame = ttk.Frame(row0_frame, style="Light.TFrame")
         name_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        ttk.Label(name_frame, text=display_name, 
-                 font=("Arial", 10, "bold"),
-                 background=COLORS["bg_light"],
-                 foreground=COLORS["text"]).pack(anchor=tk.W)
+        self.name_label = ttk.Label(name_frame, text=display_name, 
+                                    font=("Arial", 10, "bold"),
+                                    background=COLORS["bg_light"],
+                                    foreground=COLORS["text"])
+        self.name_label.pack(anchor=tk.W)
         
         self.price_label = tk.Label(row0_frame, text="--,---", 
                                     font=("Arial", 18, "bold"),
@@ -143,37 +148,64 @@ class CryptoTicker:
         )
 
         self.ws_manager.connect_single(f"{self.symbol}@ticker")
+        self.auto_refresh()
     
     def stop(self):
         self.is_active = False
         if self.ws_manager:
             self.ws_manager.disconnect()
             self.ws_manager = None
+        if self.after_id:
+            self.parent.after_cancel(self.after_id)
+            self.after_id = None
     
     def on_message(self, data): 
+        # Stream thread: overwrite the state, the Tk loop repaints
+        if self.is_active:
+            self.state.update(data)
+    
+    def auto_refresh(self):
+        """Repaint every refresh_interval ms if a ticker message came in."""
         if not self.is_active:
             return
-
-        price = float(data['c'])
-        change = float(data['p'])  
-        percent = float(data['P'])  
-        volume = float(data['v'])
-        high = float(data['h'])
-        low = float(data['l'])
-        
-        self.current_price = price
-        self.price_change = change
-        self.price_change_percent = percent
-        self.volume = volume
-        self.high_24h = high
-        self.low_24h = low
-        
-        self.parent.after(0, self.update_display, price, change, percent, volume, high, low)
+        if self.state.version != self.drawn_version:
+            self.drawn_version = self.state.version
+            self.update_display(*self.state.values())
+        self.after_id = self.parent.after(self.refresh_interval, self.auto_refresh)
+    
+    def get_snapshot(self):
+        """Return the last values shown, for the session snapshot."""
+        state = self.state
+        if not state.price or self.is_stale:
+            return None
+        return {
+            'price': state.price,
+            'change': state.change,
+            'percent': state.percent,
+            'volume': state.volume,
+            'high': state.high,
+            'low': state.low,
+        }
+    
+    def show_snapshot(self, data):
+        """Paint last-session values, greyed out until live data arrives."""
+        try:
+            values = (data['price'], data['change'], data['percent'],
+                      data['volume'], data['high'], data['low'])
+        except (KeyError, TypeError):
+            return
+        self.is_stale = True
+        self.render(*values)
     
     def update_display(self, price, change, percent, volume, high, low):
         if not self.is_active:
             return
         
+        self.is_stale = False
+        self.render(price, change, percent, volume, high, low)
+    
+    @METRICS.timed('dashboard_panel_render_seconds', 'ticker')
+    def render(self, price, change, percent, volume, high, low):
         if change >= 0:
             color = COLORS["profit"]
             sign = "+"
@@ -181,16 +213,22 @@ class CryptoTicker:
             color = COLORS["loss"]
             sign = ""
         
+        prefix = UNIVERSE.currency_prefix(self.symbol)
+        
+        self.name_label.config(
+            text=f"{self.display_name} (stale)" if self.is_stale else self.display_name
+        )
+        
         self.price_label.config(
-            text=f"${price:,.2f}",
-            fg=COLORS["text"]
+            text=f"{prefix}{UNIVERSE.format_price(self.symbol, price)}",
+            fg=COLORS["text_secondary"] if self.is_stale else COLORS["text"]
         )
         
-        self.high_label.config(text=f"${high:,.2f}")
-        self.low_label.config(text=f"${low:,.2f}")
+        self.high_label.config(text=f"{prefix}{UNIVERSE.format_price(self.symbol, high)}")
+        self.low_label.config(text=f"{prefix}{UNIVERSE.format_price(self.symbol, low)}")
 
         self.change_amount_label.config(
-            text=f"{sign}{abs(change):,.2f}",
+            text=f"{sign}{UNIVERSE.format_price(self.symbol, abs(change))}",
             fg=color
         )
         
@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 SYMBOLS = [
     {"symbol": "btcusdt", "name": "BTC/USDT"},
     {"symbol": "ethusdt", "name": "ETH/USDT"},
@@ -7,6 +10,16 @@ SYMBOLS = [
     {"symbol": "lunausdt", "name": "LUNA/USDT"}
 ]
 
+# Cross pairs watched with the USDT pairs above by the triangular arbitrage
+# monitor; every triangle of assets joined by three listed pairs is a loop
+ARB_PAIRS = [
+    {"symbol": "ethbtc", "name": "ETH/BTC"},
+    {"symbol": "solbtc", "name": "SOL/BTC"},
+    {"symbol": "soleth", "name": "SOL/ETH"},
+    {"symbol": "bnbbtc", "name": "BNB/BTC"},
+    {"symbol": "bnbeth", "name": "BNB/ETH"},
+]
+
 COLORS = {
     "profit": "#4CAF50",
     "loss": "#FF5252",             
@@ -24,4 +37,45 @@ COLORS = {
     "header_bg": "#D8DAFF"     
 }
 
-CHART_INTERVALS = ["1m", "5m", "15m", "1h", "4h", "1d"]
\ No newline at end of file
+CHART_INTERVALS = ["1m", "5m", "15m", "1h", "4h", "1d"]
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+# Chart bars built locally from the aggTrade stream: (kind, size). Sizes are
+# ms for time bars and trades for tick bars; volume and dollar bars with no
+# size get one sized to about a minute of recent trading
+LOCAL_BARS = {
+    "5s": ("time", 5_000),
+    "10s": ("time", 10_000),
+    "30s": ("time", 30_000),
+    "100 trades": ("tick", 100),
+    "1000 trades": ("tick", 1000),
+    "Volume": ("volume", None),
+    "Dollar": ("dollar", None),
+}
+
+# Exchange endpoints; point these at python mock_exchange.py to run offline
+BINANCE_REST_URL = os.environ.get("BINANCE_REST_URL", "https://api.binance.com")
+BINANCE_WS_URL = os.environ.get("BINANCE_WS_URL", "wss://stream.binance.com:9443")
+
+# Binance REST request-weight budget per minute (per IP)
+REST_WEIGHT_LIMIT = 6000
+
+# Seconds before a REST request is abandoned
+REQUEST_TIMEOUT = 10
+
+# Threads shared by all REST fetches
+REST_WORKERS = 4
+
+# Port of the local Prometheus /metrics endpoint; 0 leaves it off
+METRICS_PORT = int(os.environ.get("DASHBOARD_METRICS_PORT", "0"))
+
+# Unix socket of the local market-data daemon (python daemon.py)
+DAEMON_ADDRESS = os.path.join(tempfile.gettempdir(), "crypto-dashboard-md.sock")
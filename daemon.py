@@ -0,0 +1,42 @@
+"""Local market-data daemon shared by any number of dashboards.
+
+Holds the only exchange connections, keeps order books current from the
+depth diff stream, caches REST answers briefly and serves every dashboard
+on this machine over a Unix socket. Dashboards started while it runs attach
+to it automatically (python main.py --no-daemon to opt out).
+
+Examples:
+    python daemon.py
+    python daemon.py --address /tmp/md.sock
+    python daemon.py --mock            # serve the synthetic feed, no network
+"""
+import argparse
+from config import DAEMON_ADDRESS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve market data to local dashboards.")
+    parser.add_argument('--address', default=DAEMON_ADDRESS, help="Unix socket path")
+    parser.add_argument('--mock', action='store_true', help="serve the mock feed instead of Binance")
+    parser.add_argument('--stream-rate', type=float, default=10, help="mock messages per second per stream")
+    args = parser.parse_args()
+
+    if args.mock:
+        # Patch the API before the daemon modules bind it
+        from utils.mock_feed import MockMarket, install
+        install(MockMarket(), rate=args.stream_rate)
+
+    from utils.md_daemon import MarketDataDaemon
+
+    server = MarketDataDaemon(args.address)
+    print(f"Market-data daemon listening on {args.address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
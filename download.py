@@ -0,0 +1,150 @@
+"""Bulk historical downloader for klines and aggTrades.
+
+Examples:
+    python download.py                                  # 1 year of 1m klines for all symbols
+    python download.py --symbols btcusdt --intervals 1m 1h --start 2024-01-01 --end 2024-06-30
+    python download.py --symbols ethusdt --agg-trades --days 7
+
+Requests run concurrently under the REST weight budget, each day (klines) or
+hour (aggTrades) is written to the columnar store in data/ as it completes,
+and re-running the same command skips everything already stored.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from config import SYMBOLS, INTERVAL_MS
+from utils.binance_api import get_klines_range, get_agg_trades
+from utils.ratelimit import LIMITER
+from utils.store import MarketDataStore, DATA_DIR, day_start_ms, utc_today
+
+PAGE_LIMIT = 1000
+MAX_RETRIES = 5
+HOUR_MS = 3_600_000
+DAY_MS = 86_400_000
+
+
+class Downloader:
+    """Download klines and aggTrades into a MarketDataStore concurrently."""
+
+    def __init__(self, store, workers=8):
+        self.store = store
+        self.workers = workers
+
+    def fetch(self, fn, *args, **kwargs):
+        """Call a REST helper, retrying with backoff; the helpers wait for the weight budget themselves."""
+        for attempt in range(MAX_RETRIES):
+            data = fn(*args, **kwargs)
+            if data is not None:
+                return data
+            time.sleep(min(30, 2 ** attempt) * LIMITER.pressure())
+        raise RuntimeError(f"{fn.__name__} failed after {MAX_RETRIES} attempts")
+
+    def symbol_exists(self, symbol, interval):
+        """Probe a symbol once so unknown pairs are skipped instead of retried."""
+        now = int(time.time() * 1000)
+        return get_klines_range(symbol, interval, now - DAY_MS, now, 1) is not None
+
+    def download_klines_day(self, symbol, interval, day):
+        start = day_start_ms(day)
+        end = start + DAY_MS - 1
+        rows = []
+        while start <= end:
+            batch = self.fetch(get_klines_range, symbol, interval, start, end, PAGE_LIMIT)
+            rows.extend(batch)
+            if len(batch) < PAGE_LIMIT:
+                break
+            start = batch[-1][0] + INTERVAL_MS[interval]
+        self.store.write_klines(symbol, interval, day, rows)
+        return len(rows)
+
+    def download_agg_trades_hour(self, symbol, day, hour):
+        start = day_start_ms(day) + hour * HOUR_MS
+        end = start + HOUR_MS - 1
+        trades = self.fetch(get_agg_trades, symbol,
+                            start_time=start, end_time=end, limit=PAGE_LIMIT)
+        page = trades
+        while len(page) == PAGE_LIMIT:
+            # Later pages go by id; anything past the hour belongs to the next file
+            page = self.fetch(get_agg_trades, symbol,
+                              from_id=trades[-1]['a'] + 1, limit=PAGE_LIMIT)
+            page = [t for t in page if t['T'] <= end]
+            trades.extend(page)
+        self.store.write_agg_trades(symbol, day, hour, trades)
+        return len(trades)
+
+    def plan(self, symbols, intervals, start, end, agg_trades=False):
+        """List the download tasks that are not already in the store."""
+        now_ms = int(time.time() * 1000)
+        tasks = []
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        for symbol in symbols:
+            for interval in intervals:
+                for day in days:
+                    if not self.store.has_klines(symbol, interval, day):
+                        tasks.append((self.download_klines_day, (symbol, interval, day)))
+            if agg_trades:
+                for day in days:
+                    for hour in range(24):
+                        if day_start_ms(day) + hour * HOUR_MS > now_ms:
+                            break
+                        if not self.store.has_agg_trades(symbol, day, hour):
+                            tasks.append((self.download_agg_trades_hour, (symbol, day, hour)))
+        return tasks
+
+    def run(self, tasks):
+        """Run tasks on the worker pool, printing progress. Returns the failure count."""
+        started = time.time()
+        done = failed = rows = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(fn, *args): args for fn, args in tasks}
+            for future in as_completed(futures):
+                done += 1
+                try:
+                    rows += future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"Failed {futures[future]}: {e}")
+                if done % 50 == 0 or done == len(tasks):
+                    elapsed = time.time() - started
+                    print(f"{done}/{len(tasks)} chunks, {rows:,} rows, {elapsed:.0f}s")
+        return failed
+
+
+def parse_date(text):
+    return datetime.strptime(text, '%Y-%m-%d').date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download Binance klines and aggTrades into the local store.")
+    parser.add_argument('--symbols', nargs='+', default=[s['symbol'] for s in SYMBOLS])
+    parser.add_argument('--intervals', nargs='+', default=['1m'], choices=list(INTERVAL_MS))
+    parser.add_argument('--start', type=parse_date, help="first day (UTC), YYYY-MM-DD")
+    parser.add_argument('--end', type=parse_date, help="last day (UTC), YYYY-MM-DD; default today")
+    parser.add_argument('--days', type=int, default=365, help="days back from --end when --start is not given")
+    parser.add_argument('--agg-trades', action='store_true', help="also download aggTrades")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args()
+
+    end = args.end or utc_today()
+    start = args.start or end - timedelta(days=args.days - 1)
+
+    downloader = Downloader(MarketDataStore(args.data_dir), args.workers)
+
+    symbols = []
+    for symbol in args.symbols:
+        if downloader.symbol_exists(symbol, args.intervals[0]):
+            symbols.append(symbol)
+        else:
+            print(f"Skipping {symbol.upper()}: not available")
+
+    tasks = downloader.plan(symbols, args.intervals, start, end, args.agg_trades)
+    print(f"{len(tasks)} chunks to download for {start} .. {end}")
+    if not tasks:
+        return 0
+    return 1 if downloader.run(tasks) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
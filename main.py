@@ -1,12 +1,28 @@
+from utils.startup import STARTUP
 import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import os
-from components.ticker import CryptoTicker
-from components.orderbook import OrderBookPanel
-from components.technical import TechnicalAnalysisPanel
-from components.market_trade import MarketTrade
-from config import SYMBOLS, COLORS
+import sys
+from utils.snapshot import load_snapshot, save_snapshot, update_symbol_snapshot
+from config import SYMBOLS, COLORS, METRICS_PORT
+
+# Panel modules are imported the first time a panel is shown, so a disabled
+# chart never pays for matplotlib. Everything that pulls in numpy, requests or
+# websocket is imported where it is first used, so `import main` stays light.
+PANEL_CLASSES = {
+    'ticker': ('components.ticker', 'CryptoTicker'),
+    'orderbook': ('components.orderbook', 'OrderBookPanel'),
+    'technical': ('components.technical', 'TechnicalAnalysisPanel'),
+    'market_trade': ('components.market_trade', 'MarketTrade'),
+}
+
+
+def load_panel_class(panel_id):
+    """Import a panel module on demand and return its class."""
+    module_name, class_name = PANEL_CLASSES[panel_id]
+    return getattr(STARTUP.import_module(module_name), class_name)
+
 
 class CryptoDashboard:
     def __init__(self, root):
@@ -16,9 +32,29 @@ class CryptoDashboard:
 
         self.setup_styles()
         
+        # Tool windows from the Tools menu, closed with the app
+        self.tool_windows = []
+        
+        # Event-loop lag and callback counters, always on; profilers on demand
+        from utils.diagnostics import Diagnostics
+        self.diagnostics = Diagnostics(root)
+        self.diagnostics.start_monitoring()
+        self.create_menu()
+        
         # Load saved preferences
         self.preferences = self.load_preferences()
         
+        # Last-session data, painted while live data is loading
+        self.snapshot = load_snapshot()
+        
+        # Alerts are evaluated on their own streams, for any symbol
+        from utils.alerts import AlertEngine, AlertFeed
+        self.alert_engine = AlertEngine(
+            on_alert=lambda rule, value: self.root.after(0, self.show_alert, rule, value)
+        )
+        self.load_alerts()
+        self.alert_feed = AlertFeed(self.alert_engine)
+        
         # Current viewing symbol
         self.current_symbol = self.preferences.get('current_symbol', 'btcusdt')
         
@@ -41,6 +77,9 @@ class CryptoDashboard:
         # Initialize with current symbol
         self.switch_currency(self.current_symbol)
         
+        # Start alert streams once the window is up
+        self.alert_feed.refresh()
+        
         # Setup window close handler
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
@@ -71,6 +110,65 @@ class CryptoDashboard:
                        background='white',
                        foreground=COLORS['text'])
     
+    def create_menu(self):
+        """Create the menu bar."""
+        menubar = tk.Menu(self.root)
+        
+        diagnostics_menu = tk.Menu(menubar, tearoff=0)
+        diagnostics_menu.add_command(label="Show diagnostics...", command=self.open_diagnostics)
+        diagnostics_menu.add_separator()
+        self.monitor_var = tk.BooleanVar(value=True)
+        diagnostics_menu.add_checkbutton(label="Monitor event loop", variable=self.monitor_var,
+                                         command=self.toggle_monitoring)
+        self.sampler_var = tk.BooleanVar(value=False)
+        diagnostics_menu.add_checkbutton(label="Sampling profiler", variable=self.sampler_var,
+                                         command=lambda: self.sampler_var.set(self.diagnostics.toggle_sampler()))
+        self.cprofile_var = tk.BooleanVar(value=False)
+        diagnostics_menu.add_checkbutton(label="cProfile (Tk thread)", variable=self.cprofile_var,
+                                         command=lambda: self.cprofile_var.set(self.diagnostics.toggle_cprofile()))
+        diagnostics_menu.add_separator()
+        diagnostics_menu.add_command(label="Export report...", command=self.export_diagnostics)
+        menubar.add_cascade(label="Diagnostics", menu=diagnostics_menu)
+        
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="Correlation matrix...",
+                               command=lambda: self.open_tool('components.correlation', 'CorrelationWindow'))
+        tools_menu.add_command(label="Backtest...",
+                               command=lambda: self.open_tool('components.backtest', 'BacktestWindow'))
+        tools_menu.add_command(label="Paper trading...",
+                               command=lambda: self.open_tool('components.paper', 'PaperTradingWindow'))
+        tools_menu.add_command(label="Triangular arbitrage...",
+                               command=lambda: self.open_tool('components.arbitrage', 'ArbitrageWindow'))
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        
+        self.root.config(menu=menubar)
+    
+    def open_tool(self, module_name, class_name):
+        """Open a tool window, importing its module on first use."""
+        tool = getattr(STARTUP.import_module(module_name), class_name)(self.root)
+        self.tool_windows.append(tool)
+    
+    def open_diagnostics(self):
+        """Open the live diagnostics window."""
+        from components.diagnostics import DiagnosticsWindow
+        DiagnosticsWindow(self.root, self.diagnostics)
+    
+    def toggle_monitoring(self):
+        if self.monitor_var.get():
+            self.diagnostics.start_monitoring()
+        else:
+            self.diagnostics.stop_monitoring()
+    
+    def export_diagnostics(self):
+        """Save the diagnostics report, collapsed stacks and pstats."""
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self.root, defaultextension='.txt',
+                                            initialfile='diagnostics.txt')
+        if path:
+            written = self.diagnostics.export(path)
+            if written:
+                messagebox.showinfo("Diagnostics", "Saved:\n" + "\n".join(written))
+    
     def load_preferences(self):
         """Load saved user preferences."""
         try:
@@ -87,12 +185,36 @@ class CryptoDashboard:
     def save_preferences(self):
         """Save user preferences."""
         self.preferences['current_symbol'] = self.current_symbol
+        self.preferences['alerts'] = [rule.text for _, rule in sorted(self.alert_engine.rules.items())]
         try:
             with open('preferences.json', 'w') as f:
                 json.dump(self.preferences, f)
         except:
             pass
     
+    def load_alerts(self):
+        """Load saved alert rules into the engine."""
+        from utils.alerts import parse_rule
+        for text in self.preferences.get('alerts', []):
+            try:
+                self.alert_engine.add_rule(parse_rule(text))
+            except ValueError as e:
+                print(f"Skipping alert: {e}")
+    
+    def open_alerts(self):
+        """Open the alert rules window."""
+        from components.alerts import AlertsDialog
+        AlertsDialog(self.root, self.alert_engine, self.on_alerts_changed)
+    
+    def on_alerts_changed(self):
+        self.alert_feed.refresh()
+        self.save_preferences()
+    
+    def show_alert(self, rule, value):
+        """Show a fired alert in the header."""
+        self.alert_label.config(text=f"🔔 {rule.text}  ({value:,.2f})")
+        self.root.bell()
+    
     def create_control_panel(self):
         """Create the top control panel with dropdown selector."""
         control_frame = tk.Frame(self.main_container, height=70, bg=COLORS['bg_dark'])
@@ -113,22 +235,16 @@ class CryptoDashboard:
                 bg=COLORS['bg_dark'],
                 fg='white').pack(side=tk.LEFT, padx=(0, 10))
         
-        self.currency_var = tk.StringVar()
-        self.currency_combo = ttk.Combobox(
-            selector_frame,
-            textvariable=self.currency_var,
-            values=[symbol_info['name'] for symbol_info in SYMBOLS],
-            state='readonly',
-            width=15,
-            font=("Arial", 11),
-            background='white'
-        )
-        self.currency_combo.pack(side=tk.LEFT, padx=(0, 10))
-        
-        current_symbol_info = next((s for s in SYMBOLS if s['symbol'] == self.current_symbol), SYMBOLS[0])
-        self.currency_var.set(current_symbol_info['name'])
+        from components.symbol_search import SymbolSearch
+        from utils.symbols import UNIVERSE
+        from utils.workers import REST_POOL
+        from utils.ratelimit import BACKGROUND
+        self.currency_search = SymbolSearch(selector_frame, UNIVERSE, self.on_currency_selected)
+        self.currency_search.pack(side=tk.LEFT, padx=(0, 10))
+        self.currency_search.set(self.symbol_info(self.current_symbol)['name'])
         
-        self.currency_combo.bind('<<ComboboxSelected>>', self.on_currency_selected)
+        # Pick up newly listed symbols without blocking startup
+        REST_POOL.submit(UNIVERSE.refresh, priority=BACKGROUND)
         
         panels_frame = tk.Frame(control_frame, bg=COLORS['bg_dark'])
         panels_frame.pack(side=tk.LEFT, padx=50)
@@ -173,6 +289,17 @@ class CryptoDashboard:
         self.asset_display_frame = tk.Frame(self.content_frame, bg=COLORS['bg_dark'])
         self.asset_display_frame.pack(fill=tk.X, pady=(0, 10))
         
+        tk.Button(self.asset_display_frame, text="🔔 Alerts",
+                 font=("Arial", 10),
+                 command=self.open_alerts).pack(side=tk.RIGHT)
+        
+        self.alert_label = tk.Label(self.asset_display_frame,
+                                    text="",
+                                    font=("Arial", 10, "bold"),
+                                    bg=COLORS['bg_dark'],
+                                    fg='white')
+        self.alert_label.pack(side=tk.RIGHT, padx=10)
+        
         self.asset_name_label = tk.Label(self.asset_display_frame, 
                                         text="BTC/USDT",
                                         font=("Arial", 14, "bold"),
@@ -183,19 +310,14 @@ class CryptoDashboard:
         self.panels_container = tk.Frame(self.content_frame, bg=COLORS['bg_dark'])
         self.panels_container.pack(fill=tk.BOTH, expand=True)
     
-    def on_currency_selected(self, event=None):
-        """Handle currency selection from dropdown."""
-        selected_name = self.currency_var.get()
-        if not selected_name:
-            return
-        
-        symbol_info = next((s for s in SYMBOLS if s['name'] == selected_name), None)
-        if not symbol_info:
-            return
-        
-        symbol = symbol_info['symbol']
-        
-        self.switch_currency(symbol)
+    def symbol_info(self, symbol):
+        """Look up a symbol in the exchange universe, defaulting to the first configured one."""
+        from utils.symbols import UNIVERSE
+        return UNIVERSE.get(symbol) or UNIVERSE.get(SYMBOLS[0]['symbol']) or SYMBOLS[0]
+    
+    def on_currency_selected(self, symbol_info):
+        """Handle currency selection from the search box."""
+        self.switch_currency(symbol_info['symbol'])
     
     def switch_currency(self, symbol):
         """Switch to a different currency."""
@@ -203,15 +325,39 @@ class CryptoDashboard:
         
         self.current_symbol = symbol
         
-        symbol_info = next((s for s in SYMBOLS if s['symbol'] == symbol), SYMBOLS[0])
+        symbol_info = self.symbol_info(symbol)
         self.asset_name_label.config(text=symbol_info['name'])
         
         self.create_panels_for_symbol(symbol_info)
         
         self.save_preferences()
     
+    def active_panels(self):
+        """Return the panels currently shown, keyed by panel id."""
+        panels = {
+            'ticker': self.ticker,
+            'orderbook': self.orderbook,
+            'technical': self.technical,
+            'market_trade': self.market_trade,
+        }
+        return {panel_id: panel for panel_id, panel in panels.items() if panel}
+    
+    def remember_session(self):
+        """Copy the data shown by the current panels into the snapshot."""
+        panel_data = {panel_id: panel.get_snapshot()
+                      for panel_id, panel in self.active_panels().items()}
+        update_symbol_snapshot(self.snapshot, self.current_symbol, panel_data)
+    
+    def show_snapshot(self, panel_id, panel, symbol):
+        """Paint the last-session data for a freshly created panel."""
+        data = self.snapshot['symbols'].get(symbol, {}).get(panel_id)
+        if data:
+            panel.show_snapshot(data)
+    
     def stop_current_panels(self):
         """Stop and remove all current panels."""
+        self.remember_session()
+        
         if self.ticker:
             self.ticker.stop()
             self.ticker.frame.pack_forget()
@@ -254,16 +400,18 @@ class CryptoDashboard:
             orderbook_container = tk.Frame(main_bottom_frame, bg=COLORS['bg_dark'])
             orderbook_container.grid(row=0, column=0, padx=(0, 5), pady=5, sticky="nsew")
             
-            self.orderbook = OrderBookPanel(orderbook_container, symbol)
+            self.orderbook = load_panel_class('orderbook')(orderbook_container, symbol)
             self.orderbook.pack(fill=tk.BOTH, expand=True)
+            self.show_snapshot('orderbook', self.orderbook, symbol)
             self.orderbook.start()
  
         if self.panel_vars['technical'].get():
             chart_container = tk.Frame(main_bottom_frame, bg=COLORS['bg_dark'])
             chart_container.grid(row=0, column=1, padx=5, pady=5, sticky="nsew")
             
-            self.technical = TechnicalAnalysisPanel(chart_container, symbol)
+            self.technical = load_panel_class('technical')(chart_container, symbol)
             self.technical.pack(fill=tk.BOTH, expand=True)
+            self.show_snapshot('technical', self.technical, symbol)
             self.technical.start()
         
         if self.panel_vars['ticker'].get() or self.panel_vars['market_trade'].get():
@@ -277,14 +425,16 @@ class CryptoDashboard:
             
             # Ticker panel (top)
             if self.panel_vars['ticker'].get():
-                self.ticker = CryptoTicker(right_container, symbol, name)
+                self.ticker = load_panel_class('ticker')(right_container, symbol, name)
                 self.ticker.grid(row=0, column=0, padx=0, pady=(0, 5), sticky="nsew")
+                self.show_snapshot('ticker', self.ticker, symbol)
                 self.ticker.start()
             
             # Recent Trades panel (bottom)
             if self.panel_vars['market_trade'].get():
-                self.market_trade = MarketTrade(right_container, symbol)
+                self.market_trade = load_panel_class('market_trade')(right_container, symbol)
                 self.market_trade.grid(row=1, column=0, padx=0, pady=5, sticky="nsew")
+                self.show_snapshot('market_trade', self.market_trade, symbol)
                 self.market_trade.start()
     
     def toggle_panel_type(self, panel_type):
@@ -295,7 +445,7 @@ class CryptoDashboard:
                 visible_panels.append(p)
         self.preferences['visible_panels'] = visible_panels
         
-        symbol_info = next((s for s in SYMBOLS if s['symbol'] == self.current_symbol), SYMBOLS[0])
+        symbol_info = self.symbol_info(self.current_symbol)
         self.stop_current_panels()
         self.create_panels_for_symbol(symbol_info)
         
@@ -304,11 +454,44 @@ class CryptoDashboard:
     def on_closing(self):
         """Clean shutdown of all WebSocket connections."""
         self.stop_current_panels()
+        for tool in self.tool_windows:
+            if tool.window.winfo_exists():
+                tool.close()
+        self.alert_feed.stop()
         self.save_preferences()
+        save_snapshot(self.snapshot)
+        from utils.workers import REST_POOL
+        REST_POOL.shutdown()
+        self.diagnostics.shutdown()
         self.root.destroy()
 
+def report_startup():
+    """Print the startup report and append it to the regression log."""
+    STARTUP.mark('mainloop running')
+    print(STARTUP.format())
+    STARTUP.save()
+
 def main():
+    STARTUP.mark('imports done')
+    if '--no-daemon' not in sys.argv:
+        from utils.md_daemon import attach
+        if attach():
+            print("Attached to local market-data daemon")
+    net = None
+    if '--async-net' in sys.argv:
+        from utils.aio import enable
+        net = enable()
     root = tk.Tk()
+    if net:
+        from utils.workers import REST_POOL, TkBridge
+        REST_POOL.bridge = TkBridge(root).start()
+    if METRICS_PORT:
+        from utils.metrics import MetricsServer
+        try:
+            MetricsServer(METRICS_PORT).start()
+            print(f"Metrics at http://127.0.0.1:{METRICS_PORT}/metrics")
+        except OSError as e:
+            print(f"Error starting metrics endpoint: {e}")
     
     root.title("Crypto Dashboard - Market Trade")
     
@@ -317,6 +500,7 @@ def main():
     except Exception as e:
         messagebox.showerror("Error", f"Failed to start application: {str(e)}")
         return
+    STARTUP.mark('dashboard built')
     
     root.update_idletasks()
     width = root.winfo_width()
@@ -325,6 +509,9 @@ def main():
     y = (root.winfo_screenheight() // 2) - (height // 2)
     root.geometry(f'{1400}x{900}+{x}+{y}')
     
+    if '--startup-report' in sys.argv:
+        root.after(0, report_startup)
+    
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,48 @@
+"""Local mock of the Binance REST and WebSocket APIs, with chaos controls.
+
+Serves /api/v3/depth, /trades, /klines and /exchangeInfo plus the /ws/<stream>
+and /stream?streams=... WebSocket endpoints from a seeded synthetic market,
+so the dashboard and utils/binance_api.py can be exercised offline. Point
+the dashboard at it with the BINANCE_REST_URL and BINANCE_WS_URL variables.
+
+Knobs can be changed while it runs:
+    curl "http://127.0.0.1:8765/chaos?drop_rate=0.05&latency_ms=200"
+
+Examples:
+    python mock_exchange.py
+    python mock_exchange.py --rate 10000 --gap-rate 0.001 --disconnect-rate 0.02
+    BINANCE_REST_URL=http://127.0.0.1:8765 BINANCE_WS_URL=ws://127.0.0.1:8765 python main.py --no-daemon
+"""
+import argparse
+from utils.mock_exchange import MockExchange, Chaos, MIN_RATE, MAX_RATE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Binance API with fault injection.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=42, help="seed for prices and chaos")
+    parser.add_argument('--rate', type=float, default=10,
+                        help=f"stream messages per second per connection ({MIN_RATE}-{MAX_RATE})")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="delay added to every answer and frame")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="fraction of stream frames dropped")
+    parser.add_argument('--gap-rate', type=float, default=0.0, help="fraction of messages followed by an id gap")
+    parser.add_argument('--disconnect-rate', type=float, default=0.0,
+                        help="forced disconnects per connection per second")
+    args = parser.parse_args()
+
+    chaos = Chaos(rate=min(MAX_RATE, max(MIN_RATE, args.rate)), latency_ms=args.latency_ms,
+                  drop_rate=args.drop_rate, gap_rate=args.gap_rate, disconnect_rate=args.disconnect_rate)
+    server = MockExchange((args.host, args.port), chaos=chaos, seed=args.seed)
+    print(f"Mock exchange on {server.rest_url} (streams at {server.ws_url})")
+    print(f"Chaos: {chaos.as_dict()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
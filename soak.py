@@ -0,0 +1,178 @@
+"""Long-running soak test for memory and handle leaks.
+
+Drives the dashboard against a local mock feed at high speed while switching
+symbols and toggling panels, samples resource usage over time and exits
+non-zero if any metric keeps growing.
+
+Examples:
+    python soak.py --duration 600
+    python soak.py --duration 14400 --sample-every 30 --output soak.csv
+"""
+import argparse
+import csv
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+METRICS = ['rss_mb', 'threads', 'widgets', 'after_pending', 'traced_mb']
+
+
+def rss_mb():
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+        return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def grows_unbounded(values, tolerance=0.05, slack=0.0):
+    """True if a series rises through each third of the run instead of levelling off.
+
+    A bounded metric can ramp up early (warm-up, caches) but the last two
+    thirds of a long run should not each be higher than the one before.
+    """
+    if len(values) < 9:
+        return False
+    third = len(values) // 3
+    means = [sum(part) / len(part) for part in
+             (values[:third], values[third:2 * third], values[2 * third:])]
+    return all(later > earlier * (1 + tolerance) + slack
+               for earlier, later in zip(means, means[1:]))
+
+
+# Absolute growth below these is noise rather than a leak
+SLACK = {'rss_mb': 5.0, 'threads': 2, 'widgets': 20, 'after_pending': 10, 'traced_mb': 2.0}
+
+
+class SoakRunner:
+    """Schedule chaos and sampling on the Tk loop of a running dashboard."""
+
+    def __init__(self, root, app, args):
+        self.root = root
+        self.app = app
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.samples = []
+        self.started = time.time()
+        self.symbols = [s['symbol'] for s in args.symbol_list]
+
+    def start(self):
+        self.root.after(self.args.toggle_every, self.chaos)
+        self.root.after(int(self.args.warmup * 1000), self.sample)
+        self.root.after(int(self.args.duration * 1000), self.finish)
+
+    def chaos(self):
+        """Switch symbol or toggle a panel, like a user clicking around very fast."""
+        if self.rng.random() < 0.5:
+            self.app.switch_currency(self.rng.choice(self.symbols))
+        else:
+            panel_id = self.rng.choice(list(self.app.panel_vars))
+            var = self.app.panel_vars[panel_id]
+            var.set(not var.get())
+            self.app.toggle_panel_type(panel_id)
+        self.root.after(self.args.toggle_every, self.chaos)
+
+    def sample(self):
+        row = {
+            'elapsed_s': round(time.time() - self.started, 1),
+            'rss_mb': round(rss_mb(), 2),
+            'threads': threading.active_count(),
+            'widgets': count_widgets(self.root),
+            'after_pending': len(self.root.tk.splitlist(self.root.tk.call('after', 'info'))),
+            'traced_mb': round(tracemalloc.get_traced_memory()[0] / 1e6, 2) if tracemalloc.is_tracing() else 0,
+        }
+        self.samples.append(row)
+        print("  ".join(f"{key}={value}" for key, value in row.items()), flush=True)
+        self.root.after(int(self.args.sample_every * 1000), self.sample)
+
+    def finish(self):
+        self.root.quit()
+
+
+def report(samples, output):
+    """Write samples to CSV, print the top allocators and return the leaking metrics."""
+    if output and samples:
+        with open(output, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(samples[0]))
+            writer.writeheader()
+            writer.writerows(samples)
+        print(f"Samples written to {output}")
+
+    if tracemalloc.is_tracing():
+        print("Top allocators:")
+        for stat in tracemalloc.take_snapshot().statistics('lineno')[:10]:
+            print(f"  {stat}")
+
+    leaking = [metric for metric in METRICS
+               if grows_unbounded([row[metric] for row in samples], slack=SLACK[metric])]
+    for metric in METRICS:
+        values = [row[metric] for row in samples]
+        if values:
+            status = "GROWING" if metric in leaking else "ok"
+            print(f"{metric:<14} first={values[0]:<10} last={values[-1]:<10} max={max(values):<10} {status}")
+    return leaking
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test the dashboard against a mock feed.")
+    parser.add_argument('--duration', type=float, default=3600, help="seconds to run")
+    parser.add_argument('--warmup', type=float, default=30, help="seconds before the first sample")
+    parser.add_argument('--sample-every', type=float, default=10, help="seconds between samples")
+    parser.add_argument('--toggle-every', type=int, default=500, help="ms between symbol/panel switches")
+    parser.add_argument('--refresh-ms', type=int, default=100, help="REST refresh interval for panels")
+    parser.add_argument('--stream-rate', type=float, default=50, help="mock messages per second per stream")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='soak.csv')
+    parser.add_argument('--no-tracemalloc', action='store_true')
+    args = parser.parse_args()
+
+    # Patch the API before any panel module binds it
+    from utils.mock_feed import MockMarket, install
+    install(MockMarket(seed=args.seed), rate=args.stream_rate)
+
+    import tkinter as tk
+    import main as dashboard
+    from config import SYMBOLS
+    from components.orderbook import OrderBookPanel
+    from components.market_trade import MarketTrade
+
+    OrderBookPanel.refresh_interval = args.refresh_ms
+    MarketTrade.refresh_interval = args.refresh_ms
+    args.symbol_list = SYMBOLS
+    output = os.path.abspath(args.output) if args.output else None
+
+    # Keep preferences and snapshots written by the app out of the working tree
+    os.chdir(tempfile.mkdtemp(prefix='soak-'))
+
+    if not args.no_tracemalloc:
+        tracemalloc.start(10)
+
+    root = tk.Tk()
+    app = dashboard.CryptoDashboard(root)
+    runner = SoakRunner(root, app, args)
+    runner.start()
+    root.mainloop()
+
+    app.on_closing()
+    leaking = report(runner.samples, output)
+    if leaking:
+        print(f"FAIL: unbounded growth in {', '.join(leaking)}")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
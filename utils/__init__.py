@@ -1,7 +1,22 @@
-from .binance_api import BinanceWebSocket, get_order_book, get_recent_trades, get_klines
-from .indicators import calculate_rsi, calculate_moving_average, calculate_bollinger_bands
+import importlib
 
-__all__ = [
-    'BinanceWebSocket', 'get_order_book', 'get_recent_trades', 'get_klines',
-    'calculate_rsi', 'calculate_moving_average', 'calculate_bollinger_bands',
-]
\ No newline at end of file
+# Submodules are imported on first attribute access so that importing a light
+# helper (e.g. utils.startup) does not pull in requests, websocket and numpy.
+_EXPORTS = {
+    'BinanceWebSocket': '.binance_api',
+    'get_order_book': '.binance_api',
+    'get_recent_trades': '.binance_api',
+    'get_klines': '.binance_api',
+    'calculate_rsi': '.indicators',
+    'calculate_moving_average': '.indicators',
+    'calculate_bollinger_bands': '.indicators',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,267 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import ssl
+import struct
+import threading
+from email.parser import BytesHeaderParser
+from urllib.parse import urlsplit, urlencode
+
+WS_MAGIC = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# WebSocket opcodes
+CONTINUATION, TEXT, BINARY, CLOSE, PING, PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+# Idle keep-alive connections kept per host
+MAX_IDLE = 8
+
+
+def ws_frame(opcode, payload=b""):
+    """One final client frame; clients must mask what they send."""
+    mask = os.urandom(4)
+    n = len(payload)
+    if n < 126:
+        header = struct.pack('!BB', 0x80 | opcode, 0x80 | n)
+    elif n < 65536:
+        header = struct.pack('!BBH', 0x80 | opcode, 0x80 | 126, n)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 0x80 | 127, n)
+    masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return header + mask + masked
+
+
+async def read_frame(reader):
+    """(fin, opcode, payload) of the next frame from the server."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack('!H', await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack('!Q', await reader.readexactly(8))[0]
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+def split_url(url):
+    """(scheme, host, port, path with query) of an http(s) or ws(s) URL."""
+    parts = urlsplit(url)
+    secure = parts.scheme in ('https', 'wss')
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    return secure, parts.hostname, parts.port or (443 if secure else 80), path
+
+
+class AsyncResponse:
+    """The parts of a requests.Response the REST helpers use."""
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise IOError(f"HTTP {self.status_code}")
+
+
+async def read_response(reader):
+    """(status, headers, body, reusable) of one HTTP/1.1 response."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, _, header_bytes = head.partition(b"\r\n")
+    status = int(status_line.split()[1])
+    headers = BytesHeaderParser().parsebytes(header_bytes)
+    reusable = (headers.get('Connection') or '').lower() != 'close'
+    if (headers.get('Transfer-Encoding') or '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Trailers, up to the blank line
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif headers.get('Content-Length') is not None:
+        body = await reader.readexactly(int(headers['Content-Length']))
+    elif status in (204, 304) or 100 <= status < 200:
+        body = b""
+    else:
+        body = await reader.read()
+        reusable = False
+    return status, headers, body, reusable
+
+
+class LoopStream:
+    """A WebSocket kept open on the network loop, reconnecting with backoff.
+
+    Stands in for websocket.WebSocketApp as BinanceWebSocket.ws; close()
+    may be called from any thread.
+    """
+
+    provides_snapshots = False
+
+    def __init__(self, net, url, on_message, on_error, on_reconnect, delay, max_delay):
+        self.net = net
+        self.url = url
+        self.on_message = on_message
+        self.on_error = on_error
+        self.on_reconnect = on_reconnect
+        self.delay = delay
+        self.max_delay = max_delay
+        self.closed = False
+        self.future = net.submit(self.run())
+
+    def close(self):
+        self.closed = True
+        self.future.cancel()
+
+    async def run(self):
+        delay = self.delay
+        loop = asyncio.get_running_loop()
+        while not self.closed:
+            connected_at = loop.time()
+            writer = None
+            try:
+                reader, writer = await self.net.ws_connect(self.url)
+                await self.receive(reader, writer)
+            except asyncio.CancelledError:
+                if writer:
+                    writer.close()
+                raise
+            except Exception as e:
+                self.on_error(e)
+            if writer:
+                writer.close()
+            # A connection that lasted a while starts the backoff over
+            if loop.time() - connected_at > self.max_delay:
+                delay = self.delay
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_delay)
+            self.on_reconnect()
+
+    async def receive(self, reader, writer):
+        """Hand each text message to on_message until the server closes."""
+        parts = []
+        while not self.closed:
+            fin, opcode, payload = await read_frame(reader)
+            if opcode == PING:
+                writer.write(ws_frame(PONG, payload))
+            elif opcode == CLOSE:
+                writer.write(ws_frame(CLOSE, payload[:2]))
+                raise ConnectionError("closed by server")
+            elif opcode in (TEXT, BINARY, CONTINUATION):
+                parts.append(payload)
+                if fin:
+                    message = b"".join(parts)
+                    parts = []
+                    self.on_message(message.decode())
+
+
+class NetLoop:
+    """One asyncio event loop thread serving every stream and REST request.
+
+    Streams are tasks instead of a thread each, and REST requests share
+    keep-alive connections per host, so dozens of streams cost one thread.
+    Callbacks run on the loop thread and must stay short; panels already
+    only note changes there and repaint from Tk.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = None
+        self.idle = {}
+        self.ssl_context = ssl.create_default_context()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.loop.run_forever, name='net-loop', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def in_loop(self):
+        return threading.current_thread() is self.thread
+
+    def submit(self, coro):
+        """Run a coroutine on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def open_stream(self, url, on_message, on_error, on_reconnect, delay=1.0, max_delay=30.0):
+        return LoopStream(self, url, on_message, on_error, on_reconnect, delay, max_delay)
+
+    async def ws_connect(self, url):
+        """Open a WebSocket; returns (reader, writer) after the upgrade."""
+        secure, host, port, path = split_url(url)
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self.ssl_context if secure else None, limit=2 ** 22)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                      f"Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        head = await reader.readuntil(b"\r\n\r\n")
+        status_line, _, header_bytes = head.partition(b"\r\n")
+        accept = base64.b64encode(hashlib.sha1(key.encode() + WS_MAGIC).digest()).decode()
+        if status_line.split()[1:2] != [b"101"] or \
+                BytesHeaderParser().parsebytes(header_bytes).get('Sec-WebSocket-Accept') != accept:
+            writer.close()
+            raise ConnectionError(f"WebSocket upgrade refused: {status_line.decode(errors='replace')}")
+        return reader, writer
+
+    async def fetch(self, url, params=None, headers=None):
+        """GET over a pooled keep-alive connection."""
+        secure, host, port, path = split_url(url)
+        if params:
+            path += ('&' if '?' in path else '?') + urlencode(params)
+        extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+        request = (f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\n"
+                   f"Accept-Encoding: identity\r\n{extra}\r\n").encode()
+        key = (secure, host, port)
+        while True:
+            idle = self.idle.get(key)
+            reused = bool(idle)
+            reader, writer = idle.pop() if reused else await asyncio.open_connection(
+                host, port, ssl=self.ssl_context if secure else None)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, response_headers, body, reusable = await read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    # The server closed the idle connection; try a fresh one
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            pool = self.idle.setdefault(key, [])
+            if reusable and len(pool) < MAX_IDLE:
+                pool.append((reader, writer))
+            else:
+                writer.close()
+            return AsyncResponse(status, response_headers, body)
+
+    def get(self, url, params=None, headers=None, timeout=10):
+        """Blocking GET for callers on other threads."""
+        future = self.submit(asyncio.wait_for(self.fetch(url, params, headers), timeout))
+        return future.result(timeout + 1)
+
+
+def enable():
+    """Route streams and REST calls through one asyncio loop thread from now on."""
+    import utils.binance_api as api
+    if api.NET is None:
+        api.NET = NetLoop().start()
+    return api.NET
@@ -0,0 +1,278 @@
+import bisect
+import math
+import itertools
+import re
+import threading
+import time
+from utils.binance_api import BinanceWebSocket, get_klines
+from utils.indicators import compute
+from utils.workers import REST_POOL
+from utils.ratelimit import BACKGROUND
+
+ABOVE = '>'
+BELOW = '<'
+CROSSES = 'crosses'
+
+# Closes RSI alerts are computed over: the chart's 100 candles, so both show the same Wilder RSI
+RSI_WINDOW = 100
+
+
+class AlertRule:
+    """A threshold on one metric of one symbol, e.g. btcusdt price > 70000."""
+
+    def __init__(self, symbol, metric, op, threshold, cooldown=60.0, text=None):
+        self.id = None
+        self.symbol = symbol.lower()
+        self.metric = metric
+        self.op = op
+        self.threshold = float(threshold)
+        self.cooldown = cooldown
+        self.text = text or f"{self.symbol} {metric} {op} {self.threshold:g}"
+        self.last_fired = None
+
+    def key(self):
+        """Identity used to collapse duplicate rules."""
+        return (self.symbol, self.metric, self.op, self.threshold)
+
+
+class ThresholdIndex:
+    """Sorted thresholds for one (symbol, metric), split by crossing direction.
+
+    A tick moving the value from prev to value only has to look at the
+    thresholds between the two, found with bisect in O(log n + k).
+    """
+
+    def __init__(self):
+        self.up_thresholds = []
+        self.up_rules = []
+        self.down_thresholds = []
+        self.down_rules = []
+        self.last_value = None
+
+    def add(self, rule):
+        if rule.op in (ABOVE, CROSSES):
+            i = bisect.bisect_right(self.up_thresholds, rule.threshold)
+            self.up_thresholds.insert(i, rule.threshold)
+            self.up_rules.insert(i, rule)
+        if rule.op in (BELOW, CROSSES):
+            i = bisect.bisect_right(self.down_thresholds, rule.threshold)
+            self.down_thresholds.insert(i, rule.threshold)
+            self.down_rules.insert(i, rule)
+
+    def remove(self, rule):
+        for thresholds, rules in ((self.up_thresholds, self.up_rules),
+                                  (self.down_thresholds, self.down_rules)):
+            lo = bisect.bisect_left(thresholds, rule.threshold)
+            hi = bisect.bisect_right(thresholds, rule.threshold)
+            for i in range(lo, hi):
+                if rules[i] is rule:
+                    del thresholds[i]
+                    del rules[i]
+                    break
+
+    def __len__(self):
+        return len(self.up_rules) + len(self.down_rules)
+
+    def crossed(self, value):
+        """Return the rules crossed by moving from the last value to value."""
+        prev = self.last_value
+        self.last_value = value
+        if prev is None or value == prev:
+            return []
+        if value > prev:
+            # prev <= threshold < value
+            lo = bisect.bisect_left(self.up_thresholds, prev)
+            hi = bisect.bisect_left(self.up_thresholds, value)
+            return self.up_rules[lo:hi]
+        # value < threshold <= prev
+        lo = bisect.bisect_right(self.down_thresholds, value)
+        hi = bisect.bisect_right(self.down_thresholds, prev)
+        return self.down_rules[lo:hi]
+
+
+class AlertEngine:
+    """Evaluate alert rules against streaming metric values."""
+
+    def __init__(self, on_alert=None):
+        self.on_alert = on_alert
+        self.rules = {}
+        self.rules_by_key = {}
+        self.indexes = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add_rule(self, rule):
+        """Add a rule, returning the existing one if an identical rule is set."""
+        with self._lock:
+            existing = self.rules_by_key.get(rule.key())
+            if existing:
+                return existing
+            rule.id = next(self._ids)
+            self.rules[rule.id] = rule
+            self.rules_by_key[rule.key()] = rule
+            self.indexes.setdefault((rule.symbol, rule.metric), ThresholdIndex()).add(rule)
+            return rule
+
+    def remove_rule(self, rule_id):
+        with self._lock:
+            rule = self.rules.pop(rule_id, None)
+            if not rule:
+                return
+            del self.rules_by_key[rule.key()]
+            index = self.indexes[(rule.symbol, rule.metric)]
+            index.remove(rule)
+            if not len(index):
+                del self.indexes[(rule.symbol, rule.metric)]
+
+    def watched(self):
+        """Return the (symbol, metric) pairs that have at least one rule."""
+        with self._lock:
+            return list(self.indexes)
+
+    def update(self, symbol, metric, value, now=None):
+        """Feed a new metric value and fire the rules it crossed."""
+        now = time.time() if now is None else now
+        fired = []
+        with self._lock:
+            index = self.indexes.get((symbol, metric))
+            if index is None:
+                return fired
+            for rule in index.crossed(value):
+                if rule.last_fired is not None and now - rule.last_fired < rule.cooldown:
+                    continue
+                rule.last_fired = now
+                fired.append((rule, value))
+        if self.on_alert:
+            for rule, fired_value in fired:
+                self.on_alert(rule, fired_value)
+        return fired
+
+
+_RULE_PATTERN = re.compile(
+    r'^(?:(?P<metric>price|spread|rsi\(\d+\))\s+on\s+)?'
+    r'(?P<symbol>[a-z0-9]+)'
+    r'(?:\s+(?P<metric2>price|spread|rsi\(\d+\)))?'
+    r'(?:\s+(?P<interval>\d+[mhdw]))?'
+    r'\s+(?P<op>>|<|crosses)'
+    r'\s+(?P<value>[\d.]+)(?P<suffix>[km])?'
+    r'(?:\s*bps)?$'
+)
+
+QUOTE_ASSETS = ('usdt', 'busd', 'usdc', 'btc', 'eth', 'bnb')
+
+
+def parse_rule(text, cooldown=60.0):
+    """Parse rules like "BTC crosses 70k", "RSI(14) on ETH 1h > 70" or "BTC spread > 5 bps"."""
+    match = _RULE_PATTERN.match(text.strip().lower())
+    if not match:
+        raise ValueError(f"Cannot parse alert: {text!r}")
+
+    symbol = match['symbol']
+    if not any(symbol.endswith(quote) and symbol != quote for quote in QUOTE_ASSETS):
+        symbol += 'usdt'
+
+    value = float(match['value']) * {'k': 1e3, 'm': 1e6, None: 1}[match['suffix']]
+
+    metric = match['metric'] or match['metric2'] or 'price'
+    if metric == 'spread':
+        metric = 'spread_bps'
+    elif metric.startswith('rsi'):
+        period = metric[4:-1]
+        metric = f"rsi{period}@{match['interval'] or '1h'}"
+
+    return AlertRule(symbol, metric, match['op'], value, cooldown=cooldown, text=text.strip())
+
+
+class AlertFeed:
+    """Subscribe to the streams the engine's rules need and feed it every tick.
+
+    Prices come from miniTicker, spreads from bookTicker and RSI from kline
+    streams, all over one combined WebSocket for every watched symbol.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.ws_manager = None
+        self.streams = []
+        self.rsi_periods = {}
+        self.closes = {}
+
+    def refresh(self):
+        """Resubscribe if the set of watched metrics changed."""
+        streams = set()
+        rsi_periods = {}
+        for symbol, metric in self.engine.watched():
+            if metric == 'price':
+                streams.add(f"{symbol}@miniTicker")
+            elif metric == 'spread_bps':
+                streams.add(f"{symbol}@bookTicker")
+            elif metric.startswith('rsi'):
+                period, interval = metric[3:].split('@')
+                streams.add(f"{symbol}@kline_{interval}")
+                rsi_periods.setdefault((symbol, interval), set()).add(int(period))
+
+        self.rsi_periods = rsi_periods
+        streams = sorted(streams)
+        if streams == self.streams:
+            return
+        self.stop()
+        self.streams = streams
+        if not streams:
+            return
+
+        for key in self.rsi_periods:
+            if key not in self.closes:
+                REST_POOL.submit(self._backfill, *key, priority=BACKGROUND)
+
+        self.ws_manager = BinanceWebSocket(
+            on_message_callback=self.on_message,
+            on_error_callback=lambda err: print(f"Alert feed error: {err}")
+        )
+        self.ws_manager.connect_multiple(streams)
+
+    def stop(self):
+        if self.ws_manager:
+            self.ws_manager.disconnect()
+            self.ws_manager = None
+        self.streams = []
+
+    def _backfill(self, symbol, interval):
+        """Load enough closed candles to compute RSI from the first tick."""
+        klines = get_klines(symbol, interval, RSI_WINDOW)
+        if klines:
+            self.closes[(symbol, interval)] = ([float(k[4]) for k in klines], int(klines[-1][0]))
+
+    def on_message(self, message):
+        data = message.get('data', message)
+        event = data.get('e')
+        symbol = data.get('s', '').lower()
+
+        if event == '24hrMiniTicker':
+            self.engine.update(symbol, 'price', float(data['c']))
+        elif event == 'kline':
+            self._on_kline(symbol, data['k'])
+        elif 'b' in data and 'a' in data:
+            # bookTicker messages carry no event type
+            bid = float(data['b'])
+            ask = float(data['a'])
+            mid = (bid + ask) / 2
+            if mid > 0:
+                self.engine.update(symbol, 'spread_bps', (ask - bid) / mid * 10000)
+
+    def _on_kline(self, symbol, kline):
+        key = (symbol, kline['i'])
+        if key not in self.closes:
+            return
+        closes, last_open = self.closes[key]
+        close = float(kline['c'])
+        if kline['t'] == last_open:
+            closes[-1] = close
+        elif kline['t'] > last_open:
+            closes.append(close)
+            del closes[:-RSI_WINDOW]
+            self.closes[key] = (closes, kline['t'])
+
+        for period in self.rsi_periods.get(key, ()):
+            rsi = compute('rsi', symbol, kline['i'], closes, period=period)[0][-1]
+            if not math.isnan(rsi):
+                self.engine.update(symbol, f"rsi{period}@{kline['i']}", float(rsi))
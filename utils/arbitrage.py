@@ -0,0 +1,208 @@
+import itertools
+import math
+import threading
+import utils.binance_api as api
+from utils.symbols import QUOTE_RANK
+
+NAN = float('nan')
+
+
+def pair_assets(pairs):
+    """(symbol, base, quote) for SYMBOLS-style entries named like 'ETH/BTC'."""
+    return [(p['symbol'].lower(), *p['name'].upper().split('/')) for p in pairs]
+
+
+class Loop:
+    """One way round a triangle of assets, as three (pair index, sell) legs.
+
+    Selling converts base to quote at the bid; buying converts quote to base
+    at 1 / ask. gross is what one unit of the start asset comes back as, net
+    is the return after a taker fee on every leg.
+    """
+
+    __slots__ = ('assets', 'legs', 'gross', 'net')
+
+    def __init__(self, assets, legs):
+        self.assets = assets
+        self.legs = legs
+        self.gross = NAN
+        self.net = NAN
+
+    @property
+    def path(self):
+        return " > ".join(self.assets + self.assets[:1])
+
+
+class Cross:
+    """A pair X/Y priced through a third asset Q: sell X for Q then Q for Y, and back.
+
+    `bid_legs` turn one X into Y, `ask_legs` turn one Y into X, so the
+    implied bid is their product and the implied ask its reciprocal.
+    """
+
+    __slots__ = ('pair', 'via', 'bid_legs', 'ask_legs', 'bid', 'ask', 'deviation')
+
+    def __init__(self, pair, via, bid_legs, ask_legs):
+        self.pair = pair
+        self.via = via
+        self.bid_legs = bid_legs
+        self.ask_legs = ask_legs
+        self.bid = NAN
+        self.ask = NAN
+        self.deviation = NAN
+
+
+class ArbitrageGraph:
+    """Cross rates and triangular loop returns over the top of book of related pairs.
+
+    Triangles and implied crosses are found once from the pairs' assets, and
+    each pair keeps the loops and crosses it is a leg of. A book change only
+    recomputes those, so one update costs a handful of multiplications however
+    many pairs are watched. Pairs in no triangle are left out.
+    """
+
+    def __init__(self, pairs, fee_bps=10.0):
+        # A pair listed twice (e.g. in SYMBOLS and ARB_PAIRS) is one pair
+        pairs = list({symbol: (symbol, base, quote) for symbol, base, quote in pairs}.values())
+        edges = {}
+        for i, (symbol, base, quote) in enumerate(pairs):
+            edges[(base, quote)] = (i, True)
+            edges[(quote, base)] = (i, False)
+        assets = sorted({a for _, base, quote in pairs for a in (base, quote)})
+        # Loops start from the most cash-like asset, the way they would be traded
+        rank = lambda a: (QUOTE_RANK.get(a, len(QUOTE_RANK)), a)
+
+        loops = []
+        for trio in itertools.combinations(assets, 3):
+            if all((a, b) in edges for a, b in itertools.combinations(trio, 2)):
+                start, b, c = sorted(trio, key=rank)
+                for path in ((start, b, c), (start, c, b)):
+                    legs = tuple(edges[(path[k], path[(k + 1) % 3])] for k in range(3))
+                    loops.append(Loop(path, legs))
+
+        crosses = []
+        for i, (symbol, base, quote) in enumerate(pairs):
+            for via in assets:
+                if (base, via) in edges and (via, quote) in edges:
+                    crosses.append(Cross(i, via, (edges[(base, via)], edges[(via, quote)]),
+                                         (edges[(quote, via)], edges[(via, base)])))
+
+        used = sorted({i for loop in loops for i, _ in loop.legs})
+        renumber = {old: new for new, old in enumerate(used)}
+        for loop in loops:
+            loop.legs = tuple((renumber[i], sell) for i, sell in loop.legs)
+        for cross in crosses:
+            cross.pair = renumber[cross.pair]
+            cross.bid_legs = tuple((renumber[i], sell) for i, sell in cross.bid_legs)
+            cross.ask_legs = tuple((renumber[i], sell) for i, sell in cross.ask_legs)
+
+        self.pairs = [pairs[i] for i in used]
+        self.index = {symbol: i for i, (symbol, _, _) in enumerate(self.pairs)}
+        self.loops = loops
+        self.crosses = crosses
+        self.bids = [NAN] * len(used)
+        self.asks = [NAN] * len(used)
+        # Dependency graph: pair index -> loops and crosses it is a leg of
+        self.loop_deps = [[] for _ in used]
+        self.cross_deps = [[] for _ in used]
+        for j, loop in enumerate(loops):
+            for i, _ in loop.legs:
+                self.loop_deps[i].append(j)
+        for j, cross in enumerate(crosses):
+            for i in {cross.pair} | {i for i, _ in cross.bid_legs}:
+                self.cross_deps[i].append(j)
+        self.fee_bps = fee_bps
+        self.updates = 0
+        self.evaluations = 0
+
+    @property
+    def symbols(self):
+        return [symbol for symbol, _, _ in self.pairs]
+
+    def rate(self, legs):
+        """Amount out per unit in along the legs at the current top of book (NaN until all are known)."""
+        rate = 1.0
+        for i, sell in legs:
+            rate *= self.bids[i] if sell else 1.0 / self.asks[i]
+        return rate
+
+    def evaluate_loop(self, loop):
+        loop.gross = self.rate(loop.legs)
+        loop.net = loop.gross * (1 - self.fee_bps / 10_000) ** len(loop.legs) - 1
+        self.evaluations += 1
+
+    def evaluate_cross(self, cross):
+        cross.bid = self.rate(cross.bid_legs)
+        cross.ask = 1.0 / self.rate(cross.ask_legs)
+        mid = (self.bids[cross.pair] + self.asks[cross.pair]) / 2
+        cross.deviation = (mid / ((cross.bid + cross.ask) / 2) - 1) * 10_000
+        self.evaluations += 1
+
+    def update(self, symbol, bid, ask):
+        """Take a pair's best bid and ask; recompute what depends on it. False if nothing changed."""
+        i = self.index.get(symbol)
+        if i is None or (self.bids[i] == bid and self.asks[i] == ask):
+            return False
+        # An empty side comes as 0; leave what depends on it unpriced
+        self.bids[i] = bid or NAN
+        self.asks[i] = ask or NAN
+        self.updates += 1
+        for j in self.loop_deps[i]:
+            self.evaluate_loop(self.loops[j])
+        for j in self.cross_deps[i]:
+            self.evaluate_cross(self.crosses[j])
+        return True
+
+    def set_fee(self, fee_bps):
+        """Change the per-leg taker fee; every loop is recomputed."""
+        self.fee_bps = fee_bps
+        for loop in self.loops:
+            self.evaluate_loop(loop)
+
+
+class ArbitrageFeed:
+    """Follows the bookTicker stream of every pair in a triangle and keeps an ArbitrageGraph current."""
+
+    def __init__(self, pairs, fee_bps=10.0):
+        self.graph = ArbitrageGraph(pair_assets(pairs), fee_bps)
+        self.version = 0
+        self.lock = threading.Lock()
+        self.ws_manager = None
+
+    def start(self):
+        if not self.graph.pairs:
+            return self
+        self.ws_manager = api.BinanceWebSocket(
+            on_message_callback=self.on_message,
+            on_error_callback=lambda err: print(f"Arbitrage stream error: {err}")
+        )
+        self.ws_manager.connect_multiple([f"{s}@bookTicker" for s in self.graph.symbols])
+        return self
+
+    def stop(self):
+        if self.ws_manager:
+            self.ws_manager.disconnect()
+            self.ws_manager = None
+
+    def on_message(self, msg):
+        # Stream thread
+        data = msg['data']
+        with self.lock:
+            if self.graph.update(data['s'].lower(), float(data['b']), float(data['a'])):
+                self.version += 1
+
+    def set_fee(self, fee_bps):
+        with self.lock:
+            self.graph.set_fee(fee_bps)
+            self.version += 1
+
+    def snapshot(self):
+        """Version, loop rows (path, gross, net) best first, cross rows, updates and evaluations."""
+        with self.lock:
+            graph = self.graph
+            loops = sorted(((loop.path, loop.gross, loop.net) for loop in graph.loops),
+                           key=lambda row: -math.inf if math.isnan(row[2]) else row[2], reverse=True)
+            crosses = [(graph.pairs[c.pair][0], c.via, graph.bids[c.pair], graph.asks[c.pair],
+                        c.bid, c.ask, c.deviation) for c in graph.crosses]
+            return {'version': self.version, 'loops': loops, 'crosses': crosses,
+                    'updates': graph.updates, 'evaluations': graph.evaluations}
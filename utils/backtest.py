@@ -0,0 +1,266 @@
+import math
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import numpy as np
+from config import INTERVAL_MS
+
+# Parameters of each strategy; sweeps run one task per value of the first
+STRATEGIES = {
+    'rsi_ma': ('ma', 'rsi_low', 'rsi_high'),
+    'ma_cross': ('fast', 'slow'),
+    'bollinger': ('period', 'num_std'),
+}
+
+# Parameters that are candle counts rather than thresholds
+INTEGER_PARAMS = {'ma', 'fast', 'slow', 'period'}
+
+RSI_PERIOD = 14
+
+
+def ema(values, alpha, initial):
+    """y[t] = alpha * x[t] + (1 - alpha) * y[t-1], starting from y[-1] = initial.
+
+    Vectorized a block at a time: inside a block the recursion unrolls to a
+    cumulative sum of x weighted by (1 - alpha) ** -i, and blocks are kept
+    short enough that those weights stay well inside float range.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(x)
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[:] = x
+        return out
+    block = max(1, min(4096, int(50 / -math.log(decay))))
+    powers = decay ** np.arange(block)
+    weights = 1.0 / powers
+    prev = initial
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        n = len(chunk)
+        out[start:start + n] = powers[:n] * (decay * prev + alpha * np.cumsum(chunk * weights[:n]))
+        prev = out[start + n - 1]
+    return out
+
+
+def sma(values, period):
+    """Simple moving average; NaN until `period` values are available."""
+    x = np.asarray(values, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        csum = np.cumsum(np.concatenate(([0.0], x)))
+        out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def rolling_std(values, period):
+    """Population standard deviation over `period` values; NaN before that."""
+    x = np.asarray(values, dtype=np.float64)
+    # Centre first so the squares keep their precision at high prices
+    x = x - x.mean() if len(x) else x
+    variance = sma(x * x, period) - sma(x, period) ** 2
+    return np.sqrt(np.clip(variance, 0, None))
+
+
+def rsi(closes, period=RSI_PERIOD):
+    """Wilder's RSI, the same values as indicators.rsi_series without the Python loop."""
+    closes = np.asarray(closes, dtype=np.float64)
+    out = np.full(len(closes), np.nan)
+    if len(closes) < period + 1:
+        return out
+    deltas = np.diff(closes)
+    gains = np.clip(deltas, 0, None)
+    losses = np.clip(-deltas, 0, None)
+    first_gain, first_loss = gains[:period].mean(), losses[:period].mean()
+    avg_gain = np.concatenate(([first_gain], ema(gains[period:], 1 / period, first_gain)))
+    avg_loss = np.concatenate(([first_loss], ema(losses[period:], 1 / period, first_loss)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100 - 100 / (1 + avg_gain / avg_loss)
+    out[period:] = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), values)
+    return out
+
+
+def hold(entries, exits):
+    """Long/flat position from entry and exit signals, carrying the last one forward.
+
+    An exit wins when both fire on the same candle.
+    """
+    marks = np.where(exits, 0, np.where(entries, 1, -1))
+    last = np.where(marks >= 0, np.arange(len(marks)), -1)
+    np.maximum.accumulate(last, out=last)
+    return np.where(last >= 0, marks[last], 0).astype(np.int8)
+
+
+class IndicatorCache:
+    """Small per-process memo of indicator arrays, so a sweep computes each once."""
+
+    def __init__(self, size=8):
+        self.size = size
+        self.items = OrderedDict()
+
+    def get(self, key, compute):
+        if key in self.items:
+            self.items.move_to_end(key)
+            return self.items[key]
+        value = self.items[key] = compute()
+        if len(self.items) > self.size:
+            self.items.popitem(last=False)
+        return value
+
+
+def positions(strategy, closes, params, cache):
+    """Position (0 or 1) held after each candle's close."""
+    if strategy == 'rsi_ma':
+        ma, rsi_low, rsi_high = params
+        # Buy oversold dips while the moving average is rising, sell once overbought
+        trend = cache.get(('sma', ma), lambda: sma(closes, ma))
+        strength = cache.get(('rsi', RSI_PERIOD), lambda: rsi(closes))
+        rising = np.concatenate(([False], np.diff(trend) > 0))
+        return hold((strength < rsi_low) & rising, strength > rsi_high)
+    if strategy == 'ma_cross':
+        fast, slow = params
+        fast_ma = cache.get(('sma', fast), lambda: sma(closes, fast))
+        slow_ma = cache.get(('sma', slow), lambda: sma(closes, slow))
+        return (fast_ma > slow_ma).astype(np.int8)
+    if strategy == 'bollinger':
+        period, num_std = params
+        middle = cache.get(('sma', period), lambda: sma(closes, period))
+        std = cache.get(('std', period), lambda: rolling_std(closes, period))
+        return hold(closes < middle - num_std * std, closes > middle)
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+
+def evaluate(closes, position, periods_per_year, fee_bps=10.0):
+    """Performance of holding `position` from each close to the next.
+
+    Fees are charged on every change of position. Returns total return,
+    annualized Sharpe, max drawdown, trade count, win rate and exposure.
+    """
+    returns = np.diff(closes) / closes[:-1]
+    held = position[:-1]
+    changes = np.diff(np.concatenate(([0], held)))
+    strategy_returns = held * returns - np.abs(changes) * fee_bps / 10_000
+    equity = np.cumprod(1 + strategy_returns)
+    peaks = np.maximum.accumulate(equity)
+    std = strategy_returns.std()
+
+    # Each trade's compounded return, from the candles it was open
+    trade_ids = np.cumsum(changes > 0) * held
+    trade_returns = np.bincount(trade_ids, weights=np.log1p(strategy_returns))[1:]
+    trades = len(trade_returns)
+    return {
+        'return': float(equity[-1] - 1) if len(equity) else 0.0,
+        'sharpe': float(strategy_returns.mean() / std * math.sqrt(periods_per_year)) if std > 0 else 0.0,
+        'max_drawdown': float((1 - equity / peaks).max()) if len(equity) else 0.0,
+        'trades': trades,
+        'win_rate': float((trade_returns > 0).mean()) if trades else 0.0,
+        'exposure': float(held.mean()) if len(held) else 0.0,
+    }
+
+
+def run_backtest(closes, strategy, params, interval='1m', fee_bps=10.0, cache=None):
+    """Backtest one parameter set over an array of closes."""
+    closes = np.asarray(closes, dtype=np.float64)
+    position = positions(strategy, closes, params, cache or IndicatorCache())
+    return evaluate(closes, position, 365 * 86_400_000 / INTERVAL_MS[interval], fee_bps)
+
+
+def parse_values(text, cast=float):
+    """Values from "5-200/5" (start-stop/step, inclusive) or "20, 25, 30"."""
+    values = []
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part[1:]:
+            span, _, step = part.partition('/')
+            start, stop = span.split('-', 1)
+            start, stop, step = float(start), float(stop), float(step or 1)
+            if step <= 0:
+                raise ValueError(f"Step must be positive: {part}")
+            values.extend(cast(v) for v in np.arange(start, stop + step / 2, step).round(10))
+        else:
+            values.append(cast(float(part)))
+    if not values:
+        raise ValueError("No values given")
+    return values
+
+
+def load_closes(symbol, interval):
+    """Closes from the local store, or the last 1000 candles from the API when nothing is stored.
+
+    Empty when both fail, so the caller can say there is not enough data.
+    """
+    from utils.store import STORE
+    closes = STORE.read_klines(symbol, interval)['close']
+    if len(closes):
+        return closes
+    from utils.binance_api import get_klines
+    klines = get_klines(symbol, interval, 1000)
+    return np.array([float(k[4]) for k in klines or []], dtype=float)
+
+
+# Set in each sweep process by _init_worker, so the closes are sent once per process
+_closes = None
+_settings = None
+_cache = None
+
+
+def _init_worker(closes, interval, fee_bps):
+    global _closes, _settings, _cache
+    _closes = closes
+    _settings = (interval, fee_bps)
+    _cache = IndicatorCache()
+
+
+def _run_group(strategy, param_sets):
+    interval, fee_bps = _settings
+    return [(params, run_backtest(_closes, strategy, params, interval, fee_bps, _cache))
+            for params in param_sets]
+
+
+class Sweep:
+    """Backtest every combination of parameter values across all cores.
+
+    Tasks are grouped by the first parameter, so each process computes
+    that parameter's indicator once for all the combinations sharing it.
+    Poll progress() and results() from the UI; nothing here blocks.
+    """
+
+    def __init__(self, closes, strategy, grid, interval='1m', fee_bps=10.0, workers=None):
+        names = STRATEGIES[strategy]
+        groups = {}
+        for params in product(*(grid[name] for name in names)):
+            groups.setdefault(params[0], []).append(params)
+        self.total = sum(len(group) for group in groups.values())
+        # Spawned, not forked: the dashboard process has Tk and network threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(np.asarray(closes, dtype=np.float64), interval, fee_bps))
+        self.futures = [self.executor.submit(_run_group, strategy, group) for group in groups.values()]
+        self.executor.shutdown(wait=False)
+
+    def progress(self):
+        """(parameter sets done, total)."""
+        done = sum(len(f.result()) for f in self.futures if f.done() and not f.cancelled() and not f.exception())
+        return done, self.total
+
+    def done(self):
+        return all(f.done() for f in self.futures)
+
+    def results(self):
+        """[(params, metrics)] for every finished parameter set."""
+        results = []
+        for future in self.futures:
+            if future.done() and not future.cancelled():
+                if future.exception():
+                    print(f"Error in backtest: {future.exception()}")
+                    continue
+                results.extend(future.result())
+        return results
+
+    def cancel(self):
+        for future in self.futures:
+            future.cancel()
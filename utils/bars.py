@@ -0,0 +1,157 @@
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from utils.binance_api import get_agg_trades
+from utils.store import STORE, agg_trades_to_columns, utc_today
+
+BAR_KINDS = ('time', 'tick', 'volume', 'dollar')
+
+
+def bar_keys(kind, size, prices, qtys, times):
+    """Bar number of each trade, and the running measure after the last one.
+
+    A trade belongs to bar floor(measure before it / size), where the measure
+    is time for time bars, else the running trade count, base volume or
+    quote volume.
+    """
+    if kind == 'time':
+        return times // int(size), 0.0
+    if kind == 'tick':
+        measure = np.ones(len(prices))
+    elif kind == 'volume':
+        measure = qtys
+    else:
+        measure = prices * qtys
+    running = np.cumsum(measure)
+    return np.floor((running - measure) / size).astype(np.int64), float(running[-1]) if len(running) else 0.0
+
+
+def auto_size(kind, prices, qtys, times, bar_ms=60_000):
+    """Volume or dollar bar size giving about one bar per bar_ms over the trades, to 2 significant digits."""
+    if len(times) < 2:
+        return None
+    measure = qtys.sum() if kind == 'volume' else (prices * qtys).sum()
+    bars = max(1.0, (times[-1] - times[0]) / bar_ms)
+    return float(f"{measure / bars:.2g}") or None
+
+
+class BarBuilder:
+    """OHLCV bars built locally from trades.
+
+    Bars close when a running measure crosses a multiple of size: time in
+    ms, trade count (tick bars), base volume or quote (dollar) volume. A new
+    trade only compares its bar number with the open bar's and updates one
+    row, so adding it is O(1); backfill applies the same rule vectorized over
+    whole trade columns. Time bars with no trades are skipped. Rows are
+    [open time, open, high, low, close, volume] in a ring of `capacity`.
+    """
+
+    def __init__(self, kind, size, capacity=2000):
+        if kind not in BAR_KINDS:
+            raise ValueError(f"Unknown bar kind: {kind}")
+        self.kind = kind
+        self.size = size
+        self.capacity = capacity
+        self.rows = np.zeros((capacity, 6))
+        self.head = 0
+        self.count = 0
+        self.key = None
+        self.total = 0.0
+        self.last_id = -1
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def add(self, trade_id, price, qty, time_ms):
+        """Add one trade; ids at or below the newest one are ignored."""
+        with self.lock:
+            if trade_id <= self.last_id:
+                return
+            self.last_id = trade_id
+            if self.kind == 'time':
+                key = time_ms // self.size
+            else:
+                key = int(self.total // self.size)
+                self.total += 1 if self.kind == 'tick' else qty if self.kind == 'volume' else price * qty
+            if key != self.key:
+                self.key = key
+                i = self.head
+                self.rows[i] = (key * self.size if self.kind == 'time' else time_ms, price, price, price, price, qty)
+                self.head = (i + 1) % self.capacity
+                self.count = min(self.count + 1, self.capacity)
+            else:
+                row = self.rows[self.head - 1]
+                if price > row[2]:
+                    row[2] = price
+                elif price < row[3]:
+                    row[3] = price
+                row[4] = price
+                row[5] += qty
+            self.version += 1
+
+    def backfill(self, ids, prices, qtys, times):
+        """Replace the bars with ones built from trade columns, oldest first."""
+        with self.lock:
+            self.head = 0
+            self.count = 0
+            self.key = None
+            self.total = 0.0
+            self.version += 1
+            if not len(prices):
+                return
+            keys, self.total = bar_keys(self.kind, self.size, prices, qtys, times)
+            starts = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))[-self.capacity:]
+            # reduceat over the trades from the first kept bar on
+            first = starts[0]
+            offsets = starts - first
+            n = len(starts)
+            self.rows[:n, 0] = keys[starts] * self.size if self.kind == 'time' else times[starts]
+            self.rows[:n, 1] = prices[starts]
+            self.rows[:n, 2] = np.maximum.reduceat(prices[first:], offsets)
+            self.rows[:n, 3] = np.minimum.reduceat(prices[first:], offsets)
+            self.rows[:n, 4] = prices[np.append(starts[1:], len(prices)) - 1]
+            self.rows[:n, 5] = np.add.reduceat(qtys[first:], offsets)
+            self.head = n % self.capacity
+            self.count = n
+            self.key = keys[-1]
+            self.last_id = int(ids[-1])
+
+    def copy_into(self, series, limit=100):
+        """Load the newest bars, oldest first, into a CandleSeries."""
+        with self.lock:
+            n = min(limit, self.count)
+            first = (self.head - n) % self.capacity
+            if first + n <= self.capacity:
+                series.load(self.rows[first:first + n])
+            else:
+                series.load(np.concatenate([self.rows[first:], self.rows[:self.head]]))
+
+
+def load_trade_history(symbol, start_ms, max_pages=20):
+    """aggTrade columns (agg_id, price, qty, time) since start_ms, oldest first.
+
+    Pages back from the newest trade over REST, and uses trades stored by
+    download.py for the older part when they join up with the oldest page.
+    History starts later than start_ms if the page budget runs out first.
+    """
+    pages = []
+    from_id = None
+    for _ in range(max_pages):
+        trades = get_agg_trades(symbol, from_id=from_id)
+        if not trades:
+            break
+        pages.append(trades)
+        oldest = trades[0]
+        if oldest['T'] <= start_ms or oldest['a'] == 0:
+            break
+        from_id = max(0, oldest['a'] - len(trades))
+    recent = agg_trades_to_columns([t for page in reversed(pages) for t in page])
+    _, unique = np.unique(recent['agg_id'], return_index=True)
+    recent = {name: column[unique] for name, column in recent.items()}
+
+    start_day = datetime.fromtimestamp(start_ms / 1000, timezone.utc).date()
+    stored = STORE.read_agg_trades(symbol, start_day, utc_today())
+    if len(stored['agg_id']) and (not len(recent['agg_id']) or stored['agg_id'][-1] >= recent['agg_id'][0] - 1):
+        older = stored['agg_id'] < (recent['agg_id'][0] if len(recent['agg_id']) else np.inf)
+        recent = {name: np.concatenate([stored[name][older], recent[name]]) for name in recent}
+    keep = recent['time'] >= start_ms
+    return {name: recent[name][keep] for name in ('agg_id', 'price', 'qty', 'time')}
@@ -1,14 +1,56 @@
 import websocket
 import json
 import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from utils.metrics import METRICS
+from utils.ratelimit import LIMITER, current_priority, request_weight
+from config import REQUEST_TIMEOUT, BINANCE_REST_URL, BINANCE_WS_URL
+
+BASE_URL = BINANCE_REST_URL
+WS_URL = BINANCE_WS_URL
+
+# Seconds between reconnect attempts after a stream drops, doubling up to the max
+RECONNECT_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+# Rate-limited requests (429/418) are retried after their Retry-After this
+# many times, unless the ban is longer than MAX_BAN_WAIT seconds
+RATE_LIMIT_RETRIES = 3
+MAX_BAN_WAIT = 120
+
+# One keep-alive connection pool shared by every REST call; the bulk
+# downloader runs many requests concurrently through it.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Set by utils.md_daemon.attach() when a local market-data daemon is running;
+# REST helpers and streams then go through it instead of the exchange.
+DAEMON = None
+
+# Set by utils.aio.enable() to run streams and REST requests on one asyncio
+# loop thread instead of a thread per stream.
+NET = None
 
 class BinanceWebSocket:
-    def __init__(self, on_message_callback, on_error_callback=None):
+    def __init__(self, on_message_callback, on_error_callback=None, on_snapshot_callback=None):
         self.ws = None
         self.is_active = False
         self.on_message_callback = on_message_callback
         self.on_error_callback = on_error_callback
+        self.on_snapshot_callback = on_snapshot_callback
+        self.reconnects = 0
+        # Metrics label: the stream name, or the first of a combined connection
+        self.label = ''
+        self._stopped = threading.Event()
+        
+    @property
+    def provides_snapshots(self):
+        """True when depth snapshots arrive on the stream (daemon connections)."""
+        return getattr(self.ws, 'provides_snapshots', False)
         
     def connect_single(self, stream_name):
         """Connect to a single WebSocket stream."""
@@ -16,17 +58,10 @@ class BinanceWebSocket:
             self.disconnect()
             
         self.is_active = True
-        stream_url = f"wss://stream.binance.com:9443/ws/{stream_name}"
-        
-        self.ws = websocket.WebSocketApp(
-            stream_url,
-            on_message=self._on_message_single,
-            on_error=self._on_error,
-            on_close=self._on_close,
-            on_open=self._on_open
-        )
-        
-        threading.Thread(target=self.ws.run_forever, daemon=True).start()
+        self.label = stream_name
+        if self._connect_daemon([stream_name], combined=False):
+            return self
+        self._connect_direct(f"{WS_URL}/ws/{stream_name}", self._on_message_single)
         return self
     
     def connect_multiple(self, streams):
@@ -35,28 +70,112 @@ class BinanceWebSocket:
             self.disconnect()
             
         self.is_active = True
-        stream_url = f"wss://stream.binance.com:9443/stream?streams={'/'.join(streams)}"
-        
-        self.ws = websocket.WebSocketApp(
-            stream_url,
-            on_message=self._on_message_multiple,
-            on_error=self._on_error,
-            on_close=self._on_close,
-            on_open=self._on_open
-        )
-        
-        threading.Thread(target=self.ws.run_forever, daemon=True).start()
+        streams = list(streams)
+        self.label = streams[0] if len(streams) == 1 else f"{streams[0]}+{len(streams) - 1}"
+        if self._connect_daemon(streams, combined=True):
+            return self
+        self._connect_direct(f"{WS_URL}/stream?streams={'/'.join(streams)}", self._on_message_multiple)
         return self
     
+    def _connect_direct(self, stream_url, on_message):
+        # Each connection gets its own stop flag so a reconnect never revives the old thread
+        self._stopped = threading.Event()
+        if NET is not None:
+            self.ws = NET.open_stream(stream_url, lambda message: on_message(None, message),
+                                      lambda error: self._on_error(None, error), self._count_reconnect,
+                                      RECONNECT_DELAY, RECONNECT_MAX_DELAY)
+            return
+        threading.Thread(target=self._run, args=(stream_url, on_message, self._stopped),
+                         daemon=True).start()
+    
+    def _run(self, stream_url, on_message, stopped):
+        """Keep the stream open until disconnect(), reconnecting with backoff when it drops."""
+        delay = RECONNECT_DELAY
+        while True:
+            ws = websocket.WebSocketApp(
+                stream_url,
+                on_message=on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+                on_open=self._on_open
+            )
+            self.ws = ws
+            if stopped.is_set():
+                return
+            connected_at = time.monotonic()
+            ws.run_forever()
+            # A connection that lasted a while starts the backoff over
+            if time.monotonic() - connected_at > RECONNECT_MAX_DELAY:
+                delay = RECONNECT_DELAY
+            if stopped.wait(delay):
+                return
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+            self._count_reconnect()
+    
+    def _count_reconnect(self):
+        self.reconnects += 1
+        METRICS.inc('dashboard_ws_reconnects_total', self.label)
+    
+    def _connect_daemon(self, streams, combined):
+        """Subscribe through the local daemon if one is attached."""
+        if DAEMON is None:
+            return False
+        self.streams = streams
+        self.ws = DAEMON.subscribe(streams, self._on_daemon_frame, self._on_daemon_close)
+        self.combined = combined
+        return self.ws is not None
+    
+    def _on_daemon_frame(self, frame):
+        """Unwrap a daemon frame into what the exchange would have sent."""
+        if not self.is_active:
+            return
+        
+        stream = frame.get('stream', self.label)
+        METRICS.inc('dashboard_ws_messages_total', stream)
+        try:
+            if 'book' in frame:
+                if self.on_snapshot_callback:
+                    self.on_snapshot_callback(frame['book'])
+            elif self.combined:
+                self.on_message_callback(frame)
+            else:
+                self.on_message_callback(frame['data'])
+        except Exception as e:
+            METRICS.inc('dashboard_ws_decode_errors_total', stream)
+            if self.on_error_callback:
+                self.on_error_callback(f"Message error: {e}")
+    
+    def _on_daemon_close(self, error=None):
+        """The daemon went away: stop using it and follow the exchange stream directly."""
+        global DAEMON
+        if not self.is_active:
+            return
+        DAEMON = None
+        if self.on_error_callback:
+            reason = f"Daemon error: {error}" if error else "Daemon connection closed"
+            self.on_error_callback(f"{reason}; switching to the exchange stream")
+        self._count_reconnect()
+        if self.combined:
+            self._connect_direct(f"{WS_URL}/stream?streams={'/'.join(self.streams)}", self._on_message_multiple)
+        else:
+            self._connect_direct(f"{WS_URL}/ws/{self.streams[0]}", self._on_message_single)
+    
+    def request_snapshot(self):
+        """Ask the daemon to resend the depth snapshot."""
+        if self.provides_snapshots:
+            self.ws.request_snapshot()
+    
     def _on_message_single(self, ws, message):
         """Handle single stream messages."""
         if not self.is_active:
             return
         
+        METRICS.inc('dashboard_ws_messages_total', self.label)
         try:
             data = json.loads(message)
             self.on_message_callback(data)
         except Exception as e:
+            METRICS.inc('dashboard_ws_decode_errors_total', self.label)
             if self.on_error_callback:
                 self.on_error_callback(f"Message error: {e}")
     
@@ -65,21 +184,24 @@ class BinanceWebSocket:
         if not self.is_active:
             return
         
+        stream = self.label
         try:
             data = json.loads(message)
+            stream = data.get('stream', stream)
+            METRICS.inc('dashboard_ws_messages_total', stream)
             self.on_message_callback(data)
         except Exception as e:
+            METRICS.inc('dashboard_ws_decode_errors_total', stream)
             if self.on_error_callback:
                 self.on_error_callback(f"Message error: {e}")
     
     def _on_error(self, ws, error):
-        """Handle WebSocket errors."""
-        self.is_active = False 
+        """Handle WebSocket errors; the connection is retried until disconnect()."""
         if self.on_error_callback:
             self.on_error_callback(f"WebSocket error: {error}")
     
     def _on_close(self, ws, close_status_code, close_msg):
-        self.is_active = False
+        pass
     
     def _on_open(self, ws):
         pass
@@ -87,16 +209,58 @@ class BinanceWebSocket:
     def disconnect(self):
         """Disconnect WebSocket."""
         self.is_active = False
+        self._stopped.set()
         if self.ws:
             self.ws.close()
             self.ws = None
 
+def http_get(url, params=None, headers=None):
+    """GET through the asyncio loop when enabled, else the shared requests session.
+
+    Waits for the endpoint's weight in the shared budget at the calling
+    job's priority, and keeps the budget in step with the weight Binance
+    reports used. A 429 or 418 holds every request for its Retry-After and
+    is then retried, so load slows requests down instead of failing them.
+    Records the request's status, latency and used weight.
+    """
+    endpoint = urlsplit(url).path
+    weight = request_weight(endpoint, params)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        LIMITER.acquire(weight, current_priority())
+        start = time.perf_counter()
+        try:
+            if NET is not None and not NET.in_loop():
+                response = NET.get(url, params, headers, REQUEST_TIMEOUT)
+            else:
+                response = SESSION.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+        except Exception:
+            METRICS.inc('dashboard_rest_requests_total', endpoint, 'error')
+            raise
+        METRICS.observe('dashboard_rest_latency_seconds', endpoint, value=time.perf_counter() - start)
+        METRICS.inc('dashboard_rest_requests_total', endpoint, str(response.status_code))
+        used = response.headers.get('X-MBX-USED-WEIGHT-1M')
+        if used:
+            METRICS.set('dashboard_rest_used_weight', value=int(used))
+            LIMITER.update_used(int(used))
+        if response.status_code not in (429, 418):
+            return response
+        # 429 warns before an IP ban (418); both say how long to stay away
+        wait = float(response.headers.get('Retry-After') or 60)
+        LIMITER.ban(wait)
+        print(f"Rate limited on {endpoint} (HTTP {response.status_code}), holding requests for {wait:.0f}s")
+        if wait > MAX_BAN_WAIT:
+            break
+    return response
+
 def get_order_book(symbol, limit=10):
     """Get order book data from Binance REST API."""
+    if DAEMON is not None:
+        return DAEMON.get('depth', symbol, limit)
     try:
-        url = f"https://api.binance.com/api/v3/depth"
+        url = f"{BASE_URL}/api/v3/depth"
         params = {"symbol": symbol.upper(), "limit": limit}
-        response = requests.get(url, params=params)
+        response = http_get(url, params)
+        response.raise_for_status()
         return response.json()
     except Exception as e:
         print(f"Error fetching order book: {e}")
@@ -104,10 +268,13 @@ def get_order_book(symbol, limit=10):
 
 def get_recent_trades(symbol, limit=20):
     """Get recent trades from Binance."""
+    if DAEMON is not None:
+        return DAEMON.get('trades', symbol, limit)
     try:
-        url = f"https://api.binance.com/api/v3/trades"
+        url = f"{BASE_URL}/api/v3/trades"
         params = {"symbol": symbol.upper(), "limit": limit}
-        response = requests.get(url, params=params)
+        response = http_get(url, params)
+        response.raise_for_status()
         return response.json()
     except Exception as e:
         print(f"Error fetching trades: {e}")
@@ -115,15 +282,75 @@ def get_recent_trades(symbol, limit=20):
 
 def get_klines(symbol, interval="1h", limit=100):
     """Get candlestick data."""
+    if DAEMON is not None:
+        return DAEMON.get('klines', symbol, interval, limit)
+    try:
+        url = f"{BASE_URL}/api/v3/klines"
+        params = {
+            "symbol": symbol.upper(),
+            "interval": interval,
+            "limit": limit
+        }
+        response = http_get(url, params)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Error fetching klines: {e}")
+        return None
+
+def get_klines_range(symbol, interval, start_time, end_time, limit=1000):
+    """Get up to `limit` candles opening between start_time and end_time (ms)."""
     try:
-        url = f"https://api.binance.com/api/v3/klines"
+        url = f"{BASE_URL}/api/v3/klines"
         params = {
             "symbol": symbol.upper(),
             "interval": interval,
+            "startTime": start_time,
+            "endTime": end_time,
             "limit": limit
         }
-        response = requests.get(url, params=params)
+        response = http_get(url, params)
+        response.raise_for_status()
         return response.json()
     except Exception as e:
         print(f"Error fetching klines: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def get_agg_trades(symbol, start_time=None, end_time=None, from_id=None, limit=1000):
+    """Get aggregate trades, by time window (at most 1 hour) or from an id."""
+    try:
+        url = f"{BASE_URL}/api/v3/aggTrades"
+        params = {"symbol": symbol.upper(), "limit": limit}
+        if from_id is not None:
+            params["fromId"] = from_id
+        else:
+            if start_time is not None:
+                params["startTime"] = start_time
+            if end_time is not None:
+                params["endTime"] = end_time
+        response = http_get(url, params)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Error fetching aggTrades: {e}")
+        return None
+
+def get_exchange_info(etag=None):
+    """Get every symbol and its filters.
+
+    Returns (etag, data); data is None when the server answers 304 Not Modified
+    for the given etag, and the whole result is None on error.
+    """
+    if DAEMON is not None:
+        return DAEMON.get('exchangeInfo', etag)
+    try:
+        url = f"{BASE_URL}/api/v3/exchangeInfo"
+        headers = {"If-None-Match": etag} if etag else {}
+        response = http_get(url, headers=headers)
+        if response.status_code == 304:
+            return etag, None
+        response.raise_for_status()
+        return response.headers.get("ETag"), response.json()
+    except Exception as e:
+        print(f"Error fetching exchange info: {e}")
+        return None
@@ -0,0 +1,191 @@
+import math
+import threading
+import numpy as np
+import utils.binance_api as api
+from utils.workers import REST_POOL
+from utils.ratelimit import BACKGROUND
+from config import INTERVAL_MS
+
+
+class RollingCovariance:
+    """Covariance of the last `window` return vectors, updated as each one arrives.
+
+    Keeps the mean vector and co-moment matrix and applies Welford's update
+    for the new vector and its inverse for the one leaving the window, so a
+    new candle costs one O(n²) outer product per step however long the window.
+    """
+
+    def __init__(self, size, window):
+        self.size = size
+        self.window = window
+        self.returns = np.zeros((window, size))
+        self.head = 0
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.comoment = np.zeros((size, size))
+
+    def add(self, r):
+        r = np.asarray(r, dtype=np.float64)
+        if self.count == self.window:
+            self.remove(self.returns[self.head])
+        self.returns[self.head] = r
+        self.head = (self.head + 1) % self.window
+        self.count += 1
+        delta = r - self.mean
+        self.mean += delta / self.count
+        self.comoment += np.outer(delta, r - self.mean)
+
+    def remove(self, r):
+        """Undo the add of r (the oldest vector); the ring slot is reused by the caller."""
+        if self.count <= 1:
+            self.count = 0
+            self.mean[:] = 0
+            self.comoment[:] = 0
+            return
+        old_mean = self.mean.copy()
+        self.count -= 1
+        self.mean = (old_mean * (self.count + 1) - r) / self.count
+        self.comoment -= np.outer(r - self.mean, r - old_mean)
+
+    def covariance(self):
+        return self.comoment / max(1, self.count - 1)
+
+    def volatility(self):
+        """Standard deviation of each series' returns."""
+        return np.sqrt(np.clip(np.diag(self.covariance()), 0, None))
+
+    def correlation(self):
+        """Correlation matrix; NaN for series that have not moved."""
+        std = self.volatility()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.covariance() / np.outer(std, std)
+        return np.clip(corr, -1, 1)
+
+
+class CorrelationFeed:
+    """Rolling log-return correlations and realized volatility across symbols.
+
+    Seeds from REST candles, then follows one combined kline stream. Closes
+    are collected per candle open time; once every symbol has closed (or a
+    later candle starts closing) the return vector goes into the rolling
+    covariance. A symbol missing from a candle counts as unchanged.
+    """
+
+    def __init__(self, symbols, interval='1m', window=60):
+        self.symbols = [s.lower() for s in symbols]
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.interval = interval
+        self.window = window
+        self.stats = RollingCovariance(len(self.symbols), window)
+        self.last_close = np.full(len(self.symbols), np.nan)
+        self.last_time = None
+        self.history = {}
+        self.pending = {}
+        self.seeded = False
+        self.version = 0
+        self.lock = threading.Lock()
+        self.ws_manager = None
+
+    @property
+    def periods_per_year(self):
+        return 365 * 86_400_000 / INTERVAL_MS[self.interval]
+
+    def start(self):
+        self.ws_manager = api.BinanceWebSocket(
+            on_message_callback=self.on_message,
+            on_error_callback=lambda err: print(f"Correlation stream error: {err}")
+        )
+        self.ws_manager.connect_multiple([f"{s}@kline_{self.interval}" for s in self.symbols])
+        # One request per symbol; the matrix is built when the last one lands
+        for symbol in self.symbols:
+            future = REST_POOL.submit(api.get_klines, symbol, self.interval, self.window + 2,
+                                      priority=BACKGROUND)
+            future.add_done_callback(lambda f, s=symbol: self.on_history(s, f))
+
+    def stop(self):
+        if self.ws_manager:
+            self.ws_manager.disconnect()
+            self.ws_manager = None
+
+    def on_history(self, symbol, future):
+        try:
+            klines = future.result() or []
+        except Exception as e:
+            print(f"Error loading {symbol} candles: {e}")
+            klines = []
+        with self.lock:
+            # The last candle is still open
+            self.history[symbol] = {k[0]: float(k[4]) for k in klines[:-1]}
+            if len(self.history) == len(self.symbols):
+                self.build()
+
+    def build(self):
+        """Fill the window from the REST candles, aligned on open time.
+
+        With no candles at all (every fetch failed) the window starts empty
+        and fills from the stream.
+        """
+        times = sorted(set().union(*self.history.values()))[-(self.window + 1):]
+        if times:
+            closes = np.array([[self.history[s].get(t, np.nan) for s in self.symbols] for t in times])
+            for i in range(1, len(closes)):
+                closes[i] = np.where(np.isnan(closes[i]), closes[i - 1], closes[i])
+            returns = np.nan_to_num(np.diff(np.log(closes), axis=0))
+            for r in returns:
+                self.stats.add(r)
+            self.last_close = closes[-1]
+            self.last_time = times[-1]
+        self.history = {}
+        self.seeded = True
+        # Candles that closed while the history was loading
+        for open_time in sorted(self.pending):
+            self.finish_candle(open_time)
+        self.version += 1
+
+    def on_message(self, msg):
+        # Stream thread: only closed candles count
+        kline = msg['data']['k']
+        if not kline['x']:
+            return
+        symbol = msg['data']['s'].lower()
+        open_time = kline['t']
+        with self.lock:
+            if symbol not in self.index or (self.last_time is not None and open_time <= self.last_time):
+                return
+            self.pending.setdefault(open_time, {})[symbol] = float(kline['c'])
+            if not self.seeded:
+                return
+            changed = False
+            for earlier in sorted(t for t in self.pending if t < open_time):
+                changed |= self.finish_candle(earlier)
+            if len(self.pending[open_time]) == len(self.symbols):
+                changed |= self.finish_candle(open_time)
+            if changed:
+                self.version += 1
+
+    def finish_candle(self, open_time):
+        """Turn one candle's closes into a return vector and add it to the window."""
+        closes = self.pending.pop(open_time)
+        if self.last_time is not None and open_time <= self.last_time:
+            return False
+        new_close = self.last_close.copy()
+        for symbol, close in closes.items():
+            new_close[self.index[symbol]] = close
+        if self.last_time is None:
+            # Seeded from the stream: the first closes are only the base for returns
+            self.last_close = new_close
+            self.last_time = open_time
+            return True
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.nan_to_num(np.log(new_close / self.last_close), nan=0.0, posinf=0.0, neginf=0.0)
+        self.stats.add(returns)
+        self.last_close = new_close
+        self.last_time = open_time
+        return True
+
+    def snapshot(self):
+        """(version, correlation matrix, annualized volatility per symbol, returns in window)."""
+        with self.lock:
+            corr = self.stats.correlation()
+            vol = self.stats.volatility() * math.sqrt(self.periods_per_year)
+            return self.version, corr, vol, self.stats.count
@@ -0,0 +1,345 @@
+import io
+import os
+import sys
+import time
+import cProfile
+import pstats
+import threading
+import statistics
+import tkinter as tk
+from collections import Counter, deque
+from utils.workers import REST_POOL
+from utils.metrics import METRICS
+
+
+class LagMonitor:
+    """Measure how late the Tk event loop runs a periodic `after` probe.
+
+    Each probe asks to run interval_ms from now; how much later it actually
+    runs is time the main thread spent busy in some other callback.
+    """
+
+    def __init__(self, root, interval_ms=50, history=1200):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.samples = deque(maxlen=history)
+        self.due = 0.0
+        self.after_id = None
+
+    def start(self):
+        if self.after_id is None:
+            self.schedule()
+
+    def stop(self):
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def schedule(self):
+        self.due = time.perf_counter() + self.interval_ms / 1000
+        self.after_id = self.root.after(self.interval_ms, self.probe)
+
+    def probe(self):
+        self.samples.append(max(0.0, (time.perf_counter() - self.due) * 1000))
+        self.schedule()
+
+    def stats(self):
+        """Lag in ms over the recent probes: mean, p50, p95, max and jitter (stdev)."""
+        samples = sorted(self.samples)
+        if not samples:
+            return None
+        n = len(samples)
+        return {
+            'count': n,
+            'mean': sum(samples) / n,
+            'p50': samples[n // 2],
+            'p95': samples[min(n - 1, int(n * 0.95))],
+            'max': samples[-1],
+            'jitter': statistics.pstdev(samples),
+        }
+
+
+class CallbackStat:
+    """Counters for one kind of `after` callback."""
+
+    def __init__(self):
+        self.scheduled = 0
+        self.runs = 0
+        self.cancelled = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @property
+    def pending(self):
+        return self.scheduled - self.runs - self.cancelled
+
+
+class CallbackStats:
+    """Count and time every `after` callback, grouped by the panel that queued it.
+
+    Works by wrapping tkinter's Misc.after and after_cancel while installed.
+    after is also called from stream and REST threads, hence the lock.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.owners = {}
+        self.lock = threading.Lock()
+        self.original_after = None
+        self.original_cancel = None
+
+    @property
+    def installed(self):
+        return self.original_after is not None
+
+    def install(self):
+        if self.installed:
+            return
+        self.original_after = tk.Misc.after
+        self.original_cancel = tk.Misc.after_cancel
+        stats = self
+
+        def after(widget, ms, func=None, *args):
+            if func is None:
+                return stats.original_after(widget, ms)
+            return stats.schedule(widget, ms, func, args)
+
+        def after_cancel(widget, after_id):
+            stats.cancel(after_id)
+            return stats.original_cancel(widget, after_id)
+
+        tk.Misc.after = after
+        tk.Misc.after_cancel = after_cancel
+
+    def uninstall(self):
+        if not self.installed:
+            return
+        tk.Misc.after = self.original_after
+        tk.Misc.after_cancel = self.original_cancel
+        self.original_after = self.original_cancel = None
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+            self.owners = {}
+
+    @staticmethod
+    def describe(func, args):
+        """Name a callback as Class.method, or by qualified name for plain functions."""
+        # Results from the REST pool are counted against the panel callback they feed
+        if func == REST_POOL._deliver and len(args) > 1:
+            func = args[1]
+        owner = getattr(func, '__self__', None)
+        name = getattr(func, '__name__', type(func).__name__)
+        if owner is not None:
+            return f"{type(owner).__name__}.{name}"
+        return getattr(func, '__qualname__', name)
+
+    def schedule(self, widget, ms, func, args):
+        key = self.describe(func, args)
+        handle = [None]
+
+        def timed(*call_args):
+            t0 = time.perf_counter()
+            try:
+                return func(*call_args)
+            finally:
+                elapsed = (time.perf_counter() - t0) * 1000
+                with self.lock:
+                    self.owners.pop(handle[0], None)
+                    stat = self.stats.setdefault(key, CallbackStat())
+                    stat.runs += 1
+                    stat.total_ms += elapsed
+                    stat.max_ms = max(stat.max_ms, elapsed)
+
+        timed.__name__ = getattr(func, '__name__', type(func).__name__)
+        with self.lock:
+            self.stats.setdefault(key, CallbackStat()).scheduled += 1
+            handle[0] = self.original_after(widget, ms, timed, *args)
+            self.owners[handle[0]] = key
+        return handle[0]
+
+    def cancel(self, after_id):
+        with self.lock:
+            key = self.owners.pop(after_id, None)
+            if key is not None:
+                self.stats[key].cancelled += 1
+
+    def rows(self):
+        """(name, stat) pairs, most total time first."""
+        with self.lock:
+            return sorted(self.stats.items(), key=lambda item: -item[1].total_ms)
+
+
+class SamplingProfiler:
+    """Sample the main thread's Python stack from a background thread.
+
+    Cheap enough to leave running while reproducing a stutter: the main
+    thread is never traced, only looked at every `interval` seconds.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.thread_id = threading.main_thread().ident
+        self.stacks = Counter()
+        self.samples = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def reset(self):
+        self.stacks = Counter()
+        self.samples = 0
+
+    def run(self):
+        while self.running:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+            time.sleep(self.interval)
+
+    def top(self, count=25):
+        """Text table of the functions seen most, by own and inclusive samples."""
+        own = Counter()
+        inclusive = Counter()
+        for stack, hits in list(self.stacks.items()):
+            own[stack[-1]] += hits
+            for name in set(stack):
+                inclusive[name] += hits
+        total = self.samples or 1
+        lines = [f"{self.samples} samples every {self.interval * 1000:.0f} ms",
+                 f"{'own %':>7} {'total %':>8}  function"]
+        for name, hits in inclusive.most_common(count):
+            lines.append(f"{own[name] / total:7.1%} {hits / total:8.1%}  {name}")
+        return "\n".join(lines)
+
+    def collapsed(self):
+        """Stacks in collapsed format ("a;b;c count"), as read by flame graph tools."""
+        return "\n".join(f"{';'.join(stack)} {hits}" for stack, hits in list(self.stacks.items()))
+
+
+class Diagnostics:
+    """Lag monitor, callback counters and profilers behind the Diagnostics menu."""
+
+    def __init__(self, root):
+        self.lag = LagMonitor(root)
+        self.callbacks = CallbackStats()
+        self.sampler = SamplingProfiler()
+        self.profile = None
+        self.profile_running = False
+        METRICS.gauge('dashboard_mainloop_lag_seconds', "Tk event loop lag over recent probes", ('quantile',),
+                      collect=self.lag_quantiles)
+
+    def lag_quantiles(self):
+        stats = self.lag.stats()
+        if not stats:
+            return None
+        return {('0.5',): stats['p50'] / 1000, ('0.95',): stats['p95'] / 1000, ('1',): stats['max'] / 1000}
+
+    def start_monitoring(self):
+        self.callbacks.install()
+        self.lag.start()
+
+    def stop_monitoring(self):
+        self.lag.stop()
+        self.callbacks.uninstall()
+
+    def toggle_sampler(self):
+        if self.sampler.running:
+            self.sampler.stop()
+        else:
+            self.sampler.reset()
+            self.sampler.start()
+        return self.sampler.running
+
+    def toggle_cprofile(self):
+        """Start or stop cProfile; it traces the thread that calls this, i.e. Tk's."""
+        if self.profile_running:
+            self.profile.disable()
+            self.profile_running = False
+        else:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+            self.profile_running = True
+        return self.profile_running
+
+    def cprofile_text(self, count=30):
+        if self.profile is None:
+            return "cProfile has not been run"
+        if self.profile_running:
+            return "cProfile running..."
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats('cumulative').print_stats(count)
+        return out.getvalue()
+
+    def lag_text(self):
+        stats = self.lag.stats()
+        if not stats:
+            return "Event loop lag: no samples"
+        return (f"Event loop lag: mean {stats['mean']:.1f} ms  p50 {stats['p50']:.1f}  "
+                f"p95 {stats['p95']:.1f}  max {stats['max']:.1f}  "
+                f"jitter {stats['jitter']:.1f}  ({stats['count']} probes)")
+
+    def callbacks_text(self):
+        lines = [f"{'callback':<48} {'pending':>7} {'runs':>7} {'total ms':>10} {'mean ms':>8} {'max ms':>8}"]
+        for name, stat in self.callbacks.rows():
+            mean = stat.total_ms / stat.runs if stat.runs else 0.0
+            lines.append(f"{name[:48]:<48} {stat.pending:>7} {stat.runs:>7} "
+                         f"{stat.total_ms:>10.1f} {mean:>8.2f} {stat.max_ms:>8.1f}")
+        return "\n".join(lines)
+
+    def report(self):
+        """Everything collected so far, as plain text."""
+        return "\n\n".join([
+            time.strftime("Diagnostics report %Y-%m-%d %H:%M:%S"),
+            self.lag_text(),
+            "Tk callbacks\n" + self.callbacks_text(),
+            "Sampling profiler\n" + self.sampler.top(),
+            "cProfile\n" + self.cprofile_text(),
+        ])
+
+    def export(self, path):
+        """Write the report to path, plus collapsed stacks and raw pstats next to it.
+
+        Returns the paths written.
+        """
+        base = os.path.splitext(path)[0]
+        written = []
+        try:
+            with open(path, 'w') as f:
+                f.write(self.report() + "\n")
+            written.append(path)
+            if self.sampler.samples:
+                with open(base + '.folded', 'w') as f:
+                    f.write(self.sampler.collapsed() + "\n")
+                written.append(base + '.folded')
+            if self.profile is not None and not self.profile_running:
+                self.profile.dump_stats(base + '.pstats')
+                written.append(base + '.pstats')
+        except OSError as e:
+            print(f"Error exporting diagnostics: {e}")
+        return written
+
+    def shutdown(self):
+        self.sampler.stop()
+        if self.profile_running:
+            self.toggle_cprofile()
+        self.stop_monitoring()
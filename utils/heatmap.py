@@ -0,0 +1,80 @@
+import math
+import numpy as np
+
+
+class DepthHeatmap:
+    """Rolling image of resting liquidity: rows are price bins, columns time slots.
+
+    The image is one preallocated array that a chart hands to imshow once
+    and then refreshes with set_data. Each book snapshot is binned with
+    np.bincount into the newest column; when a slot's time is up the image
+    shifts left by whole columns, and when the price leaves the middle of
+    the range it shifts vertically, so nothing is ever reallocated.
+    """
+
+    def __init__(self, rows=400, cols=800):
+        self.rows = rows
+        self.cols = cols
+        self.image = np.zeros((rows, cols), dtype=np.float32)
+        self.low = 0.0
+        self.bin_size = 1.0
+        self.col_ms = 1000.0
+        self.slot_end = 0.0
+
+    @property
+    def high(self):
+        return self.low + self.rows * self.bin_size
+
+    def reset(self, low, high, start_ms, end_ms):
+        """Cover prices low..high and times start_ms..end_ms with an empty image."""
+        self.image[:] = 0
+        self.low = low
+        self.bin_size = (high - low) / self.rows or 1.0
+        self.col_ms = max(1.0, (end_ms - start_ms) / self.cols)
+        self.slot_end = start_ms + self.cols * self.col_ms
+
+    def extent(self):
+        """(start_ms, end_ms, low, high) of the image, for imshow's extent."""
+        return self.slot_end - self.cols * self.col_ms, self.slot_end, self.low, self.high
+
+    def advance(self, now_ms):
+        """Scroll left so the newest column is the slot containing now_ms."""
+        if now_ms < self.slot_end:
+            return
+        steps = math.floor((now_ms - self.slot_end) / self.col_ms) + 1
+        if steps >= self.cols:
+            self.image[:] = 0
+        else:
+            self.image[:, :-steps] = self.image[:, steps:]
+            self.image[:, -steps:] = 0
+        self.slot_end += steps * self.col_ms
+
+    def recenter(self, mid):
+        """Shift rows so mid sits in the middle, once it nears an edge."""
+        margin = self.rows * self.bin_size * 0.1
+        if self.low + margin <= mid <= self.high - margin:
+            return
+        shift = int(round((mid - (self.low + self.high) / 2) / self.bin_size))
+        if abs(shift) >= self.rows:
+            self.image[:] = 0
+        elif shift > 0:
+            self.image[:-shift] = self.image[shift:]
+            self.image[-shift:] = 0
+        else:
+            self.image[-shift:] = self.image[:shift]
+            self.image[:-shift] = 0
+        self.low += shift * self.bin_size
+
+    def add_book(self, prices, qtys, now_ms, mid=None):
+        """Bin one book snapshot into the current column.
+
+        Keeps the largest size seen at each price during the slot, square-root
+        scaled so thin levels stay visible next to walls.
+        """
+        self.advance(now_ms)
+        if mid is not None:
+            self.recenter(mid)
+        rows = ((np.asarray(prices) - self.low) / self.bin_size).astype(np.int64)
+        keep = (rows >= 0) & (rows < self.rows)
+        binned = np.bincount(rows[keep], weights=np.asarray(qtys)[keep], minlength=self.rows)
+        np.maximum(self.image[:, -1], np.sqrt(binned), out=self.image[:, -1])
@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict
 import numpy as np
 from typing import List, Tuple
 
@@ -75,4 +77,228 @@ def calculate_ema(prices: List[float], period: int) -> float:
     for price in prices[1:]:
         ema = (price * multiplier) + (ema * (1 - multiplier))
     
-    return ema
\ No newline at end of file
+    return ema
+
+def moving_average_series(prices: List[float], period: int) -> np.ndarray:
+    """Simple moving average at every point; the first values average what is available."""
+    prices = np.asarray(prices, dtype=float)
+    csum = np.concatenate(([0.0], np.cumsum(prices)))
+    idx = np.arange(1, len(prices) + 1)
+    start = np.maximum(idx - period, 0)
+    return (csum[idx] - csum[start]) / (idx - start)
+
+
+def ema_series(prices: List[float], period: int) -> np.ndarray:
+    """Exponential moving average at every point, seeded with the first price."""
+    prices = np.asarray(prices, dtype=float)
+    out = np.empty_like(prices)
+    if not len(prices):
+        return out
+    multiplier = 2 / (period + 1)
+    ema = prices[0]
+    for i, price in enumerate(prices.tolist()):
+        ema = (price * multiplier) + (ema * (1 - multiplier))
+        out[i] = ema
+    return out
+
+
+def rsi_series(prices: List[float], period: int = 14) -> np.ndarray:
+    """Wilder's RSI at every point; NaN until `period` changes are available."""
+    return rsi_averages(prices, period)[0]
+
+
+def macd_series(prices: List[float], fast: int = 12, slow: int = 26,
+                signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram at every point."""
+    macd_line = ema_series(prices, fast) - ema_series(prices, slow)
+    signal_line = ema_series(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger_series(prices: List[float], period: int = 20,
+                     num_std: float = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Upper, middle and lower Bollinger Bands at every point, over what is available at the start."""
+    prices = np.asarray(prices, dtype=float)
+    idx = np.arange(1, len(prices) + 1)
+    start = np.maximum(idx - period, 0)
+    count = idx - start
+    csum = np.concatenate(([0.0], np.cumsum(prices)))
+    csq = np.concatenate(([0.0], np.cumsum(prices * prices)))
+    middle = (csum[idx] - csum[start]) / count
+    std = np.sqrt(np.maximum((csq[idx] - csq[start]) / count - middle * middle, 0))
+    return middle + std * num_std, middle, middle - std * num_std
+
+
+def rsi_averages(prices: List[float], period: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Wilder's RSI with the average gain and loss behind it, which let it be extended one price at a time."""
+    prices = np.asarray(prices, dtype=float)
+    out = np.full((3, len(prices)), np.nan)
+    if len(prices) < period + 1:
+        return out[0], out[1], out[2]
+    deltas = np.diff(prices)
+    gains = np.clip(deltas, 0, None)
+    losses = np.clip(-deltas, 0, None)
+    avg_gain = gains[:period].mean()
+    avg_loss = losses[:period].mean()
+    for i in range(period, len(deltas) + 1):
+        if i > period:
+            avg_gain = (avg_gain * (period - 1) + gains[i - 1]) / period
+            avg_loss = (avg_loss * (period - 1) + losses[i - 1]) / period
+        out[0, i] = rsi_from_averages(avg_gain, avg_loss)
+        out[1, i] = avg_gain
+        out[2, i] = avg_loss
+    return out[0], out[1], out[2]
+
+
+def rsi_from_averages(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+# Incremental updates: given the outputs for prices[:-1], the outputs for
+# prices, at the cost of the newest point only
+
+def update_moving_average(prices, values, period=20):
+    (ma,) = values
+    return (np.append(ma, np.mean(prices[-period:])),)
+
+
+def update_ema(prices, values, period=20):
+    (ema,) = values
+    multiplier = 2 / (period + 1)
+    last = ema[-1] if len(ema) else prices[-1]
+    return (np.append(ema, prices[-1] * multiplier + last * (1 - multiplier)),)
+
+
+def update_bollinger(prices, values, period=20, num_std=2):
+    window = prices[-period:]
+    middle, std = window.mean(), window.std()
+    return tuple(np.append(series, value) for series, value in
+                 zip(values, (middle + std * num_std, middle, middle - std * num_std)))
+
+
+def update_rsi(prices, values, period=14):
+    rsi, gains, losses = values
+    n = len(prices)
+    if n <= period + 1:
+        # Not past the seed yet: the full calculation is as cheap
+        return rsi_averages(prices, period)
+    delta = prices[-1] - prices[-2]
+    avg_gain = (gains[-1] * (period - 1) + max(delta, 0)) / period
+    avg_loss = (losses[-1] * (period - 1) + max(-delta, 0)) / period
+    return (np.append(rsi, rsi_from_averages(avg_gain, avg_loss)),
+            np.append(gains, avg_gain), np.append(losses, avg_loss))
+
+
+class Indicator:
+    """A registered indicator.
+
+    fn(prices, **params) returns one array per output, a value per candle;
+    update, when given, extends the outputs for prices[:-1] to prices.
+    labels holds a display template per output (None for internal ones),
+    formatted with the params.
+    """
+
+    def __init__(self, name, fn, outputs, labels, defaults, update=None, is_price=True):
+        self.name = name
+        self.fn = fn
+        self.outputs = outputs
+        self.labels = labels
+        self.defaults = defaults
+        self.update = update
+        self.is_price = is_price
+
+    def params(self, params):
+        merged = dict(self.defaults, **params)
+        return tuple(sorted(merged.items()))
+
+
+INDICATORS = {}
+
+
+def register(name, outputs=('value',), labels=None, update=None, is_price=True, **defaults):
+    """Decorator adding fn(prices, **params) to the indicator registry under `name`."""
+    def decorate(fn):
+        INDICATORS[name] = Indicator(name, fn, outputs, labels or (name.upper(),) * len(outputs),
+                                     defaults, update, is_price)
+        return fn
+    return decorate
+
+
+register('ma', labels=("MA ({period})",), update=update_moving_average, period=20)(moving_average_series)
+register('ema', labels=("EMA ({period})",), update=update_ema, period=20)(ema_series)
+register('rsi', outputs=('rsi', 'avg_gain', 'avg_loss'), labels=("RSI ({period})", None, None),
+         update=update_rsi, is_price=False, period=14)(rsi_averages)
+register('bollinger', outputs=('upper', 'middle', 'lower'), labels=("BB Upper", "BB Middle", "BB Lower"),
+         update=update_bollinger, period=20, num_std=2)(bollinger_series)
+register('macd', outputs=('macd', 'signal', 'histogram'), labels=("MACD", "Signal", "Histogram"),
+         is_price=False, fast=12, slow=26, signal=9)(macd_series)
+
+
+class IndicatorCache:
+    """Bounded LRU of indicator results.
+
+    Keyed by (indicator, symbol, interval, params, version), so every pane
+    and panel asking for the same RSI(14) on the same candles shares one
+    computation. version identifies the candles, e.g. the last candle's
+    open time and close; without one the prices themselves are hashed.
+    When the candles only gained a candle or changed their last one since
+    the previous call, an indicator's update hook extends the previous
+    result instead of recomputing it. Results are read-only arrays.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        # Last prices and outputs per (indicator, symbol, interval, params), for update hooks
+        self.latest = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def compute(self, name, symbol, interval, prices, version=None, **params):
+        """Outputs of indicator `name` over prices: an array, or a tuple for several outputs."""
+        indicator = INDICATORS[name]
+        # A copy: it is kept to check the next call against
+        prices = np.array(prices, dtype=float)
+        params = indicator.params(params)
+        series_key = (name, symbol, interval, params)
+        key = series_key + (version if version is not None else hash(prices.tobytes()),)
+        with self.lock:
+            values = self.results.get(key)
+            if values is not None:
+                self.results.move_to_end(key)
+                self.hits += 1
+                return values if len(values) > 1 else values[0]
+            self.misses += 1
+            previous = self.latest.get(series_key)
+
+        values = None
+        n = len(prices)
+        if indicator.update and previous is not None and n > 1:
+            last_prices, last_values = previous
+            if len(last_prices) in (n - 1, n) and np.array_equal(last_prices[:n - 1], prices[:n - 1]):
+                values = indicator.update(prices, tuple(v[:n - 1] for v in last_values), **dict(params))
+        if values is None:
+            values = indicator.fn(prices, **dict(params))
+        values = values if isinstance(values, tuple) else (values,)
+        for array in values:
+            array.flags.writeable = False
+
+        with self.lock:
+            self.results[key] = values
+            self.latest[series_key] = (prices, values)
+            self.latest.move_to_end(series_key)
+            for store in (self.results, self.latest):
+                while len(store) > self.maxsize:
+                    store.popitem(last=False)
+        return values if len(values) > 1 else values[0]
+
+
+INDICATOR_CACHE = IndicatorCache()
+
+
+def compute(name, symbol, interval, prices, version=None, **params):
+    """Memoized indicator outputs; see IndicatorCache.compute."""
+    return INDICATOR_CACHE.compute(name, symbol, interval, prices, version, **params)
@@ -0,0 +1,374 @@
+import bisect
+import math
+import threading
+from utils.binance_api import BinanceWebSocket, get_order_book
+from utils.workers import REST_POOL
+from utils.ratelimit import LIMITER
+from utils.metrics import METRICS
+
+SNAPSHOT = 'snapshot'
+DIFF = 'diff'
+
+
+class LocalOrderBook:
+    """Full-depth order book kept current from Binance depth diffs.
+
+    Each side is a dict of price -> quantity plus an ascending list of its
+    prices, so a level update is a dict write and a bisect.
+    """
+
+    def __init__(self, symbol):
+        self.symbol = symbol.lower()
+        self.bids = {}
+        self.asks = {}
+        self.bid_prices = []
+        self.ask_prices = []
+        self.last_update_id = 0
+        self.metrics = None
+
+    def clear(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.bid_prices.clear()
+        self.ask_prices.clear()
+
+    def apply_snapshot(self, data):
+        """Replace the book with a REST depth snapshot."""
+        # Metrics are rebuilt once at the end rather than level by level
+        metrics, self.metrics = self.metrics, None
+        self.clear()
+        for price, qty in data.get('bids', []):
+            self.set_level(self.bids, self.bid_prices, float(price), float(qty))
+        for price, qty in data.get('asks', []):
+            self.set_level(self.asks, self.ask_prices, float(price), float(qty))
+        self.last_update_id = data.get('lastUpdateId', 0)
+        self.metrics = metrics
+        if metrics:
+            metrics.reset()
+
+    def set_level(self, levels, prices, price, qty):
+        """Set one level; a quantity of zero removes it. Returns the old quantity."""
+        old = levels.get(price, 0.0)
+        if qty == 0:
+            if old:
+                del levels[price]
+                del prices[bisect.bisect_left(prices, price)]
+        else:
+            if not old:
+                bisect.insort(prices, price)
+            levels[price] = qty
+        if self.metrics and old != qty:
+            self.metrics.on_level(levels is self.bids, price, old, qty)
+        return old
+
+    def apply_diff(self, msg):
+        """Apply a depthUpdate event. Returns False if events were missed."""
+        if msg['u'] <= self.last_update_id:
+            return True
+        if msg['U'] > self.last_update_id + 1:
+            return False
+        for price, qty in msg.get('b', []):
+            self.set_level(self.bids, self.bid_prices, float(price), float(qty))
+        for price, qty in msg.get('a', []):
+            self.set_level(self.asks, self.ask_prices, float(price), float(qty))
+        self.last_update_id = msg['u']
+        return True
+
+    def best_bid(self):
+        return self.bid_prices[-1] if self.bid_prices else None
+
+    def best_ask(self):
+        return self.ask_prices[0] if self.ask_prices else None
+
+    def top(self, limit=10):
+        """Best levels in REST depth format: bids high to low, asks low to high.
+
+        A limit of None returns the whole book.
+        """
+        bid_prices = self.bid_prices[-limit:] if limit else self.bid_prices
+        bids = [[price, self.bids[price]] for price in reversed(bid_prices)]
+        asks = [[price, self.asks[price]] for price in self.ask_prices[:limit]]
+        return {'lastUpdateId': self.last_update_id, 'bids': bids, 'asks': asks}
+
+
+class DepthSync:
+    """Keep a LocalOrderBook in sync with the diff stream.
+
+    Follows Binance's procedure: buffer diffs, load a REST snapshot, drop
+    buffered events it already covers, then apply the rest in sequence. A gap
+    in update ids triggers a resync. When the stream comes from the local
+    daemon, it sends the snapshot itself and no REST call is made.
+
+    Listeners are called as listener(event, data) with event SNAPSHOT (data
+    is the book) or DIFF (data is the depthUpdate), under the sync lock.
+    """
+
+    MAX_BUFFER = 1000
+    # Seconds before retrying a failed snapshot, stretched while the weight budget is tight
+    RETRY_DELAY = 1.0
+
+    def __init__(self, symbol, snapshot_limit=1000, speed='100ms'):
+        self.symbol = symbol.lower()
+        self.snapshot_limit = snapshot_limit
+        self.stream = f"{self.symbol}@depth@{speed}"
+        self.book = LocalOrderBook(self.symbol)
+        self.listeners = []
+        self.synced = False
+        self.buffer = []
+        self.resyncs = 0
+        self.ws_manager = None
+        self.is_active = False
+        self.lock = threading.RLock()
+
+    def add_listener(self, listener):
+        """Register a listener; it gets the current book right away if synced."""
+        with self.lock:
+            self.listeners.append(listener)
+            if self.synced:
+                listener(SNAPSHOT, self.book)
+
+    def remove_listener(self, listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def start(self):
+        self.is_active = True
+        self.ws_manager = BinanceWebSocket(
+            on_message_callback=self.on_message,
+            on_error_callback=lambda err: print(f"{self.symbol} depth error: {err}"),
+            on_snapshot_callback=self.on_snapshot
+        )
+        self.ws_manager.connect_single(self.stream)
+        if not self.ws_manager.provides_snapshots:
+            self.request_snapshot()
+        return self
+
+    def stop(self):
+        self.is_active = False
+        if self.ws_manager:
+            self.ws_manager.disconnect()
+            self.ws_manager = None
+
+    def request_snapshot(self, delay=0):
+        future = REST_POOL.submit(get_order_book, self.symbol, self.snapshot_limit, delay=delay)
+        future.add_done_callback(self._on_snapshot_future)
+
+    def _on_snapshot_future(self, future):
+        data = None if future.cancelled() or future.exception() else future.result()
+        if not self.is_active:
+            return
+        if not data or 'lastUpdateId' not in data:
+            self.request_snapshot(self.RETRY_DELAY * LIMITER.pressure())
+            return
+        self.on_snapshot(data)
+
+    def on_snapshot(self, data):
+        """Load a depth snapshot and replay the buffered diffs on top of it."""
+        with self.lock:
+            self.book.apply_snapshot(data)
+            buffered, self.buffer = self.buffer, []
+            for msg in buffered:
+                if not self.book.apply_diff(msg):
+                    # Snapshot older than what we buffered; try again
+                    self.buffer = []
+                    self.request_snapshot()
+                    return
+            self.synced = True
+            for listener in list(self.listeners):
+                listener(SNAPSHOT, self.book)
+
+    def on_message(self, msg):
+        if msg.get('e') != 'depthUpdate':
+            return
+        with self.lock:
+            if not self.synced:
+                self.buffer.append(msg)
+                del self.buffer[:-self.MAX_BUFFER]
+                return
+            if not self.book.apply_diff(msg):
+                self.resync(msg)
+                return
+            for listener in list(self.listeners):
+                listener(DIFF, msg)
+
+    def resync(self, msg=None):
+        """Drop the book and sync again from a fresh snapshot."""
+        with self.lock:
+            self.synced = False
+            self.resyncs += 1
+            self.buffer = [msg] if msg else []
+        METRICS.inc('dashboard_book_resyncs_total', self.symbol)
+        if self.ws_manager and self.ws_manager.provides_snapshots:
+            self.ws_manager.request_snapshot()
+        else:
+            # Right away unless the budget is tight; a deep snapshot weighs 50
+            self.request_snapshot(self.RETRY_DELAY * (LIMITER.pressure() - 1))
+
+
+class Fenwick:
+    """Binary indexed tree: point add and prefix sum in O(log n)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0.0] * (size + 1)
+
+    def add(self, i, delta):
+        """Add delta to bucket i; buckets outside the tree are ignored."""
+        if not 0 <= i < self.size:
+            return
+        i += 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        """Sum of buckets [0, i)."""
+        total = 0.0
+        i = min(i, self.size)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def range(self, lo, hi):
+        """Sum of buckets [lo, hi]."""
+        return self.prefix(hi + 1) - self.prefix(max(lo, 0))
+
+
+class BookMetrics:
+    """Spread, mid, microprice, top-N imbalance and depth within bps bands.
+
+    Updated from each level change as the book applies a diff, never by
+    rescanning the book. Top-N sums are adjusted at the changed level's rank
+    (found by bisect). Quantities near the mid are kept in Fenwick trees of
+    0.1 bp buckets around an anchor price, so depth within a band around
+    the current mid is two prefix sums; the trees are rebuilt from the
+    levels in range only when the mid drifts far from the anchor.
+    """
+
+    BANDS_BPS = (10, 25, 50)
+    RANGE_BPS = 100
+    BUCKET_BPS = 0.1
+
+    def __init__(self, book, top_n=10):
+        self.book = book
+        self.top_n = top_n
+        self.offset = int(self.RANGE_BPS / self.BUCKET_BPS)
+        self.anchor = None
+        self.top_sums = {True: 0.0, False: 0.0}
+        self.trees = {True: Fenwick(2 * self.offset + 1), False: Fenwick(2 * self.offset + 1)}
+        book.metrics = self
+        self.reset()
+
+    def prices(self, is_bid):
+        return self.book.bid_prices if is_bid else self.book.ask_prices
+
+    def levels(self, is_bid):
+        return self.book.bids if is_bid else self.book.asks
+
+    def level_at_rank(self, is_bid, rank):
+        """Price of the rank-th best level (0 is the best)."""
+        prices = self.prices(is_bid)
+        return prices[-1 - rank] if is_bid else prices[rank]
+
+    def rank(self, is_bid, price):
+        """Rank the price has (or would have) among the current levels."""
+        prices = self.prices(is_bid)
+        if is_bid:
+            return len(prices) - bisect.bisect_right(prices, price)
+        return bisect.bisect_left(prices, price)
+
+    def bucket(self, price):
+        return math.floor((price / self.anchor - 1) * 1e4 / self.BUCKET_BPS) + self.offset
+
+    def mid(self):
+        bid, ask = self.book.best_bid(), self.book.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def reset(self):
+        """Recompute everything from the book (after a snapshot or re-anchor)."""
+        for is_bid in (True, False):
+            prices, levels = self.prices(is_bid), self.levels(is_bid)
+            best = prices[-self.top_n:] if is_bid else prices[:self.top_n]
+            self.top_sums[is_bid] = sum(levels[price] for price in best)
+        self.anchor = self.mid()
+        self.rebuild_trees()
+
+    def rebuild_trees(self):
+        size = 2 * self.offset + 1
+        self.trees = {True: Fenwick(size), False: Fenwick(size)}
+        if self.anchor is None:
+            return
+        low = self.anchor * (1 - self.RANGE_BPS / 1e4)
+        high = self.anchor * (1 + self.RANGE_BPS / 1e4)
+        for is_bid in (True, False):
+            prices, levels, tree = self.prices(is_bid), self.levels(is_bid), self.trees[is_bid]
+            for price in prices[bisect.bisect_left(prices, low):bisect.bisect_right(prices, high)]:
+                tree.add(self.bucket(price), levels[price])
+
+    def on_level(self, is_bid, price, old, new):
+        """Called by the book after a level changed from old to new quantity."""
+        self.update_top(is_bid, price, old, new)
+
+        if self.anchor is None:
+            self.reset()
+            return
+        self.trees[is_bid].add(self.bucket(price), new - old)
+
+        mid = self.mid()
+        if mid is not None and abs(mid / self.anchor - 1) * 1e4 > self.RANGE_BPS / 2:
+            self.anchor = mid
+            self.rebuild_trees()
+
+    def update_top(self, is_bid, price, old, new):
+        prices = self.prices(is_bid)
+        levels = self.levels(is_bid)
+        n = self.top_n
+        if old and new:
+            if self.rank(is_bid, price) < n:
+                self.top_sums[is_bid] += new - old
+        elif new:
+            # Inserted: counts if in the top N, and pushes the old N-th level out
+            if self.rank(is_bid, price) < n:
+                self.top_sums[is_bid] += new
+                if len(prices) > n:
+                    self.top_sums[is_bid] -= levels[self.level_at_rank(is_bid, n)]
+        else:
+            # Removed: if it was in the top N, the next level moves in
+            if self.rank(is_bid, price) < n:
+                self.top_sums[is_bid] -= old
+                if len(prices) >= n:
+                    self.top_sums[is_bid] += levels[self.level_at_rank(is_bid, n - 1)]
+
+    def depth(self, bps):
+        """(bid qty, ask qty) resting within bps of the mid."""
+        mid = self.mid()
+        if mid is None or self.anchor is None:
+            return 0.0, 0.0
+        low = self.bucket(mid * (1 - bps / 1e4))
+        high = self.bucket(mid * (1 + bps / 1e4))
+        centre = self.bucket(mid)
+        return self.trees[True].range(low, centre), self.trees[False].range(centre, high)
+
+    def snapshot(self):
+        """All metrics as a dict, or None while either side is empty."""
+        bid, ask = self.book.best_bid(), self.book.best_ask()
+        if bid is None or ask is None:
+            return None
+        bid_qty, ask_qty = self.book.bids[bid], self.book.asks[ask]
+        mid = (bid + ask) / 2
+        bid_sum, ask_sum = self.top_sums[True], self.top_sums[False]
+        return {
+            'bid': bid,
+            'ask': ask,
+            'spread': ask - bid,
+            'spread_bps': (ask - bid) / mid * 1e4,
+            'mid': mid,
+            # Leans toward the side with less size, where the next trade is likelier
+            'microprice': (bid * ask_qty + ask * bid_qty) / (bid_qty + ask_qty),
+            'imbalance': (bid_sum - ask_sum) / (bid_sum + ask_sum) if bid_sum + ask_sum else 0.0,
+            'depth': {bps: self.depth(bps) for bps in self.BANDS_BPS},
+        }
@@ -0,0 +1,416 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+import utils.binance_api as api
+from utils.local_book import DepthSync, SNAPSHOT
+from utils.workers import REST_POOL
+from config import DAEMON_ADDRESS, REQUEST_TIMEOUT
+
+# Wire protocol: newline-delimited JSON over a Unix stream socket.
+#   {"op": "get", "endpoint": "depth", "args": ["btcusdt", 10]} -> {"data": ...}
+#   {"op": "subscribe", "streams": [...]} -> frames until the socket closes:
+#       {"stream": s, "data": msg}    the latest message first, then every new one
+#       {"stream": s, "book": {...}}  full book for depth diff streams, then diffs
+#   {"op": "snapshot"} on a subscription resends the depth books.
+
+ENDPOINTS = {
+    'depth': 'get_order_book',
+    'trades': 'get_recent_trades',
+    'klines': 'get_klines',
+    'exchangeInfo': 'get_exchange_info',
+}
+
+# Seconds a REST answer is reused for every client
+CACHE_TTL = {'depth': 1.0, 'trades': 1.0, 'klines': 2.0, 'exchangeInfo': 3600.0}
+
+# Seconds an unused upstream stream is kept open, so symbol switches don't reconnect
+IDLE_TIMEOUT = 30.0
+
+# Frames buffered per client before a slow client is dropped
+CLIENT_QUEUE = 10000
+
+
+def is_depth_diff(stream):
+    kind = stream.partition('@')[2]
+    return kind == 'depth' or kind.startswith('depth@')
+
+
+def encode(obj):
+    return (json.dumps(obj, separators=(',', ':')) + '\n').encode()
+
+
+class Upstream:
+    """One exchange stream shared by every subscribed client."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.subscribers = set()
+        self.last_frame = None
+        self.last_used = time.time()
+        self.lock = threading.Lock()
+        self.depth = None
+        self.ws_manager = None
+
+        if is_depth_diff(stream):
+            symbol, _, kind = stream.partition('@')
+            speed = kind.partition('@')[2] or '1000ms'
+            self.depth = DepthSync(symbol, speed=speed)
+            self.depth.add_listener(self.on_depth)
+            self.depth.start()
+        else:
+            self.ws_manager = api.BinanceWebSocket(
+                on_message_callback=self.on_message,
+                on_error_callback=lambda err: print(f"{stream} upstream error: {err}")
+            )
+            self.ws_manager.connect_single(stream)
+
+    def book_frame(self):
+        return encode({'stream': self.stream, 'book': self.depth.book.top(None)})
+
+    def on_message(self, msg):
+        frame = encode({'stream': self.stream, 'data': msg})
+        with self.lock:
+            self.last_frame = frame
+            subscribers = list(self.subscribers)
+        for client in subscribers:
+            client.send(frame)
+
+    def on_depth(self, event, data):
+        # Runs under the DepthSync lock, so clients see the book then diffs in order
+        frame = self.book_frame() if event == SNAPSHOT else encode({'stream': self.stream, 'data': data})
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for client in subscribers:
+            client.send(frame)
+
+    def add(self, client):
+        if self.depth is not None:
+            with self.depth.lock:
+                if self.depth.synced:
+                    client.send(self.book_frame())
+                with self.lock:
+                    self.subscribers.add(client)
+            return
+        with self.lock:
+            if self.last_frame is not None:
+                client.send(self.last_frame)
+            self.subscribers.add(client)
+
+    def remove(self, client):
+        with self.lock:
+            self.subscribers.discard(client)
+            self.last_used = time.time()
+
+    def resend_book(self, client):
+        if self.depth is not None:
+            with self.depth.lock:
+                if self.depth.synced:
+                    client.send(self.book_frame())
+
+    def idle(self, now):
+        with self.lock:
+            return not self.subscribers and now - self.last_used > IDLE_TIMEOUT
+
+    def close(self):
+        if self.depth is not None:
+            self.depth.stop()
+        if self.ws_manager is not None:
+            self.ws_manager.disconnect()
+
+
+class MarketDataHub:
+    """Holds the only exchange connections and answers every client from them."""
+
+    def __init__(self):
+        self.upstreams = {}
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        threading.Thread(target=self._reap, daemon=True).start()
+
+    def upstream(self, stream):
+        with self.lock:
+            upstream = self.upstreams.get(stream)
+            if upstream is None:
+                upstream = self.upstreams[stream] = Upstream(stream)
+            upstream.last_used = time.time()
+            return upstream
+
+    def subscribe(self, streams, client):
+        for stream in streams:
+            self.upstream(stream).add(client)
+
+    def unsubscribe(self, streams, client):
+        with self.lock:
+            upstreams = [self.upstreams.get(stream) for stream in streams]
+        for upstream in upstreams:
+            if upstream is not None:
+                upstream.remove(client)
+
+    def resend_books(self, streams, client):
+        for stream in streams:
+            self.upstream(stream).resend_book(client)
+
+    def _reap(self):
+        while not self.stopped.wait(IDLE_TIMEOUT / 3):
+            now = time.time()
+            with self.lock:
+                idle = [stream for stream, upstream in self.upstreams.items() if upstream.idle(now)]
+                closing = [self.upstreams.pop(stream) for stream in idle]
+            for upstream in closing:
+                upstream.close()
+
+    def get(self, endpoint, args):
+        """Answer a REST call from the local book or the shared TTL cache."""
+        if endpoint == 'depth':
+            symbol, limit = args
+            # Asking for a book once keeps it maintained from the diff stream
+            upstream = self.upstream(f"{symbol.lower()}@depth@100ms")
+            with upstream.depth.lock:
+                if upstream.depth.synced:
+                    return upstream.depth.book.top(limit)
+
+        if endpoint == 'exchangeInfo':
+            etag = args[0]
+            result = self.cached(endpoint, ())
+            if result and etag and result[0] == etag:
+                return [etag, None]
+            return result
+
+        return self.cached(endpoint, tuple(args))
+
+    def cached(self, endpoint, args):
+        key = (endpoint, args)
+        hit = self.cache.get(key)
+        now = time.time()
+        if hit and now - hit[0] < CACHE_TTL[endpoint]:
+            return hit[1]
+        # The pool merges identical in-flight calls, so a burst of misses costs one request
+        fn = getattr(api, ENDPOINTS[endpoint])
+        data = REST_POOL.submit(fn, *args).result(timeout=REQUEST_TIMEOUT * 2)
+        if data is not None:
+            self.cache[key] = (now, data)
+            if len(self.cache) > 1000:
+                self.cache = {k: v for k, v in self.cache.items() if now - v[0] < CACHE_TTL[k[0]]}
+        return data
+
+    def shutdown(self):
+        self.stopped.set()
+        with self.lock:
+            upstreams = list(self.upstreams.values())
+            self.upstreams.clear()
+        for upstream in upstreams:
+            upstream.close()
+
+
+class ClientHandler(socketserver.StreamRequestHandler):
+    """One client connection: a single REST call or a long-lived subscription."""
+
+    def setup(self):
+        super().setup()
+        self.frames = queue.Queue(maxsize=CLIENT_QUEUE)
+        self.closed = False
+
+    def send(self, frame):
+        if self.closed:
+            return
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            # Too slow to keep up; it will reconnect and start from a fresh snapshot
+            self.close()
+
+    def close(self):
+        self.closed = True
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.frames.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            self.wfile.write(encode({'error': 'invalid request'}))
+            return
+
+        hub = self.server.hub
+        if request.get('op') == 'get':
+            try:
+                data = hub.get(request['endpoint'], request.get('args', []))
+                self.wfile.write(encode({'data': data}))
+            except Exception as e:
+                self.wfile.write(encode({'error': str(e)}))
+            return
+
+        if request.get('op') == 'subscribe':
+            streams = request.get('streams', [])
+            threading.Thread(target=self.read_commands, args=(streams,), daemon=True).start()
+            hub.subscribe(streams, self)
+            try:
+                self.write_frames()
+            finally:
+                hub.unsubscribe(streams, self)
+                self.close()
+
+    def read_commands(self, streams):
+        try:
+            for line in self.rfile:
+                if json.loads(line).get('op') == 'snapshot':
+                    self.server.hub.resend_books(streams, self)
+        except (OSError, ValueError):
+            pass
+        self.close()
+
+    def write_frames(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None or self.closed:
+                return
+            try:
+                self.wfile.write(frame)
+            except OSError:
+                return
+
+
+class MarketDataDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket server in front of a MarketDataHub."""
+
+    daemon_threads = True
+
+    def __init__(self, address=DAEMON_ADDRESS):
+        if os.path.exists(address):
+            if is_running(address):
+                raise RuntimeError(f"A daemon is already listening on {address}")
+            os.unlink(address)
+        self.hub = MarketDataHub()
+        super().__init__(address, ClientHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.hub.shutdown()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+class DaemonSubscription:
+    """Client end of a subscription; stands in for the WebSocketApp."""
+
+    provides_snapshots = True
+
+    def __init__(self, sock, on_frame, on_close):
+        self.sock = sock
+        self.on_frame = on_frame
+        self.on_close = on_close
+        self.send_lock = threading.Lock()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        error = None
+        try:
+            for line in self.sock.makefile('rb'):
+                self.on_frame(json.loads(line))
+        except (OSError, ValueError) as e:
+            error = e
+        self.on_close(error)
+
+    def request_snapshot(self):
+        try:
+            with self.send_lock:
+                self.sock.sendall(encode({'op': 'snapshot'}))
+        except OSError:
+            pass
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class DaemonClient:
+    """What utils.binance_api talks to while a daemon is attached."""
+
+    def __init__(self, address=DAEMON_ADDRESS):
+        self.address = address
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.address)
+        return sock
+
+    def get(self, endpoint, *args):
+        try:
+            sock = self.connect()
+        except OSError as e:
+            # Daemon went away: carry on talking to the exchange directly
+            print(f"Error reaching market-data daemon: {e}")
+            detach()
+            return getattr(api, ENDPOINTS[endpoint])(*args)
+
+        try:
+            sock.settimeout(REQUEST_TIMEOUT * 2)
+            sock.sendall(encode({'op': 'get', 'endpoint': endpoint, 'args': list(args)}))
+            reply = json.loads(sock.makefile('rb').readline())
+        except (OSError, ValueError) as e:
+            print(f"Error fetching {endpoint} from daemon: {e}")
+            return None
+        finally:
+            sock.close()
+
+        if 'error' in reply:
+            print(f"Error fetching {endpoint} from daemon: {reply['error']}")
+            return None
+        data = reply['data']
+        if endpoint == 'exchangeInfo' and data is not None:
+            return tuple(data)
+        return data
+
+    def subscribe(self, streams, on_frame, on_close):
+        try:
+            sock = self.connect()
+            sock.sendall(encode({'op': 'subscribe', 'streams': list(streams)}))
+        except OSError as e:
+            print(f"Error reaching market-data daemon: {e}")
+            detach()
+            return None
+        return DaemonSubscription(sock, on_frame, on_close)
+
+
+def is_running(address=DAEMON_ADDRESS):
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(address):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def attach(address=DAEMON_ADDRESS):
+    """Route REST calls and streams through the daemon if one is running."""
+    if not is_running(address):
+        return False
+    api.DAEMON = DaemonClient(address)
+    return True
+
+
+def detach():
+    api.DAEMON = None
@@ -0,0 +1,171 @@
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds of the histogram buckets (render and REST times)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metrics:
+    """Process-wide counters, gauges and histograms in Prometheus text format.
+
+    Each series is keyed by metric name and a tuple of label values, and an
+    update is one dict write under a lock, cheap enough to count every
+    stream message. Values that are cheaper to read than to keep current
+    are registered as collectors and read when scraped.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.meta = {}
+        self.values = {}
+        self.collectors = {}
+
+    def counter(self, name, help_text, labels=()):
+        self.meta[name] = ('counter', help_text, labels)
+
+    def gauge(self, name, help_text, labels=(), collect=None):
+        """Declare a gauge; collect() may return its value, or {label values: value}."""
+        self.meta[name] = ('gauge', help_text, labels)
+        if collect:
+            self.collectors[name] = collect
+
+    def histogram(self, name, help_text, labels=()):
+        self.meta[name] = ('histogram', help_text, labels)
+
+    def inc(self, name, *labels, value=1):
+        key = (name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, *labels, value):
+        with self.lock:
+            self.values[(name, labels)] = value
+
+    def observe(self, name, *labels, value):
+        key = (name, labels)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                # One count per bucket, then sum and count
+                series = self.values[key] = [0] * (len(BUCKETS) + 2)
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def timed(self, name, panel):
+        """Decorator timing a panel method into histogram `name`, labelled by panel and symbol."""
+        def decorate(method):
+            @wraps(method)
+            def wrapper(obj, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(obj, *args, **kwargs)
+                finally:
+                    self.observe(name, panel, getattr(obj, 'symbol', ''),
+                                 value=time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def collect(self, name):
+        try:
+            value = self.collectors[name]()
+        except Exception as e:
+            print(f"Error collecting {name}: {e}")
+            return {}
+        if value is None:
+            return {}
+        return value if isinstance(value, dict) else {(): value}
+
+    def render(self):
+        """Every series in Prometheus text exposition format."""
+        with self.lock:
+            values = {key: list(value) if isinstance(value, list) else value
+                      for key, value in self.values.items()}
+        by_name = {}
+        for (name, labels), value in values.items():
+            by_name.setdefault(name, {})[labels] = value
+        for name in self.collectors:
+            by_name.setdefault(name, {}).update(self.collect(name))
+
+        lines = []
+        for name, (kind, help_text, label_names) in self.meta.items():
+            series = by_name.get(name)
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(series.items()):
+                if kind != 'histogram':
+                    lines.append(f"{name}{format_labels(label_names, labels)} {format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS, value):
+                    cumulative += count
+                    le = f'le="{bound:g}"'
+                    lines.append(f"{name}_bucket{format_labels(label_names, labels, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{name}_bucket{format_labels(label_names, labels, le)} {value[-1]}")
+                lines.append(f"{name}_sum{format_labels(label_names, labels)} {format_value(value[-2])}")
+                lines.append(f"{name}_count{format_labels(label_names, labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+METRICS.counter('dashboard_ws_messages_total', "Stream messages received", ('stream',))
+METRICS.counter('dashboard_ws_decode_errors_total', "Stream messages that failed to decode or handle", ('stream',))
+METRICS.counter('dashboard_ws_reconnects_total', "Stream reconnects after a drop", ('stream',))
+METRICS.counter('dashboard_book_resyncs_total', "Local order book resyncs after a sequence gap", ('symbol',))
+METRICS.counter('dashboard_rest_requests_total', "REST requests by endpoint and HTTP status", ('endpoint', 'status'))
+METRICS.histogram('dashboard_rest_latency_seconds', "REST request round-trip time", ('endpoint',))
+METRICS.gauge('dashboard_rest_used_weight', "Request weight used this minute, from X-MBX-USED-WEIGHT-1M")
+METRICS.histogram('dashboard_panel_render_seconds', "Time spent repainting a panel", ('panel', 'symbol'))
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = METRICS.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """Serves /metrics for Prometheus on a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, port, host='127.0.0.1'):
+        super().__init__((host, port), MetricsHandler)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='metrics', daemon=True).start()
+        return self
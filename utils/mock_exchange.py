@@ -0,0 +1,254 @@
+import base64
+import hashlib
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from utils.mock_feed import MockMarket
+
+# Appended to Sec-WebSocket-Key before hashing, per RFC 6455
+WS_MAGIC = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Messages per second per WebSocket connection accepted by the rate knob
+MIN_RATE = 1
+MAX_RATE = 10_000
+
+
+class Chaos:
+    """Fault knobs shared by every connection; changed live through GET /chaos.
+
+    latency_ms        added before every REST answer and every stream frame
+    drop_rate         fraction of stream frames silently discarded
+    gap_rate          fraction of stream messages after which ids jump ahead
+    disconnect_rate   forced disconnects per connection per second
+    rate              stream messages per second per connection
+    """
+
+    FIELDS = {'latency_ms': float, 'drop_rate': float, 'gap_rate': float,
+              'disconnect_rate': float, 'rate': float}
+
+    def __init__(self, rate=10, latency_ms=0.0, drop_rate=0.0, gap_rate=0.0, disconnect_rate=0.0):
+        self.rate = rate
+        self.latency_ms = latency_ms
+        self.drop_rate = drop_rate
+        self.gap_rate = gap_rate
+        self.disconnect_rate = disconnect_rate
+
+    def update(self, params):
+        """Set knobs from query parameters; unknown or malformed values raise ValueError."""
+        for name, values in params.items():
+            if name not in self.FIELDS:
+                raise ValueError(f"Unknown chaos setting: {name}")
+            setattr(self, name, self.FIELDS[name](values[-1]))
+        self.rate = min(MAX_RATE, max(MIN_RATE, self.rate))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+def ws_frame(payload, opcode=0x1):
+    """Encode one unmasked server-to-client WebSocket frame."""
+    header = bytes([0x80 | opcode])
+    n = len(payload)
+    if n < 126:
+        header += bytes([n])
+    elif n < 1 << 16:
+        header += bytes([126]) + struct.pack('!H', n)
+    else:
+        header += bytes([127]) + struct.pack('!Q', n)
+    return header + payload
+
+
+def read_ws_frame(rfile):
+    """Read one client frame; returns (opcode, payload) or None at end of stream."""
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None
+    opcode = head[0] & 0x0F
+    n = head[1] & 0x7F
+    if n == 126:
+        n = struct.unpack('!H', rfile.read(2))[0]
+    elif n == 127:
+        n = struct.unpack('!Q', rfile.read(8))[0]
+    mask = rfile.read(4) if head[1] & 0x80 else b'\0\0\0\0'
+    data = rfile.read(n)
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+
+class MockExchangeHandler(BaseHTTPRequestHandler):
+    """Binance-shaped REST endpoints, plus /ws/<stream> and /stream?streams=a/b."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if self.headers.get('Upgrade', '').lower() == 'websocket':
+            if url.path.startswith('/ws/'):
+                return self.serve_stream([url.path[len('/ws/'):]], combined=False)
+            if url.path == '/stream' and params.get('streams'):
+                return self.serve_stream(params['streams'][0].split('/'), combined=True)
+            return self.send_json({'code': -1, 'msg': 'Unknown stream path'}, 404)
+
+        if url.path == '/chaos':
+            try:
+                self.server.chaos.update(params)
+            except ValueError as e:
+                return self.send_json({'code': -1, 'msg': str(e)}, 400)
+            return self.send_json(self.server.chaos.as_dict())
+
+        handler = REST_ENDPOINTS.get(url.path)
+        if handler is None:
+            return self.send_json({'code': -1, 'msg': 'Unknown endpoint'}, 404)
+        time.sleep(self.server.chaos.latency_ms / 1000)
+        try:
+            body = handler(self.server.market, {name: values[-1] for name, values in params.items()})
+        except (KeyError, ValueError) as e:
+            return self.send_json({'code': -1102, 'msg': f"Bad parameter: {e}"}, 400)
+        self.send_json(body)
+
+    def send_json(self, body, status=200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def serve_stream(self, streams, combined):
+        """Upgrade to WebSocket and push mock messages until the client leaves or chaos strikes."""
+        key = self.headers.get('Sec-WebSocket-Key', '')
+        accept = base64.b64encode(hashlib.sha1((key + WS_MAGIC).encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', accept)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+
+        closed = threading.Event()
+        write_lock = threading.Lock()
+        threading.Thread(target=self.read_client, args=(closed, write_lock), daemon=True).start()
+        try:
+            self.push(streams, combined, closed, write_lock)
+        except OSError:
+            pass
+        finally:
+            closed.set()
+
+    def read_client(self, closed, write_lock):
+        """Answer pings and notice when the client closes."""
+        try:
+            while not closed.is_set():
+                frame = read_ws_frame(self.rfile)
+                if frame is None or frame[0] == 0x8:
+                    break
+                if frame[0] == 0x9:
+                    with write_lock:
+                        self.wfile.write(ws_frame(frame[1], opcode=0xA))
+        except (OSError, ValueError, struct.error):
+            pass
+        closed.set()
+
+    def push(self, streams, combined, closed, write_lock):
+        chaos = self.server.chaos
+        market = self.server.market
+        # Seeded per stream set, so a run with the same knobs drops the same frames
+        rng = random.Random(f"{self.server.seed}:{'/'.join(streams)}")
+        started = last = time.monotonic()
+        produced = 0
+        delayed = deque()
+
+        while not closed.is_set():
+            now = time.monotonic()
+            # Generate everything due at the current rate. After a stall or a
+            # rate change, send at most a second's worth and rebase the schedule
+            due = int((now - started) * chaos.rate) - produced
+            if due < 0 or due > chaos.rate:
+                due = min(max(due, 0), int(chaos.rate))
+                started = now - (produced + due) / chaos.rate
+            for _ in range(due):
+                stream = streams[produced % len(streams)]
+                produced += 1
+                message = market.stream_message(stream)
+                if rng.random() < chaos.gap_rate:
+                    market.gap(stream.partition('@')[0], size=rng.randint(1, 50))
+                if rng.random() < chaos.drop_rate:
+                    continue
+                if combined:
+                    message = {'stream': stream, 'data': message}
+                frame = ws_frame(json.dumps(message, separators=(',', ':')).encode())
+                delayed.append((now + chaos.latency_ms / 1000, frame))
+
+            batch = []
+            while delayed and delayed[0][0] <= now:
+                batch.append(delayed.popleft()[1])
+            if batch:
+                with write_lock:
+                    self.wfile.write(b''.join(batch))
+
+            if chaos.disconnect_rate and rng.random() < chaos.disconnect_rate * (now - last):
+                # Drop the TCP connection without a close frame, like a network failure
+                self.connection.shutdown(socket.SHUT_RDWR)
+                return
+            last = now
+
+            next_message = started + (produced + 1) / chaos.rate
+            wake = min(next_message, delayed[0][0]) if delayed else next_message
+            closed.wait(min(0.05, max(0.0005, wake - time.monotonic())))
+
+
+def rest_depth(market, params):
+    return market.order_book(params['symbol'], min(5000, int(params.get('limit', 100))))
+
+
+def rest_trades(market, params):
+    return market.recent_trades(params['symbol'], min(1000, int(params.get('limit', 500))))
+
+
+def rest_klines(market, params):
+    return market.klines(params['symbol'], params['interval'], min(1000, int(params.get('limit', 500))))
+
+
+def rest_exchange_info(market, params):
+    return market.exchange_info()
+
+
+REST_ENDPOINTS = {
+    '/api/v3/depth': rest_depth,
+    '/api/v3/trades': rest_trades,
+    '/api/v3/klines': rest_klines,
+    '/api/v3/exchangeInfo': rest_exchange_info,
+    '/api/v3/ping': lambda market, params: {},
+}
+
+
+class MockExchange(ThreadingHTTPServer):
+    """Local stand-in for the Binance REST and WebSocket APIs, driven by a MockMarket."""
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 8765), market=None, chaos=None, seed=42):
+        super().__init__(address, MockExchangeHandler)
+        self.seed = seed
+        self.market = market or MockMarket(seed=seed)
+        self.chaos = chaos or Chaos()
+
+    @property
+    def rest_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def ws_url(self):
+        host, port = self.server_address[:2]
+        return f"ws://{host}:{port}"
@@ -0,0 +1,246 @@
+import random
+import threading
+import time
+from config import INTERVAL_MS, SYMBOLS
+
+
+class MockMarket:
+    """Deterministic synthetic market for every symbol: a seeded random walk.
+
+    Produces data in the same shapes as the Binance REST endpoints and
+    WebSocket streams, so the dashboard can run without the live API.
+    """
+
+    def __init__(self, seed=42, start_price=100.0, volatility=0.0005):
+        self.seed = seed
+        self.start_price = start_price
+        self.volatility = volatility
+        self.states = {}
+        self._lock = threading.Lock()
+
+    def _state(self, symbol):
+        symbol = symbol.lower()
+        state = self.states.get(symbol)
+        if state is None:
+            # Each symbol gets its own stream, so results do not depend on call order
+            rng = random.Random(f"{self.seed}:{symbol}")
+            price = self.start_price * (1 + rng.random())
+            state = {'rng': rng, 'price': price, 'tick': price * 0.0001,
+                     'trade_id': 1, 'update_id': 1, 'depth_id': 0, 'depth_prev': None, 'open': None, 'high': 0.0, 'low': 0.0, 'volume': 0.0}
+            self.states[symbol] = state
+        return state
+
+    def step(self, symbol):
+        """Advance a symbol by one trade and return (price, qty, is_buyer_maker, trade_id)."""
+        with self._lock:
+            state = self._state(symbol)
+            rng = state['rng']
+            state['price'] *= 1 + rng.gauss(0, self.volatility)
+            qty = round(rng.expovariate(1.0), 4)
+            state['trade_id'] += 1
+            state['update_id'] += 1
+            if state['open'] is None:
+                state['open'] = state['high'] = state['low'] = state['price']
+            state['high'] = max(state['high'], state['price'])
+            state['low'] = min(state['low'], state['price'])
+            state['volume'] += qty
+            return state['price'], qty, rng.random() < 0.5, state['trade_id']
+
+    def gap(self, symbol, size=10):
+        """Skip ids as if `size` updates were lost, so the next depth diff and trade leave a hole."""
+        with self._lock:
+            state = self._state(symbol)
+            state['update_id'] += size
+            state['depth_id'] += size
+            state['trade_id'] += size
+
+    def price(self, symbol):
+        with self._lock:
+            return self._state(symbol)['price']
+
+    def _ladder(self, state, limit):
+        """Bid and ask price levels on the symbol's fixed tick grid around its price."""
+        tick = state['tick']
+        below = int(state['price'] / tick)
+        bids = [f"{(below - i) * tick:.8f}" for i in range(limit)]
+        asks = [f"{(below + 1 + i) * tick:.8f}" for i in range(limit)]
+        return bids, asks
+
+    def order_book(self, symbol, limit=10):
+        with self._lock:
+            state = self._state(symbol)
+            rng = state['rng']
+            bid_prices, ask_prices = self._ladder(state, limit)
+            bids = [[price, f"{rng.expovariate(0.5):.8f}"] for price in bid_prices]
+            asks = [[price, f"{rng.expovariate(0.5):.8f}"] for price in ask_prices]
+            return {'lastUpdateId': state['update_id'], 'bids': bids, 'asks': asks}
+
+    def recent_trades(self, symbol, limit=20):
+        now = int(time.time() * 1000)
+        trades = []
+        for i in range(limit):
+            price, qty, maker, trade_id = self.step(symbol)
+            trades.append({'id': trade_id, 'price': f"{price:.8f}", 'qty': f"{qty:.8f}",
+                           'time': now - (limit - i) * 10, 'isBuyerMaker': maker})
+        return trades
+
+    def klines(self, symbol, interval="1h", limit=100):
+        step = INTERVAL_MS.get(interval, 60_000)
+        now = int(time.time() * 1000) // step * step
+        rng = random.Random(f"{self.seed}:{symbol}:{interval}")
+        price = self.price(symbol)
+        rows = []
+        for i in range(limit):
+            open_price = price
+            close = price * (1 + rng.gauss(0, self.volatility * 10))
+            high = max(open_price, close) * (1 + abs(rng.gauss(0, self.volatility * 5)))
+            low = min(open_price, close) * (1 - abs(rng.gauss(0, self.volatility * 5)))
+            open_time = now - (limit - 1 - i) * step
+            rows.append([open_time, f"{open_price:.8f}", f"{high:.8f}", f"{low:.8f}", f"{close:.8f}",
+                         f"{rng.expovariate(0.01):.8f}", open_time + step - 1, "0", 0, "0", "0", "0"])
+            price = close
+        return rows
+
+    def exchange_info(self):
+        """exchangeInfo listing the configured symbols."""
+        symbols = []
+        for info in SYMBOLS:
+            base, quote = info['name'].split('/')
+            symbols.append({'symbol': info['symbol'].upper(), 'status': 'TRADING',
+                            'baseAsset': base, 'quoteAsset': quote,
+                            'filters': [{'filterType': 'PRICE_FILTER', 'tickSize': '0.00010000'},
+                                        {'filterType': 'LOT_SIZE', 'stepSize': '0.00010000'}]})
+        return {'symbols': symbols}
+
+    def stream_message(self, stream):
+        """Return the next message for a stream name like 'btcusdt@ticker'."""
+        symbol, _, kind = stream.partition('@')
+        price, qty, maker, trade_id = self.step(symbol)
+        now = int(time.time() * 1000)
+        s = symbol.upper()
+        with self._lock:
+            state = self._state(symbol)
+            stats = dict(state)
+        if kind == 'ticker':
+            change = price - stats['open']
+            return {'e': '24hrTicker', 'E': now, 's': s, 'c': f"{price:.8f}", 'p': f"{change:.8f}",
+                    'P': f"{change / stats['open'] * 100:.3f}", 'v': f"{stats['volume']:.8f}",
+                    'h': f"{stats['high']:.8f}", 'l': f"{stats['low']:.8f}"}
+        if kind == 'miniTicker':
+            return {'e': '24hrMiniTicker', 'E': now, 's': s, 'c': f"{price:.8f}", 'o': f"{stats['open']:.8f}",
+                    'h': f"{stats['high']:.8f}", 'l': f"{stats['low']:.8f}", 'v': f"{stats['volume']:.8f}"}
+        if kind == 'bookTicker':
+            tick = price * 0.0001
+            return {'u': stats['update_id'], 's': s, 'b': f"{price - tick:.8f}", 'B': f"{qty:.8f}",
+                    'a': f"{price + tick:.8f}", 'A': f"{qty:.8f}"}
+        if kind == 'trade':
+            return {'e': 'trade', 'E': now, 's': s, 't': trade_id, 'p': f"{price:.8f}", 'q': f"{qty:.8f}",
+                    'T': now, 'm': maker}
+        if kind == 'aggTrade':
+            return {'e': 'aggTrade', 'E': now, 's': s, 'a': trade_id, 'p': f"{price:.8f}", 'q': f"{qty:.8f}",
+                    'f': trade_id, 'l': trade_id, 'T': now, 'm': maker}
+        if kind.startswith('kline_'):
+            interval = kind[len('kline_'):]
+            step = INTERVAL_MS.get(interval, 60_000)
+            open_time = now // step * step
+            return {'e': 'kline', 'E': now, 's': s,
+                    'k': {'t': open_time, 'T': open_time + step - 1, 's': s, 'i': interval,
+                          'o': f"{stats['open']:.8f}", 'c': f"{price:.8f}", 'h': f"{stats['high']:.8f}",
+                          'l': f"{stats['low']:.8f}", 'v': f"{stats['volume']:.8f}", 'x': False}}
+        if kind.startswith('depth'):
+            with self._lock:
+                # Diffs follow on from each other: the ladder near the price is
+                # refreshed and levels the price moved through are removed
+                first = state['depth_id'] + 1
+                state['depth_id'] = stats['update_id']
+                rng = state['rng']
+                bid_prices, ask_prices = self._ladder(state, 20)
+                prev_bids, prev_asks = state['depth_prev'] or ((), ())
+                state['depth_prev'] = (bid_prices, ask_prices)
+                bids = [[price, f"{rng.expovariate(0.5):.8f}"] for price in bid_prices]
+                asks = [[price, f"{rng.expovariate(0.5):.8f}"] for price in ask_prices]
+            bids += [[price, "0"] for price in prev_bids if float(price) > float(bid_prices[0])]
+            asks += [[price, "0"] for price in prev_asks if float(price) < float(ask_prices[0])]
+            return {'e': 'depthUpdate', 'E': now, 's': s, 'U': first, 'u': stats['update_id'],
+                    'b': bids, 'a': asks}
+        return {'e': kind, 'E': now, 's': s}
+
+
+class MockWebSocket:
+    """Drop-in stand-in for BinanceWebSocket that streams MockMarket messages."""
+
+    provides_snapshots = False
+
+    def __init__(self, market, on_message_callback, on_error_callback=None, rate=10):
+        self.market = market
+        self.on_message_callback = on_message_callback
+        self.on_error_callback = on_error_callback
+        self.rate = rate
+        self.is_active = False
+        self._stopped = threading.Event()
+
+    def connect_single(self, stream_name):
+        return self._connect([stream_name], combined=False)
+
+    def connect_multiple(self, streams):
+        return self._connect(list(streams), combined=True)
+
+    def _connect(self, streams, combined):
+        if self.is_active:
+            self.disconnect()
+        self.is_active = True
+        # Each connection gets its own stop flag so a reconnect never revives the old thread
+        self._stopped = threading.Event()
+        threading.Thread(target=self._run, args=(streams, combined, self._stopped), daemon=True).start()
+        return self
+
+    def _run(self, streams, combined, stopped):
+        interval = 1.0 / self.rate
+        while not stopped.is_set():
+            for stream in streams:
+                if stopped.is_set():
+                    return
+                message = self.market.stream_message(stream)
+                if combined:
+                    message = {'stream': stream, 'data': message}
+                try:
+                    self.on_message_callback(message)
+                except Exception as e:
+                    if self.on_error_callback:
+                        self.on_error_callback(f"Message error: {e}")
+            stopped.wait(interval)
+
+    def disconnect(self):
+        self.is_active = False
+        self._stopped.set()
+
+
+def install(market, rate=10):
+    """Point utils.binance_api at a MockMarket.
+
+    Must run before the panel modules are imported, since they bind the API
+    functions by name at import time.
+    """
+    import utils.binance_api as api
+
+    # Named functions, since the REST pool keys in-flight requests by function name
+    def get_order_book(symbol, limit=10):
+        return market.order_book(symbol, limit)
+
+    def get_recent_trades(symbol, limit=20):
+        return market.recent_trades(symbol, limit)
+
+    def get_klines(symbol, interval="1h", limit=100):
+        return market.klines(symbol, interval, limit)
+
+    def get_exchange_info(etag=None):
+        return None, market.exchange_info()
+
+    def BinanceWebSocket(on_message_callback, on_error_callback=None, on_snapshot_callback=None):
+        return MockWebSocket(market, on_message_callback, on_error_callback, rate)
+
+    api.get_order_book = get_order_book
+    api.get_recent_trades = get_recent_trades
+    api.get_klines = get_klines
+    api.get_exchange_info = get_exchange_info
+    api.BinanceWebSocket = BinanceWebSocket
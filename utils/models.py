@@ -0,0 +1,147 @@
+import numpy as np
+from utils.tape import TradeTape
+
+__all__ = ['CandleSeries', 'BookSide', 'TickerState', 'TradeTape']
+
+
+class CandleSeries:
+    """OHLCV candles in one preallocated NumPy buffer.
+
+    The newest `size` rows (at most `limit`) are loaded in place into a
+    buffer allocated once, so a column is a plain slice and panels read it
+    without copying. Kline rows are parsed in one NumPy conversion rather
+    than float() per field.
+    """
+
+    __slots__ = ('limit', 'rows', 'size', 'version')
+
+    def __init__(self, limit=1000):
+        self.limit = limit
+        self.rows = np.zeros((limit, 6))
+        self.size = 0
+        self.version = 0
+
+    def __len__(self):
+        return self.size
+
+    def load(self, klines):
+        """Replace the candles with Binance kline rows (strings or numbers) or an (n, 6+) array."""
+        data = klines if isinstance(klines, np.ndarray) else np.array(klines, dtype=object)
+        n = min(len(data), self.limit)
+        if n:
+            self.rows[:n] = data[len(data) - n:, :6]
+        self.size = n
+        self.version += 1
+
+    def column(self, i):
+        return self.rows[:self.size, i]
+
+    @property
+    def open_time(self):
+        return self.column(0)
+
+    @property
+    def open(self):
+        return self.column(1)
+
+    @property
+    def high(self):
+        return self.column(2)
+
+    @property
+    def low(self):
+        return self.column(3)
+
+    @property
+    def close(self):
+        return self.column(4)
+
+    @property
+    def volume(self):
+        return self.column(5)
+
+    def key(self):
+        """(first open time, last open time, last close, count): identifies the candles for the indicator cache."""
+        if not self.size:
+            return None
+        first, last = self.rows[0], self.rows[self.size - 1]
+        return int(first[0]), int(last[0]), float(last[4]), self.size
+
+    def klines(self):
+        """The candles as [open time, open, high, low, close, volume] lists, e.g. for the session snapshot."""
+        return [[int(row[0])] + row[1:] for row in self.rows[:self.size].tolist()]
+
+
+class BookSide:
+    """The best `depth` levels of one side of a book, best first.
+
+    Prices, quantities and notionals are preallocated arrays refilled in
+    place from the local book on each repaint, so showing the book builds
+    no per-level lists.
+    """
+
+    __slots__ = ('depth', 'prices', 'qtys', 'totals', 'size')
+
+    def __init__(self, depth=10):
+        self.depth = depth
+        self.prices = np.zeros(depth)
+        self.qtys = np.zeros(depth)
+        self.totals = np.zeros(depth)
+        self.size = 0
+
+    def fill(self, prices, levels, descending):
+        """Copy the best levels from an ascending price list and its price -> qty dict."""
+        n = min(self.depth, len(prices))
+        for i in range(n):
+            price = prices[-1 - i] if descending else prices[i]
+            self.prices[i] = price
+            self.qtys[i] = levels[price]
+        self.size = n
+        np.multiply(self.prices, self.qtys, out=self.totals)
+
+    def load(self, levels):
+        """Fill from [price, qty] pairs (REST depth format, strings or numbers), best first."""
+        n = min(self.depth, len(levels))
+        if n:
+            data = np.array(levels[:n], dtype=object)
+            self.prices[:n] = data[:, 0]
+            self.qtys[:n] = data[:, 1]
+        self.size = n
+        np.multiply(self.prices, self.qtys, out=self.totals)
+
+    def levels(self):
+        """[[price, qty], ...] of the levels held."""
+        return np.column_stack([self.prices[:self.size], self.qtys[:self.size]]).tolist()
+
+
+class TickerState:
+    """Latest 24h ticker values, written by the stream thread and read by the Tk loop.
+
+    A message only overwrites six floats and bumps version; the panel
+    repaints on its own timer when version has moved.
+    """
+
+    __slots__ = ('price', 'change', 'percent', 'volume', 'high', 'low', 'version')
+
+    def __init__(self):
+        self.price = 0.0
+        self.change = 0.0
+        self.percent = 0.0
+        self.volume = 0.0
+        self.high = 0.0
+        self.low = 0.0
+        self.version = 0
+
+    def update(self, msg):
+        """Take the values of a <symbol>@ticker message."""
+        self.price = float(msg['c'])
+        self.change = float(msg['p'])
+        self.percent = float(msg['P'])
+        self.volume = float(msg['v'])
+        self.high = float(msg['h'])
+        self.low = float(msg['l'])
+        self.version += 1
+
+    def values(self):
+        """(price, change, percent, volume, high, low)"""
+        return self.price, self.change, self.percent, self.volume, self.high, self.low
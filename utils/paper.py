@@ -0,0 +1,432 @@
+import bisect
+import itertools
+import threading
+import time
+from collections import deque
+from utils.binance_api import BinanceWebSocket
+from utils.local_book import DepthSync, SNAPSHOT
+
+BUY = 'BUY'
+SELL = 'SELL'
+LIMIT = 'LIMIT'
+MARKET = 'MARKET'
+
+# Binance order statuses
+NEW = 'NEW'
+PARTIALLY_FILLED = 'PARTIALLY_FILLED'
+FILLED = 'FILLED'
+CANCELED = 'CANCELED'
+EXPIRED = 'EXPIRED'
+
+# Quantities below this count as nothing left
+EPSILON = 1e-12
+
+
+class PaperOrder:
+    """One simulated order; queue_ahead is the live quantity estimated in front of it."""
+
+    def __init__(self, order_id, side, order_type, price, qty, time_ms):
+        self.order_id = order_id
+        self.side = side
+        self.order_type = order_type
+        self.price = price
+        self.qty = qty
+        self.time_ms = time_ms
+        self.filled = 0.0
+        self.cost = 0.0
+        self.queue_ahead = 0.0
+        self.status = NEW
+
+    @property
+    def remaining(self):
+        return self.qty - self.filled
+
+    @property
+    def avg_price(self):
+        return self.cost / self.filled if self.filled else None
+
+    @property
+    def is_open(self):
+        return self.status in (NEW, PARTIALLY_FILLED)
+
+
+class RestingSide:
+    """Resting simulated orders on one side, in price-time priority.
+
+    prices is the ascending list of prices holding orders and levels maps
+    each to a FIFO of orders, so a trade or book change finds the levels it
+    reaches by bisect and touches only those, however many rest elsewhere.
+    For each level the live book quantity last seen there and the trade
+    volume printed there since are kept to tell fills from cancels.
+    """
+
+    def __init__(self, is_bid):
+        self.is_bid = is_bid
+        self.prices = []
+        self.levels = {}
+        self.book_qty = {}
+        self.traded = {}
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels.values())
+
+    def add(self, order, book_qty):
+        level = self.levels.get(order.price)
+        if level is None:
+            level = self.levels[order.price] = deque()
+            bisect.insort(self.prices, order.price)
+            self.book_qty[order.price] = book_qty
+        level.append(order)
+
+    def remove(self, order):
+        level = self.levels.get(order.price)
+        if level is None or order not in level:
+            return
+        level.remove(order)
+        if not level:
+            del self.levels[order.price]
+            del self.prices[bisect.bisect_left(self.prices, order.price)]
+            self.book_qty.pop(order.price, None)
+            self.traded.pop(order.price, None)
+
+    def best(self):
+        if not self.prices:
+            return None
+        return self.prices[-1] if self.is_bid else self.prices[0]
+
+    def through(self, price, inclusive=True):
+        """Prices of levels at or better than price (strictly better if not inclusive), best first."""
+        if self.is_bid:
+            start = (bisect.bisect_left if inclusive else bisect.bisect_right)(self.prices, price)
+            return self.prices[start:][::-1]
+        end = (bisect.bisect_right if inclusive else bisect.bisect_left)(self.prices, price)
+        return self.prices[:end]
+
+
+class PaperAccount:
+    """Net position, average entry and PnL from simulated fills."""
+
+    def __init__(self):
+        self.position = 0.0
+        self.avg_price = 0.0
+        self.realized = 0.0
+        self.fees = 0.0
+        self.volume = 0.0
+
+    def on_fill(self, side, price, qty, fee):
+        signed = qty if side == BUY else -qty
+        self.fees += fee
+        self.volume += price * qty
+        if self.position == 0 or (self.position > 0) == (signed > 0):
+            new_position = self.position + signed
+            self.avg_price = (self.avg_price * abs(self.position) + price * qty) / abs(new_position)
+            self.position = new_position
+            return
+        # Reducing, closing or flipping the position
+        direction = 1 if self.position > 0 else -1
+        self.realized += min(qty, abs(self.position)) * (price - self.avg_price) * direction
+        self.position += signed
+        if abs(self.position) < EPSILON:
+            self.position, self.avg_price = 0.0, 0.0
+        elif (self.position > 0) != (direction > 0):
+            self.avg_price = price
+
+    def unrealized(self, mark):
+        if mark is None or not self.position:
+            return 0.0
+        return (mark - self.avg_price) * self.position
+
+
+class PaperExchange:
+    """Simulated limit and market orders filled against the live local book and trade stream.
+
+    Orders that cross the book take its liquidity at book prices (taker).
+    The rest wait at their price with the book quantity already there
+    counted as queue ahead of them. Trades at that price use up the queue
+    before filling the order; book decreases beyond the traded volume are
+    cancels, assumed spread evenly through the queue. Trades through the
+    price, and book orders arriving across it, fill at the order's price
+    (maker). Book liquidity used by simulated fills is remembered so it is
+    not used twice while it stays on the book.
+    """
+
+    maker_fee_bps = 10.0
+    taker_fee_bps = 10.0
+    max_fills = 200
+    max_closed = 200
+
+    def __init__(self, symbol):
+        self.symbol = symbol.lower()
+        self.sides = {BUY: RestingSide(True), SELL: RestingSide(False)}
+        # Book liquidity already filled against, by side (True for bids) and price
+        self.taken = {True: {}, False: {}}
+        self.orders = {}
+        self.closed = deque(maxlen=self.max_closed)
+        self.fills = deque(maxlen=self.max_fills)
+        self.account = PaperAccount()
+        self.ids = itertools.count(1)
+        self.mark = None
+        self.last_price = None
+        self.version = 0
+        self.lock = threading.Lock()
+        self.sync = None
+        self.trade_ws = None
+
+    def start(self):
+        self.sync = DepthSync(self.symbol)
+        self.sync.add_listener(self.on_book_event)
+        self.sync.start()
+        self.trade_ws = BinanceWebSocket(
+            on_message_callback=self.on_trade,
+            on_error_callback=lambda err: print(f"{self.symbol} paper trade stream error: {err}")
+        )
+        self.trade_ws.connect_single(f"{self.symbol}@trade")
+        return self
+
+    def stop(self):
+        if self.trade_ws:
+            self.trade_ws.disconnect()
+            self.trade_ws = None
+        if self.sync:
+            self.sync.stop()
+            self.sync = None
+
+    @property
+    def ready(self):
+        return self.sync is not None and self.sync.synced
+
+    # Orders (Tk thread)
+
+    def place(self, side, order_type, qty, price=None):
+        """Place an order; raises ValueError if it cannot be accepted."""
+        if side not in (BUY, SELL) or order_type not in (LIMIT, MARKET):
+            raise ValueError(f"Unknown order: {side} {order_type}")
+        if qty <= 0:
+            raise ValueError("Quantity must be positive")
+        if order_type == LIMIT and (price is None or price <= 0):
+            raise ValueError("Limit orders need a positive price")
+        if not self.ready:
+            raise ValueError("Order book not synced yet")
+        sync = self.sync
+        # Same lock order as the depth listener: book, then engine
+        with sync.lock, self.lock:
+            order = PaperOrder(next(self.ids), side, order_type,
+                               price if order_type == LIMIT else None, qty, int(time.time() * 1000))
+            self.orders[order.order_id] = order
+            self.take(order, sync.book)
+            if order.is_open:
+                if order_type == LIMIT:
+                    levels = sync.book.bids if side == BUY else sync.book.asks
+                    order.queue_ahead = levels.get(price, 0.0)
+                    self.sides[side].add(order, order.queue_ahead)
+                else:
+                    # Not enough book for the whole market order
+                    self.close(order, EXPIRED)
+            self.version += 1
+            return order
+
+    def cancel(self, order_id):
+        with self.lock:
+            order = self.orders.get(order_id)
+            if order is None or not order.is_open:
+                return False
+            self.sides[order.side].remove(order)
+            self.close(order, CANCELED)
+            self.version += 1
+            return True
+
+    def cancel_all(self):
+        for order_id in list(self.orders):
+            self.cancel(order_id)
+
+    def take(self, order, book):
+        """Fill a new order against the opposite side of the book, best price first."""
+        is_bid = order.side == SELL
+        prices = book.bid_prices if is_bid else book.ask_prices
+        levels = book.bids if is_bid else book.asks
+        taken = self.taken[is_bid]
+        for i in range(len(prices)):
+            price = prices[-1 - i] if is_bid else prices[i]
+            if order.price is not None and (price < order.price if is_bid else price > order.price):
+                break
+            available = levels[price] - taken.get(price, 0.0)
+            if available <= EPSILON:
+                continue
+            qty = min(order.remaining, available)
+            taken[price] = taken.get(price, 0.0) + qty
+            self.fill(order, price, qty, maker=False)
+            if not order.is_open:
+                break
+
+    def fill(self, order, price, qty, maker):
+        fee = price * qty * (self.maker_fee_bps if maker else self.taker_fee_bps) / 10_000
+        order.filled += qty
+        order.cost += price * qty
+        self.account.on_fill(order.side, price, qty, fee)
+        self.fills.append((int(time.time() * 1000), order.order_id, order.side, price, qty, maker))
+        if order.remaining <= EPSILON:
+            if order.order_type == LIMIT:
+                self.sides[order.side].remove(order)
+            self.close(order, FILLED)
+        else:
+            order.status = PARTIALLY_FILLED
+        self.version += 1
+
+    def close(self, order, status):
+        order.status = status
+        self.orders.pop(order.order_id, None)
+        self.closed.append(order)
+
+    # Market data (stream threads)
+
+    def on_book_event(self, event, data):
+        # Depth stream thread, under the sync lock
+        book = self.sync.book if self.sync else None
+        if book is None:
+            return
+        with self.lock:
+            if event == SNAPSHOT:
+                self.on_snapshot(book)
+            else:
+                for price, _ in data.get('b', []):
+                    price = float(price)
+                    self.on_level(True, price, book.bids.get(price, 0.0))
+                for price, _ in data.get('a', []):
+                    price = float(price)
+                    self.on_level(False, price, book.asks.get(price, 0.0))
+            bid, ask = book.best_bid(), book.best_ask()
+            self.mark = (bid + ask) / 2 if bid is not None and ask is not None else self.mark
+
+    def on_snapshot(self, book):
+        """Recheck every resting level and crossing price after a (re)sync."""
+        for is_bid in (True, False):
+            levels = book.bids if is_bid else book.asks
+            taken = self.taken[is_bid]
+            for price in list(taken):
+                self.clamp_taken(taken, price, levels.get(price, 0.0))
+            resting = self.sides[BUY if is_bid else SELL]
+            for price in list(resting.prices):
+                self.update_queue(resting, price, levels.get(price, 0.0))
+            # Book levels across our best resting price on the other side
+            other = self.sides[SELL if is_bid else BUY].best()
+            if other is None:
+                continue
+            prices = book.bid_prices if is_bid else book.ask_prices
+            crossing = (prices[bisect.bisect_left(prices, other):] if is_bid
+                        else prices[:bisect.bisect_right(prices, other)])
+            for price in crossing:
+                self.cross(is_bid, price, levels[price])
+
+    def on_level(self, is_bid, price, qty):
+        """A live book level changed to qty."""
+        self.clamp_taken(self.taken[is_bid], price, qty)
+        resting = self.sides[BUY if is_bid else SELL]
+        if price in resting.levels:
+            self.update_queue(resting, price, qty)
+        other = self.sides[SELL if is_bid else BUY].best()
+        if other is not None and qty and (price >= other if is_bid else price <= other):
+            self.cross(is_bid, price, qty)
+
+    def clamp_taken(self, taken, price, qty):
+        # Liquidity we used that has since left the book no longer counts
+        if price not in taken:
+            return
+        if qty <= EPSILON:
+            del taken[price]
+        else:
+            taken[price] = min(taken[price], qty)
+
+    def update_queue(self, resting, price, qty):
+        old = resting.book_qty.get(price, 0.0)
+        cancelled = old - qty - resting.traded.pop(price, 0.0)
+        level = resting.levels[price]
+        if cancelled > 0 and old > 0:
+            keep = 1 - cancelled / old
+            for order in level:
+                order.queue_ahead *= keep
+        for order in level:
+            order.queue_ahead = min(order.queue_ahead, qty)
+        resting.book_qty[price] = qty
+        self.version += 1
+
+    def cross(self, is_bid, price, qty):
+        """A book order at price is across resting orders on the other side: fill them at their prices."""
+        taken = self.taken[is_bid]
+        available = qty - taken.get(price, 0.0)
+        if available <= EPSILON:
+            return
+        resting = self.sides[SELL if is_bid else BUY]
+        used = 0.0
+        for level_price in resting.through(price):
+            used += self.fill_level(resting, level_price, available - used)
+            if available - used <= EPSILON:
+                break
+        if used:
+            taken[price] = taken.get(price, 0.0) + used
+
+    def fill_level(self, resting, price, volume):
+        """Fill one level's orders in time priority from volume; returns the volume used."""
+        used = 0.0
+        for order in list(resting.levels.get(price, ())):
+            qty = min(order.remaining, volume - used)
+            if qty <= EPSILON:
+                break
+            self.fill(order, price, qty, maker=True)
+            used += qty
+        return used
+
+    def on_trade(self, msg):
+        # Trade stream thread
+        if msg.get('e') != 'trade':
+            return
+        price, volume = float(msg['p']), float(msg['q'])
+        # Buyer is maker: a sell hit the bids
+        resting = self.sides[BUY if msg['m'] else SELL]
+        with self.lock:
+            self.last_price = price
+            if not resting.prices:
+                return
+            # Resting orders better than the trade price would have traded first
+            for level_price in resting.through(price, inclusive=False):
+                volume -= self.fill_level(resting, level_price, volume)
+                if volume <= EPSILON:
+                    return
+            if price in resting.levels:
+                self.trade_at_level(resting, price, volume)
+
+    def trade_at_level(self, resting, price, volume):
+        """Volume traded at a resting level uses up each order's queue, then fills it."""
+        resting.traded[price] = resting.traded.get(price, 0.0) + volume
+        allocated = 0.0
+        for order in list(resting.levels[price]):
+            consumed = min(order.queue_ahead, volume)
+            order.queue_ahead -= consumed
+            # Earlier simulated orders at this price get the volume first
+            qty = min(order.remaining, volume - consumed - allocated)
+            if qty > EPSILON:
+                allocated += qty
+                self.fill(order, price, qty, maker=True)
+        self.version += 1
+
+    def snapshot(self, max_orders=200):
+        """Open orders (oldest first), recent fills and account figures for the panel."""
+        with self.lock:
+            mark = self.mark if self.mark is not None else self.last_price
+            account = self.account
+            unrealized = account.unrealized(mark)
+            orders = [(o.order_id, o.side, o.order_type, o.price, o.qty, o.filled, o.queue_ahead, o.status)
+                      for o in itertools.islice(self.orders.values(), max_orders)]
+            return {
+                'version': self.version,
+                'orders': orders,
+                'open_count': len(self.orders),
+                'fills': list(self.fills)[::-1],
+                'mark': mark,
+                'position': account.position,
+                'avg_price': account.avg_price,
+                'realized': account.realized,
+                'unrealized': unrealized,
+                'fees': account.fees,
+                'pnl': account.realized + unrealized - account.fees,
+                'volume': account.volume,
+            }
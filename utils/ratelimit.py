@@ -0,0 +1,116 @@
+import threading
+import time
+from config import REST_WEIGHT_LIMIT
+
+# Request priorities, most urgent first: what the user just asked for, what
+# live panels need, then loads that can wait
+USER, NORMAL, BACKGROUND = 0, 1, 2
+PRIORITY_NAMES = ('user', 'normal', 'background')
+
+# Binance request weight of each GET endpoint; depth is priced by its limit
+ENDPOINT_WEIGHTS = {
+    '/api/v3/klines': 2,
+    '/api/v3/uiKlines': 2,
+    '/api/v3/trades': 25,
+    '/api/v3/historicalTrades': 25,
+    '/api/v3/aggTrades': 4,
+    '/api/v3/exchangeInfo': 20,
+    '/api/v3/avgPrice': 2,
+}
+
+
+def request_weight(path, params=None):
+    """Weight Binance charges for a GET of `path` with `params`."""
+    params = params or {}
+    if path.endswith('/api/v3/depth'):
+        limit = int(params.get('limit', 100))
+        return 5 if limit <= 100 else 25 if limit <= 500 else 50 if limit <= 1000 else 250
+    if path.endswith('/api/v3/ticker/24hr'):
+        return 2 if 'symbol' in params else 80
+    return ENDPOINT_WEIGHTS.get(path, 1)
+
+
+_context = threading.local()
+
+
+def current_priority():
+    """Priority of the REST job running on this thread."""
+    return getattr(_context, 'priority', NORMAL)
+
+
+def set_priority(priority):
+    _context.priority = priority
+
+
+class WeightLimiter:
+    """Token bucket over Binance's per-minute request weight.
+
+    Tokens refill continuously at limit/60 per second, so concurrent callers
+    spread their requests over the minute instead of bursting into a ban.
+    Waiting callers are served most urgent first, the bucket is pulled down
+    to what the server reports used (other processes on this IP count too),
+    and a 429 or 418 stops everyone until its Retry-After has passed.
+    """
+
+    def __init__(self, limit_per_minute=6000, safety=0.8):
+        self.capacity = limit_per_minute * safety
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.banned_until = 0.0
+        self.waiting = [0] * len(PRIORITY_NAMES)
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, weight, priority=NORMAL):
+        """Block until `weight` tokens are available and no more urgent caller waits, then take them."""
+        weight = min(weight, self.capacity)
+        with self._cond:
+            self.waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self.banned_until:
+                        timeout = self.banned_until - now
+                    elif any(self.waiting[:priority]):
+                        # Woken when the more urgent caller is through
+                        timeout = None
+                    elif self.tokens >= weight:
+                        self.tokens -= weight
+                        return
+                    else:
+                        timeout = (weight - self.tokens) / self.rate
+                    self._cond.wait(timeout)
+            finally:
+                self.waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def update_used(self, used):
+        """Never hold more tokens than the weight the server says is left this minute."""
+        with self._cond:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, max(0.0, self.capacity - used))
+
+    def ban(self, seconds):
+        """Hold every request for `seconds`, after a 429 or 418."""
+        with self._cond:
+            self.banned_until = max(self.banned_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def pressure(self):
+        """Factor to stretch retry and refresh intervals by: 1 while at least half the budget is free, up to 8."""
+        with self._cond:
+            now = time.monotonic()
+            if now < self.banned_until:
+                return 8.0
+            self._refill(now)
+            free = self.tokens / self.capacity
+        return 1.0 if free >= 0.5 else min(8.0, 0.5 / max(free, 1 / 16))
+
+
+# Shared by every REST call in this process
+LIMITER = WeightLimiter(REST_WEIGHT_LIMIT)
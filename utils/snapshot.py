@@ -0,0 +1,40 @@
+import json
+import os
+import time
+
+SNAPSHOT_FILE = 'snapshot.json'
+
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    """Load the last-session snapshot, or an empty one."""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data.setdefault('symbols', {})
+                return data
+    except (OSError, ValueError) as e:
+        print(f"Error loading snapshot: {e}")
+    return {'symbols': {}}
+
+
+def save_snapshot(snapshot, path=SNAPSHOT_FILE):
+    """Write the snapshot atomically so a crash never leaves a torn file."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error saving snapshot: {e}")
+
+
+def update_symbol_snapshot(snapshot, symbol, panel_data):
+    """Merge the per-panel snapshots for a symbol, keeping panels that had no data."""
+    entry = snapshot['symbols'].setdefault(symbol, {})
+    for panel_id, data in panel_data.items():
+        if data:
+            entry[panel_id] = data
+    entry['saved_at'] = time.time()
+    return entry
@@ -0,0 +1,57 @@
+import time
+import json
+import sys
+import importlib
+
+# Taken when this module is first imported, which main.py does before anything heavy
+PROCESS_START = time.perf_counter()
+
+
+class StartupReport:
+    """Collect import and startup timings so cold-start regressions are visible."""
+
+    def __init__(self, start=PROCESS_START):
+        self.start = start
+        self.imports = []
+        self.marks = []
+
+    def import_module(self, name):
+        """Import a module and record how long it took if it was not loaded yet."""
+        already_loaded = name in sys.modules
+        t0 = time.perf_counter()
+        module = importlib.import_module(name)
+        if not already_loaded:
+            self.imports.append((name, time.perf_counter() - t0))
+        return module
+
+    def mark(self, name):
+        """Record a named milestone relative to process start."""
+        self.marks.append((name, time.perf_counter() - self.start))
+
+    def as_dict(self):
+        return {
+            'timestamp': time.time(),
+            'imports_ms': {name: round(elapsed * 1000, 1) for name, elapsed in self.imports},
+            'marks_ms': {name: round(elapsed * 1000, 1) for name, elapsed in self.marks},
+        }
+
+    def format(self):
+        """Return a human readable report."""
+        lines = ["Startup report", "  Imports:"]
+        for name, elapsed in sorted(self.imports, key=lambda item: -item[1]):
+            lines.append(f"    {name:<32} {elapsed * 1000:8.1f} ms")
+        lines.append("  Milestones:")
+        for name, elapsed in self.marks:
+            lines.append(f"    {name:<32} {elapsed * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def save(self, path='startup_report.jsonl'):
+        """Append this run to a JSON lines log for tracking over time."""
+        try:
+            with open(path, 'a') as f:
+                f.write(json.dumps(self.as_dict()) + "\n")
+        except OSError as e:
+            print(f"Error saving startup report: {e}")
+
+
+STARTUP = StartupReport()
@@ -0,0 +1,137 @@
+import os
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+DATA_DIR = 'data'
+
+KLINE_COLUMNS = [
+    ('open_time', np.int64), ('open', np.float64), ('high', np.float64),
+    ('low', np.float64), ('close', np.float64), ('volume', np.float64),
+    ('close_time', np.int64), ('quote_volume', np.float64), ('trades', np.int64),
+    ('taker_buy_base', np.float64), ('taker_buy_quote', np.float64),
+]
+
+AGG_TRADE_COLUMNS = [
+    ('agg_id', np.int64, 'a'), ('price', np.float64, 'p'), ('qty', np.float64, 'q'),
+    ('first_id', np.int64, 'f'), ('last_id', np.int64, 'l'), ('time', np.int64, 'T'),
+    ('is_buyer_maker', np.bool_, 'm'),
+]
+
+
+def utc_today():
+    return datetime.now(timezone.utc).date()
+
+
+def day_start_ms(day):
+    """Return the UTC midnight of a date as a millisecond timestamp."""
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def klines_to_columns(klines):
+    """Turn Binance kline rows into a dict of typed column arrays."""
+    return {name: np.array([k[i] for k in klines], dtype=dtype)
+            for i, (name, dtype) in enumerate(KLINE_COLUMNS)}
+
+
+def agg_trades_to_columns(trades):
+    """Turn Binance aggTrade dicts into a dict of typed column arrays."""
+    return {name: np.array([t[key] for t in trades], dtype=dtype)
+            for name, dtype, key in AGG_TRADE_COLUMNS}
+
+
+class MarketDataStore:
+    """Columnar on-disk store of klines and aggTrades.
+
+    Each day (klines) or hour (aggTrades) is one .npz file holding one array
+    per column, so readers load whole columns without parsing JSON. Files are
+    written atomically, and only days before today count as complete, which
+    is what lets an interrupted download resume where it stopped.
+    """
+
+    def __init__(self, root=DATA_DIR):
+        self.root = root
+
+    def kline_path(self, symbol, interval, day):
+        return os.path.join(self.root, 'klines', symbol.upper(), interval, f"{day.isoformat()}.npz")
+
+    def agg_trades_path(self, symbol, day, hour):
+        return os.path.join(self.root, 'aggtrades', symbol.upper(), day.isoformat(), f"{hour:02d}.npz")
+
+    def _write(self, path, columns):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, path)
+
+    def _is_complete(self, path, day):
+        return day < utc_today() and os.path.exists(path)
+
+    def write_klines(self, symbol, interval, day, klines):
+        self._write(self.kline_path(symbol, interval, day), klines_to_columns(klines))
+
+    def has_klines(self, symbol, interval, day):
+        return self._is_complete(self.kline_path(symbol, interval, day), day)
+
+    def write_agg_trades(self, symbol, day, hour, trades):
+        self._write(self.agg_trades_path(symbol, day, hour), agg_trades_to_columns(trades))
+
+    def has_agg_trades(self, symbol, day, hour):
+        return self._is_complete(self.agg_trades_path(symbol, day, hour), day)
+
+    def _read(self, paths, columns):
+        parts = {name: [] for name, *_ in columns}
+        for path in paths:
+            with np.load(path) as data:
+                for name in parts:
+                    parts[name].append(data[name])
+        return {name: np.concatenate(arrays) if arrays else np.empty(0, dtype=columns[i][1])
+                for i, (name, arrays) in enumerate(parts.items())}
+
+    def kline_days(self, symbol, interval):
+        """Return the stored days for a symbol and interval, oldest first."""
+        directory = os.path.join(self.root, 'klines', symbol.upper(), interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(datetime.strptime(name[:-4], '%Y-%m-%d').date()
+                      for name in os.listdir(directory) if name.endswith('.npz'))
+
+    def read_klines(self, symbol, interval, start=None, end=None):
+        """Read stored klines for days in [start, end] as column arrays."""
+        days = [day for day in self.kline_days(symbol, interval)
+                if (start is None or day >= start) and (end is None or day <= end)]
+        return self._read([self.kline_path(symbol, interval, day) for day in days], KLINE_COLUMNS)
+
+    def recent_klines(self, symbol, interval, limit=100):
+        """Return the last `limit` stored candles as Binance-style kline rows."""
+        days = self.kline_days(symbol, interval)
+        selected = []
+        count = 0
+        for day in reversed(days):
+            selected.insert(0, day)
+            with np.load(self.kline_path(symbol, interval, day)) as data:
+                count += len(data['open_time'])
+            if count >= limit:
+                break
+        if not selected:
+            return []
+        cols = self._read([self.kline_path(symbol, interval, day) for day in selected], KLINE_COLUMNS)
+        rows = np.column_stack([cols[name] for name in ('open', 'high', 'low', 'close', 'volume')])
+        start = max(0, count - limit)
+        return [[int(t)] + row for t, row in zip(cols['open_time'][start:], rows[start:].tolist())]
+
+    def read_agg_trades(self, symbol, start_day, end_day=None):
+        """Read stored aggTrades for days in [start_day, end_day] as column arrays."""
+        end_day = end_day or start_day
+        paths = []
+        day = start_day
+        while day <= end_day:
+            for hour in range(24):
+                path = self.agg_trades_path(symbol, day, hour)
+                if os.path.exists(path):
+                    paths.append(path)
+            day += timedelta(days=1)
+        return self._read(paths, AGG_TRADE_COLUMNS)
+
+
+STORE = MarketDataStore()
@@ -0,0 +1,184 @@
+import bisect
+import json
+import os
+import time
+from config import SYMBOLS
+from utils.binance_api import get_exchange_info
+
+CACHE_FILE = 'exchange_info.json'
+
+# Refresh the cached symbol list when it is older than this (seconds)
+CACHE_MAX_AGE = 24 * 3600
+
+USD_QUOTES = ('USDT', 'USDC', 'FDUSD', 'TUSD', 'BUSD', 'USD')
+
+# Preferred quotes come first among equally good search matches
+QUOTE_RANK = {'USDT': 0, 'USDC': 1, 'FDUSD': 2, 'BTC': 3, 'ETH': 4, 'BNB': 5}
+
+
+def decimals_from_step(step):
+    """Number of decimals implied by a tick or step size like '0.01000000'."""
+    if not step or '.' not in step:
+        return 0
+    return len(step.rstrip('0').split('.')[1])
+
+
+def compact_symbol(info):
+    """Keep only what the dashboard needs from an exchangeInfo symbol entry."""
+    filters = {f['filterType']: f for f in info.get('filters', [])}
+    return {
+        'symbol': info['symbol'].lower(),
+        'name': f"{info['baseAsset']}/{info['quoteAsset']}",
+        'base': info['baseAsset'],
+        'quote': info['quoteAsset'],
+        'tick_size': filters.get('PRICE_FILTER', {}).get('tickSize', '0.01'),
+        'step_size': filters.get('LOT_SIZE', {}).get('stepSize', '0.0001'),
+    }
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SymbolIndex:
+    """Prefix and trigram index over symbol keys for search-as-you-type.
+
+    Keys are lowercase symbols without separators ("btcusdt"). Prefix
+    matches come from bisect over the sorted keys; substring matches from
+    intersecting the trigram posting sets, so lookups do not scan the universe.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+        self.keys = sorted(symbols)
+        self.postings = {}
+        for key in self.keys:
+            for gram in trigrams(key):
+                self.postings.setdefault(gram, set()).add(key)
+
+    def _rank(self, key):
+        info = self.symbols[key]
+        return (QUOTE_RANK.get(info['quote'], 9), len(key), key)
+
+    def prefix(self, query):
+        i = bisect.bisect_left(self.keys, query)
+        matches = []
+        while i < len(self.keys) and self.keys[i].startswith(query):
+            matches.append(self.keys[i])
+            i += 1
+        return matches
+
+    def substring(self, query):
+        grams = trigrams(query)
+        if not grams:
+            return []
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set.intersection(*postings)
+        return [key for key in candidates if query in key]
+
+    def search(self, query, limit=20):
+        query = query.lower().replace('/', '').replace(' ', '')
+        if not query:
+            return []
+        prefix_matches = sorted(self.prefix(query), key=self._rank)
+        if len(prefix_matches) >= limit:
+            return [self.symbols[key] for key in prefix_matches[:limit]]
+        seen = set(prefix_matches)
+        others = sorted((key for key in self.substring(query) if key not in seen), key=self._rank)
+        return [self.symbols[key] for key in (prefix_matches + others)[:limit]]
+
+
+class SymbolUniverse:
+    """Every tradable symbol, cached on disk with its ETag and fetch time."""
+
+    def __init__(self, cache_file=CACHE_FILE):
+        self.cache_file = cache_file
+        self.etag = None
+        self.fetched_at = 0
+        self.index = None
+        self._set_symbols(self._fallback())
+        self.load_cache()
+
+    def _fallback(self):
+        return [{'symbol': s['symbol'], 'name': s['name'],
+                 'base': s['name'].split('/')[0], 'quote': s['name'].split('/')[1],
+                 'tick_size': '0.01', 'step_size': '0.0001'} for s in SYMBOLS]
+
+    def _set_symbols(self, symbols):
+        # Build the new index fully before swapping it in; readers never lock
+        self.index = SymbolIndex({info['symbol']: info for info in symbols})
+
+    def load_cache(self):
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    cache = json.load(f)
+                self.etag = cache.get('etag')
+                self.fetched_at = cache.get('fetched_at', 0)
+                if cache.get('symbols'):
+                    self._set_symbols(cache['symbols'])
+        except (OSError, ValueError) as e:
+            print(f"Error loading symbol cache: {e}")
+
+    def save_cache(self):
+        tmp_path = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'etag': self.etag, 'fetched_at': self.fetched_at,
+                           'symbols': list(self.index.symbols.values())}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"Error saving symbol cache: {e}")
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def refresh(self, force=False):
+        """Re-fetch exchangeInfo when the cache is stale, using the ETag if we have one."""
+        if not force and self.age() < CACHE_MAX_AGE:
+            return False
+        result = get_exchange_info(self.etag)
+        if result is None:
+            return False
+        etag, data = result
+        self.etag = etag
+        self.fetched_at = time.time()
+        if data is not None:
+            self._set_symbols([compact_symbol(info) for info in data.get('symbols', [])
+                               if info.get('status') == 'TRADING'])
+        self.save_cache()
+        return data is not None
+
+    def __len__(self):
+        return len(self.index.keys)
+
+    def get(self, symbol):
+        return self.index.symbols.get(symbol.lower())
+
+    def search(self, query, limit=20):
+        return self.index.search(query, limit)
+
+    def price_decimals(self, symbol):
+        info = self.get(symbol)
+        return decimals_from_step(info['tick_size']) if info else 2
+
+    def qty_decimals(self, symbol):
+        info = self.get(symbol)
+        return decimals_from_step(info['step_size']) if info else 4
+
+    def format_price(self, symbol, price):
+        return f"{price:,.{self.price_decimals(symbol)}f}"
+
+    def format_qty(self, symbol, qty):
+        return f"{qty:,.{self.qty_decimals(symbol)}f}"
+
+    def quote(self, symbol):
+        info = self.get(symbol)
+        return info['quote'] if info else 'USDT'
+
+    def currency_prefix(self, symbol):
+        """'$' for USD-quoted pairs, nothing otherwise."""
+        return '$' if self.quote(symbol) in USD_QUOTES else ''
+
+
+UNIVERSE = SymbolUniverse()
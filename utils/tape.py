@@ -0,0 +1,121 @@
+import threading
+import numpy as np
+
+TAPE_CAPACITY = 200_000
+
+
+class TradeTape:
+    """Fixed-capacity ring of trades held as NumPy columns.
+
+    Appends are O(1); once full the oldest trade is overwritten. Filters are
+    boolean masks over whole columns, and rows are only turned into Python
+    objects for the handful a view actually shows.
+    """
+
+    __slots__ = ('capacity', 'ids', 'prices', 'qtys', 'times', 'is_buy',
+                 'head', 'size', 'last_id', 'version', 'lock')
+
+    def __init__(self, capacity=TAPE_CAPACITY):
+        self.capacity = capacity
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.prices = np.zeros(capacity, dtype=np.float64)
+        self.qtys = np.zeros(capacity, dtype=np.float64)
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.is_buy = np.zeros(capacity, dtype=bool)
+        self.head = 0
+        self.size = 0
+        self.last_id = -1
+        # Bumped on every change so views can tell when to refilter
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def append(self, trade_id, price, qty, time_ms, is_buy):
+        """Add one trade; ids at or below the newest one are ignored."""
+        with self.lock:
+            if trade_id <= self.last_id:
+                return
+            i = self.head
+            self.ids[i] = trade_id
+            self.prices[i] = price
+            self.qtys[i] = qty
+            self.times[i] = time_ms
+            self.is_buy[i] = is_buy
+            self.head = (i + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+            self.last_id = trade_id
+            self.version += 1
+
+    def extend_rest(self, trades):
+        """Add trades in REST /api/v3/trades format, oldest first."""
+        for trade in trades:
+            # isBuyerMaker means the seller took liquidity: a sell
+            self.append(trade['id'], float(trade['price']), float(trade['qty']),
+                        trade['time'], not trade['isBuyerMaker'])
+
+    def append_stream(self, msg):
+        """Add a trade from the <symbol>@trade stream."""
+        self.append(msg['t'], float(msg['p']), float(msg['q']), msg['T'], not msg['m'])
+
+    def clear(self):
+        with self.lock:
+            self.head = 0
+            self.size = 0
+            self.last_id = -1
+            self.version += 1
+
+    def select(self, min_qty=None, max_qty=None, side=None, min_notional=None):
+        """Ring positions of matching trades, newest first.
+
+        side is 'buy', 'sell' or None for both.
+        """
+        with self.lock:
+            n, head, version = self.size, self.head, self.version
+            if min_qty is None and max_qty is None and side is None and min_notional is None:
+                return (head - 1 - np.arange(n)) % self.capacity, version
+            qtys = self.qtys[:n]
+            mask = np.ones(n, dtype=bool)
+            if min_qty is not None:
+                mask &= qtys >= min_qty
+            if max_qty is not None:
+                mask &= qtys <= max_qty
+            if side is not None:
+                mask &= self.is_buy[:n] == (side == 'buy')
+            if min_notional is not None:
+                mask &= qtys * self.prices[:n] >= min_notional
+            positions = np.flatnonzero(mask)
+
+        if n == self.capacity:
+            # Chronological order starts at head once the ring has wrapped
+            split = np.searchsorted(positions, head)
+            positions = np.concatenate([positions[split:], positions[:split]])
+        return positions[::-1], version
+
+    def since(self, time_ms):
+        """(times, prices) of the trades at or after time_ms, oldest first, as copies."""
+        with self.lock:
+            n, head = self.size, self.head
+            if n < self.capacity:
+                times, prices = self.times[:n], self.prices[:n]
+            else:
+                times = np.concatenate([self.times[head:], self.times[:head]])
+                prices = np.concatenate([self.prices[head:], self.prices[:head]])
+            start = np.searchsorted(times, time_ms)
+            return times[start:].copy(), prices[start:].copy()
+
+    def rows(self, positions):
+        """(price, qty, time_ms, is_buy) tuples for the given ring positions."""
+        with self.lock:
+            return list(zip(self.prices[positions].tolist(), self.qtys[positions].tolist(),
+                            self.times[positions].tolist(), self.is_buy[positions].tolist()))
+
+    def latest(self, count):
+        """The newest trades in REST format, newest first."""
+        positions, _ = self.select()
+        positions = positions[:count]
+        with self.lock:
+            return [{'id': int(self.ids[i]), 'price': str(self.prices[i]), 'qty': str(self.qtys[i]),
+                     'time': int(self.times[i]), 'isBuyerMaker': not self.is_buy[i]}
+                    for i in positions.tolist()]
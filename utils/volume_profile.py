@@ -0,0 +1,112 @@
+import threading
+import numpy as np
+
+
+class VolumeProfile:
+    """Traded volume per price bucket, with point of control and value area.
+
+    Full builds are a single np.bincount over the trades (or over candle
+    ranges); live trades then add to one bucket each. Trades outside
+    [low, high) are counted in `outside` until the next rebuild.
+    """
+
+    def __init__(self, low=0.0, high=1.0, bins=80):
+        self.bins = bins
+        self.volume = np.zeros(bins, dtype=np.float64)
+        self.low = low
+        self.bin_size = (high - low) / bins or 1.0
+        self.outside = 0.0
+        self.version = 0
+        self.lock = threading.Lock()
+
+    @property
+    def high(self):
+        return self.low + self.bins * self.bin_size
+
+    def edges(self):
+        return self.low + np.arange(self.bins + 1) * self.bin_size
+
+    def reset(self, low, high):
+        with self.lock:
+            self.volume[:] = 0
+            self.low = low
+            self.bin_size = (high - low) / self.bins or 1.0
+            self.outside = 0.0
+            self.version += 1
+
+    def bucket(self, prices):
+        return np.floor((np.asarray(prices, dtype=np.float64) - self.low) / self.bin_size).astype(np.int64)
+
+    def build_from_trades(self, prices, qtys):
+        """Replace the profile with the given trades."""
+        rows = self.bucket(prices)
+        qtys = np.asarray(qtys, dtype=np.float64)
+        keep = (rows >= 0) & (rows < self.bins)
+        volume = np.bincount(rows[keep], weights=qtys[keep], minlength=self.bins)
+        with self.lock:
+            self.volume[:] = volume
+            self.outside = float(qtys[~keep].sum())
+            self.version += 1
+
+    def build_from_klines(self, lows, highs, volumes):
+        """Replace the profile, spreading each candle's volume evenly over its range.
+
+        Uses a difference array: +w where a candle's range starts, -w past
+        where it ends, then one cumulative sum for all candles together.
+        """
+        first = np.clip(self.bucket(lows), 0, self.bins - 1)
+        last = np.clip(self.bucket(highs), 0, self.bins - 1)
+        weights = np.asarray(volumes, dtype=np.float64) / (last - first + 1)
+        diff = (np.bincount(first, weights=weights, minlength=self.bins + 1)
+                - np.bincount(last + 1, weights=weights, minlength=self.bins + 1))
+        with self.lock:
+            self.volume[:] = np.cumsum(diff[:self.bins])
+            self.outside = 0.0
+            self.version += 1
+
+    def add_trade(self, price, qty):
+        """Count one live trade."""
+        i = int((price - self.low) // self.bin_size)
+        with self.lock:
+            if 0 <= i < self.bins:
+                self.volume[i] += qty
+            else:
+                self.outside += qty
+            self.version += 1
+
+    def point_of_control(self):
+        """Index of the bucket with the most volume."""
+        return int(np.argmax(self.volume))
+
+    def value_area(self, fraction=0.7):
+        """(first, last) bucket indexes of the value area around the point of control.
+
+        Grows from the point of control one bucket at a time toward whichever
+        neighbour traded more, until `fraction` of the volume is covered.
+        """
+        volume = self.volume
+        target = volume.sum() * fraction
+        first = last = self.point_of_control()
+        covered = volume[first]
+        while covered < target and (first > 0 or last < self.bins - 1):
+            below = volume[first - 1] if first > 0 else -1.0
+            above = volume[last + 1] if last < self.bins - 1 else -1.0
+            if above >= below:
+                last += 1
+                covered += above
+            else:
+                first -= 1
+                covered += below
+        return first, last
+
+    def summary(self):
+        """Point of control and value area as prices, plus a copy of the volumes."""
+        with self.lock:
+            volume = self.volume.copy()
+            poc = self.point_of_control()
+            first, last = self.value_area()
+        return {
+            'volume': volume,
+            'poc': self.low + (poc + 0.5) * self.bin_size,
+            'value_area': (self.low + first * self.bin_size, self.low + (last + 1) * self.bin_size),
+        }
@@ -0,0 +1,236 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+from tkinter import TclError
+from concurrent.futures import Future
+from utils.metrics import METRICS
+from utils.ratelimit import NORMAL, PRIORITY_NAMES, set_priority
+from config import REST_WORKERS
+
+
+class CancelToken:
+    """Flag owned by a panel; once cancelled, results meant for it are dropped."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TkBridge:
+    """Hands callables from any thread to the Tk thread, in order.
+
+    Other threads only put onto a queue; a short after() loop on the Tk
+    thread drains it, so no Tk call is ever made off the Tk thread.
+    """
+
+    poll_interval = 15
+
+    def __init__(self, root):
+        self.root = root
+        self.queue = queue.SimpleQueue()
+        self.after_id = None
+
+    def start(self):
+        self.drain()
+        return self
+
+    def stop(self):
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def post(self, fn, *args):
+        self.queue.put((fn, args))
+
+    def drain(self):
+        while True:
+            try:
+                fn, args = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except TclError:
+                # The widget it was meant for has gone
+                pass
+            except Exception as e:
+                print(f"Error in Tk callback: {e}")
+        try:
+            self.after_id = self.root.after(self.poll_interval, self.drain)
+        except TclError:
+            self.after_id = None
+
+
+class RestExecutor:
+    """Bounded pool of worker threads shared by every REST fetch.
+
+    Jobs wait in a priority queue (USER, NORMAL, BACKGROUND from
+    utils.ratelimit), so a chart the user just asked for runs before
+    background loads, and the job's priority carries on to its requests'
+    place in the weight budget. A job may also be held back for a delay.
+    Requests with the same key (function name and arguments, i.e. endpoint
+    and params) that are already in flight share one future instead of
+    queueing another call, so a slow network cannot pile up work; a more
+    urgent or earlier request for a queued job moves it up.
+    """
+
+    def __init__(self, max_workers=REST_WORKERS):
+        self.max_workers = max_workers
+        self.threads = []
+        # Heaps of (priority, seq, job) ready to run and (due, seq, priority, job) held back
+        self.ready = []
+        self.delayed = []
+        self.seq = itertools.count()
+        # Best (priority, due) each queued future is waiting with
+        self.queued_as = {}
+        self.closed = False
+        self.in_flight = {}
+        # A TkBridge, when set, carries results to the Tk thread instead of widget.after
+        self.bridge = None
+        # Results handed to the Tk thread that it has not run yet
+        self.queued = 0
+        # Re-entrant: add_done_callback runs the callback inline if the future already finished
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+
+    def submit(self, fn, *args, key=None, priority=NORMAL, delay=0):
+        """Run fn(*args) in the pool after `delay` seconds, joining an identical request in flight."""
+        key = key or (fn.__name__, args)
+        due = time.monotonic() + delay
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("REST pool is shut down")
+            future = self.in_flight.get(key)
+            if future is None:
+                future = Future()
+                self.in_flight[key] = future
+                future.add_done_callback(lambda f: self._forget(key, f))
+            elif future.running() or future.done():
+                return future
+            best = self.queued_as.get(future)
+            if best is None or priority < best[0] or due < best[1]:
+                # An extra entry; whichever a worker reaches first runs the job
+                self.queued_as[future] = (min(priority, best[0]), min(due, best[1])) if best else (priority, due)
+                job = (future, fn, args)
+                if delay > 0:
+                    heapq.heappush(self.delayed, (due, next(self.seq), priority, job))
+                else:
+                    heapq.heappush(self.ready, (priority, next(self.seq), job))
+                if not self.threads:
+                    self._start_workers()
+                self._wakeup.notify()
+            return future
+
+    def _start_workers(self):
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._work, name=f'rest_{i}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _next_job(self):
+        """Block until a job is due; None once shut down."""
+        with self._lock:
+            while not self.closed:
+                now = time.monotonic()
+                while self.delayed and self.delayed[0][0] <= now:
+                    _, seq, priority, job = heapq.heappop(self.delayed)
+                    heapq.heappush(self.ready, (priority, seq, job))
+                while self.ready:
+                    priority, _, job = heapq.heappop(self.ready)
+                    future = job[0]
+                    self.queued_as.pop(future, None)
+                    if future.running() or future.done():
+                        continue
+                    if future.set_running_or_notify_cancel():
+                        return priority, job
+                self._wakeup.wait(self.delayed[0][0] - now if self.delayed else None)
+            return None
+
+    def _work(self):
+        while True:
+            item = self._next_job()
+            if item is None:
+                return
+            priority, (future, fn, args) = item
+            set_priority(priority)
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+    def run(self, token, widget, callback, fn, *args, key=None, priority=NORMAL):
+        """Fetch in the pool, then call callback(result) on the Tk thread.
+
+        The result is dropped if it is None or the token was cancelled by the
+        time it arrives, checked both in the worker and again on the Tk thread.
+        """
+        def deliver(future):
+            if token.cancelled or future.cancelled():
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error in {fn.__name__}: {e}")
+                return
+            if result is None:
+                return
+            with self._lock:
+                self.queued += 1
+            if self.bridge is not None:
+                self.bridge.post(self._deliver, token, callback, result)
+                return
+            try:
+                widget.after(0, self._deliver, token, callback, result)
+            except (RuntimeError, TclError):
+                # Tk has already been torn down
+                with self._lock:
+                    self.queued -= 1
+
+        future = self.submit(fn, *args, key=key, priority=priority)
+        future.add_done_callback(deliver)
+        return future
+
+    def _deliver(self, token, callback, result):
+        with self._lock:
+            self.queued -= 1
+        if not token.cancelled:
+            callback(result)
+
+    def queue_depth(self):
+        """Jobs waiting to start, by priority name."""
+        with self._lock:
+            depth = dict.fromkeys(PRIORITY_NAMES, 0)
+            for future, (priority, _) in self.queued_as.items():
+                depth[PRIORITY_NAMES[priority]] += 1
+        return {(name,): count for name, count in depth.items()}
+
+    def shutdown(self):
+        with self._lock:
+            self.closed = True
+            pending = list(self.queued_as)
+            self.ready, self.delayed = [], []
+            self.queued_as.clear()
+            self._wakeup.notify_all()
+        for future in pending:
+            future.cancel()
+
+
+REST_POOL = RestExecutor()
+
+METRICS.gauge('dashboard_ui_queue_depth', "REST results waiting for the Tk thread",
+              collect=lambda: REST_POOL.queued)
+METRICS.gauge('dashboard_rest_in_flight', "Distinct REST requests in flight",
+              collect=lambda: len(REST_POOL.in_flight))
+METRICS.gauge('dashboard_rest_queued', "REST jobs waiting to start, by priority", ('priority',),
+              collect=REST_POOL.queue_depth)